@@ -166,6 +166,7 @@ scrub, it will need to be in TABLES_TO_TRUNCATE and have a DataScrubbing
 defined on the model.
 """
 
+import functools
 import inspect
 from datetime import UTC, datetime
 
@@ -175,6 +176,8 @@ from django.core.management.base import BaseCommand, CommandError
 from django.core.management.color import no_style
 from django.db import connections, transaction
 
+from jobserver.model_utils import bulk_update_changed
+
 
 APPLICATIONS_TO_SCRUB = {
     "applications",
@@ -234,6 +237,20 @@ def get_scrubbed_models():
     return scrubbed_models
 
 
+def get_scrubbed_values(scrub_fields, obj):
+    """Build the scrubbed value of each field in scrub_fields for obj"""
+    values = {}
+    for attr_name, fake_value in scrub_fields.items():
+        if inspect.isgenerator(fake_value):
+            value = next(fake_value)
+        elif callable(fake_value):
+            value = fake_value()
+        else:
+            value = fake_value
+        values[attr_name] = value
+    return values
+
+
 class Command(BaseCommand):
     """Management command to scrub sensitive fields"""
 
@@ -281,22 +298,20 @@ class Command(BaseCommand):
                     continue
                 field_names = scrub_fields.keys()
 
-                # Iterate per-object updating and saving scrubbed fields.
-                # Many small queries in the transaction but avoids either holding
-                # whole tables in memory or chunking bulk updates.
-                objs = model.objects.using(database_alias).all().iterator()
-                count = 0
-                for obj in objs:
-                    for attr_name, fake_value in scrub_fields.items():
-                        if inspect.isgenerator(fake_value):
-                            value = next(fake_value)
-                        elif callable(fake_value):
-                            value = fake_value()
-                        else:
-                            value = fake_value
-                        setattr(obj, attr_name, value)
-                    obj.save(using=database_alias, update_fields=field_names)
-                    count += 1
+                # Stream objects through, writing the scrubbed fields in
+                # batches, which avoids either holding whole tables in memory
+                # or issuing a query per object.
+                # bulk_update_changed skips rows which already hold their
+                # scrubbed values, so count the whole table to report every
+                # record as scrubbed, not just those we had to write.  Rows are
+                # scrubbed in pk order so generated values are predictable.
+                queryset = model.objects.using(database_alias).order_by("pk")
+                count = queryset.count()
+                bulk_update_changed(
+                    queryset.iterator(),
+                    list(field_names),
+                    functools.partial(get_scrubbed_values, scrub_fields),
+                )
 
                 self.stdout.write(
                     f"Scrubbed {count} {model.__name__} records from fields: {', '.join(field_names)}"
@@ -0,0 +1,140 @@
+from datetime import timedelta
+
+import sentry_sdk
+import structlog
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from opentelemetry import trace
+
+from jobserver.emails import send_finished_notification
+from jobserver.models import JobNotification
+
+
+logger = structlog.get_logger(__name__)
+tracer = trace.get_tracer("job_notifications")
+
+
+def queue_job_notifications(jobs):
+    """
+    Add newly completed Jobs to the notifications outbox
+
+    Only Jobs whose JobRequest asked for notifications are queued, and a Job is
+    only ever queued once, however many times we're told it has completed.
+    Call this in the same transaction as the write which completed the Jobs.
+    """
+    notifications = [
+        JobNotification(job=job) for job in jobs if job.job_request.will_notify
+    ]
+    if notifications:
+        JobNotification.objects.bulk_create(notifications, ignore_conflicts=True)
+
+
+def retry_delay(attempts):
+    """How long to wait before retrying a notification which has failed attempts times."""
+    return timedelta(
+        seconds=settings.JOB_NOTIFICATION_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def claim_job_notifications():
+    """
+    Claim a batch of due notifications for this worker to send
+
+    Each claimed notification has an attempt counted, and its next attempt
+    pushed back by its retry delay, so it is no longer due and other workers
+    skip it. That's committed before we send anything, so no lock is held while
+    we talk to the mail server. If we die before recording the result, the
+    notification is retried once the delay has passed, like any other failure.
+    """
+    with transaction.atomic():
+        notifications = list(
+            JobNotification.objects.due(settings.JOB_NOTIFICATION_MAX_ATTEMPTS)
+            .select_related(
+                "job__job_request__created_by", "job__job_request__workspace"
+            )
+            .select_for_update(skip_locked=True, of=("self",))
+            .order_by("next_attempt_at", "pk")[: settings.JOB_NOTIFICATION_BATCH_SIZE]
+        )
+
+        for notification in notifications:
+            notification.attempts += 1
+            notification.next_attempt_at = timezone.now() + retry_delay(
+                notification.attempts
+            )
+
+        JobNotification.objects.bulk_update(
+            notifications, ["attempts", "next_attempt_at"]
+        )
+
+    return notifications
+
+
+def send_job_notifications():
+    """
+    Send a batch of due notifications from the outbox
+
+    The batch is claimed (see claim_job_notifications) in a short transaction,
+    then each notification is sent, and its result recorded, on its own, so a
+    slow mail server never holds locks on the outbox. A failed notification is
+    retried with exponential backoff, until it has failed
+    JOB_NOTIFICATION_MAX_ATTEMPTS times.
+
+    Returns the number of notifications we tried to send.
+    """
+    with tracer.start_as_current_span("send_job_notifications") as span:
+        sent = []
+        failed = []
+        abandoned = []
+
+        notifications = claim_job_notifications()
+
+        for notification in notifications:
+            job = notification.job
+            job_request = job.job_request
+
+            with structlog.contextvars.bound_contextvars(
+                job_request=job_request.id, job_identifier=job.identifier
+            ):
+                try:
+                    send_finished_notification(job_request.created_by.email, job)
+                except Exception as exc:
+                    notification.last_error = str(exc)
+                    notification.save(update_fields=["last_error"])
+
+                    if notification.attempts >= settings.JOB_NOTIFICATION_MAX_ATTEMPTS:
+                        logger.error(
+                            "Giving up on notifying requesting user of completed job",
+                            attempts=notification.attempts,
+                            error=str(exc),
+                        )
+                        sentry_sdk.capture_exception(exc)
+                        abandoned.append(notification)
+                    else:
+                        logger.warning(
+                            "Failed to notify requesting user of completed job",
+                            attempts=notification.attempts,
+                            error=str(exc),
+                        )
+                        failed.append(notification)
+                    continue
+
+                notification.sent_at = timezone.now()
+                notification.last_error = ""
+                notification.save(update_fields=["sent_at", "last_error"])
+                sent.append(notification)
+                logger.info(
+                    "Notified requesting user of completed job",
+                    user_id=job_request.created_by_id,
+                )
+
+        if notifications:
+            span.set_attributes(
+                {
+                    "job_notifications.sent_count": len(sent),
+                    "job_notifications.failed_count": len(failed),
+                    "job_notifications.abandoned_count": len(abandoned),
+                }
+            )
+
+        return len(notifications)
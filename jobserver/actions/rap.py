@@ -1,13 +1,13 @@
-import datetime
 from collections import defaultdict
 
 import structlog
-from django.db.models import Q
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 from opentelemetry import trace
 
 from jobserver import rap_api
-from jobserver.api.jobs import handle_job_notifications
+from jobserver.actions.notifications import queue_job_notifications
 from jobserver.models import Job, JobRequest, JobRequestStatus
 from jobserver.models.job import COMPLETED_STATES
 
@@ -16,41 +16,38 @@ logger = structlog.get_logger(__name__)
 tracer = trace.get_tracer("rap_commands")
 
 
-def get_active_job_request_identifiers():
+def _active_job_requests():
+    # Filter "active" job_requests based on the job_request's status AND the status of its individual jobs.
+    # The "private" _status field can be stale, so active() may be over-inclusive; we
+    # recheck each job request's status, as jobs_status would calculate it, in the same query.
+    return (
+        JobRequest.objects.active()
+        .with_computed_status()
+        .filter(computed_status__in=JobRequest.active_statuses)
+        .order_by("pk")
+    )
+
+
+def get_active_job_requests():
     """
-    Retrieve the identifiers of job requests that are considered to be active.
+    Retrieve the job requests that are considered to be active.
 
     An active job request is one that is in an active status (known to be pending or running),
     determined based on its status and the status of its associated jobs OR a job request that
     is in an unknown status (i.e. it may be active, and we need to check for updates).
+
+    Each job request is annotated with its computed_status.
     """
+    return list(_active_job_requests())
 
-    # Find IDs of job requests that are active based on the status of their jobs
-    active_job_jobrequest_ids = (
-        Job.objects.filter(status__in=["pending", "running"])
-        .values_list("job_request_id")
-        .distinct()
-    )
-    # Filter "active" job_requests based on the job_request's status AND the status of its individual jobs.
-    # Note that we use the "private" _status field here; this field can be stale
-    # as the jobs_status property updates it based on job status, so this filter may be over-inclusive.
-    # We also filter JobRequests that we identify by their _status field to only those created within the
-    # past year, to avoid returning any very old job requests that may have unknown status due to
-    # historical differences in the way the job status field was set.
-    one_year_ago = timezone.now() - datetime.timedelta(weeks=52)
-    active_job_requests = JobRequest.objects.filter(
-        Q(
-            _status__in=JobRequest.active_statuses,
-            created_at__gte=one_year_ago,
-        )
-        | Q(id__in=active_job_jobrequest_ids)
-    )
-    # recheck .jobs_status as ._status from the database can be stale
-    return [
-        jr.identifier
-        for jr in active_job_requests
-        if jr.jobs_status in JobRequest.active_statuses
-    ]
+
+def get_active_job_request_identifiers():
+    """
+    Retrieve the identifiers of job requests that are considered to be active.
+
+    See get_active_job_requests for what counts as active.
+    """
+    return list(_active_job_requests().values_list("identifier", flat=True))
 
 
 def rap_status_update(rap_ids):
@@ -63,13 +60,16 @@ def rap_status_update(rap_ids):
             .prefetch_related("jobs")
             .in_bulk(field_name="identifier")
         )
-        # Retrieve all pre-update job statuses for existing jobs before updates so
-        # we can identify those that have newly completed
-        preupdate_job_statuses = {
-            job.identifier: job.status
+        # Retrieve all existing jobs before updates so we can skip those that
+        # haven't changed and identify those that have newly completed
+        preupdate_jobs = {
+            job.identifier: job
             for jr in job_request_by_identifier.values()
             for job in jr.jobs.all()
         }
+        preupdate_job_statuses = {
+            identifier: job.status for identifier, job in preupdate_jobs.items()
+        }
 
         created_job_ids = []
         created_job_identifiers = []
@@ -77,6 +77,9 @@ def rap_status_update(rap_ids):
         updated_job_identifiers = []
         unrecognised_job_identifiers = []
         failed_job_request_identifiers = []
+        skipped_job_identifiers = []
+        jobs_to_upsert = []
+        fields_to_upsert = set()
 
         # Turn job response data into a dict of jobs by rap_id
         # Also remove rap_id from the job data - it's going to be set by
@@ -102,14 +105,21 @@ def rap_status_update(rap_ids):
                 # We now know that they were not successfully created, so we can mark the job request as failed
                 # We don't do anything with job requests that have any other status, because we can't be sure of
                 # why there are no jobs on the controller, so we just log those as errors later.
+                # Only fail it if it still has the status when we write, rather than overwriting a
+                # status written since we loaded it.
                 if (
                     job_request.jobs_status
                     == JobRequestStatus.UNKNOWN_ERROR_CREATING_JOBS
                 ):
-                    job_request.update_status(
-                        JobRequestStatus.FAILED, "Unknown error creating jobs"
+                    failed = JobRequest.objects.filter(
+                        pk=job_request.pk,
+                        _status=JobRequestStatus.UNKNOWN_ERROR_CREATING_JOBS,
+                    ).update(
+                        _status=JobRequestStatus.FAILED,
+                        status_message="Unknown error creating jobs",
                     )
-                    failed_job_request_identifiers.append(rap_id)
+                    if failed:
+                        failed_job_request_identifiers.append(rap_id)
                 continue
 
             # This could happen if the management command is given a rap_id which
@@ -140,15 +150,41 @@ def rap_status_update(rap_ids):
                         status=job_from_api["status"],
                     )
 
-                    job_from_db: Job
-                    # Note: we use update_or_create here as it uses select_for_update behind the
-                    # scenes and locks the row until it's done.
-                    job_from_db, created = job_request.jobs.update_or_create(
-                        identifier=job_from_api["identifier"],
-                        defaults={**job_from_api},
-                    )
+                    # Most jobs report an identical payload on every poll while
+                    # they run, so only write those that differ from our copy
+                    existing_job = preupdate_jobs.get(job_from_api["identifier"])
+                    if existing_job and not job_has_changed(existing_job, job_from_api):
+                        skipped_job_identifiers.append(job_from_api["identifier"])
+                        continue
 
-                    if created:
+                    jobs_to_upsert.append(Job(job_request=job_request, **job_from_api))
+                    fields_to_upsert.update(job_from_api.keys())
+
+        # Write every job in the payload with a single INSERT ... ON CONFLICT
+        # statement, rather than an update_or_create (and its SELECT FOR
+        # UPDATE) per job.
+        if jobs_to_upsert:
+            newly_completed_jobs = []
+            with transaction.atomic():
+                Job.objects.bulk_create(
+                    jobs_to_upsert,
+                    update_conflicts=True,
+                    unique_fields=["identifier"],
+                    update_fields=sorted(fields_to_upsert - {"identifier"}),
+                )
+
+                # Recalculate the status of the job requests we've just written
+                # jobs for, with one aggregate query and at most one bulk update
+                JobRequest.objects.refresh_statuses(
+                    {
+                        job.job_request_id: job.job_request for job in jobs_to_upsert
+                    }.values()
+                )
+
+                for job_from_db in jobs_to_upsert:
+                    job_request = job_from_db.job_request
+
+                    if job_from_db.identifier not in preupdate_job_statuses:
                         created_job_ids.append(job_from_db.id)
                         created_job_identifiers.append(job_from_db.identifier)
                         # For newly created jobs we can't tell if they've just
@@ -160,20 +196,33 @@ def rap_status_update(rap_ids):
                         updated_job_identifiers.append(job_from_db.identifier)
 
                         newly_completed = (
-                            preupdate_job_statuses.get(job_from_db.identifier)
+                            preupdate_job_statuses[job_from_db.identifier]
                             not in COMPLETED_STATES
-                            and job_from_api["status"] in COMPLETED_STATES
+                            and job_from_db.status in COMPLETED_STATES
                         )
 
                     if newly_completed:
-                        logger.debug(
-                            "Newly completed job", job_identifier=job_from_db.identifier
-                        )
-                        convert_runtime_fields(job_from_db)
-                        handle_job_notifications(job_request, job_from_db)
+                        with structlog.contextvars.bound_contextvars(
+                            job_request=job_request.id
+                        ):
+                            logger.debug(
+                                "Newly completed job",
+                                job_identifier=job_from_db.identifier,
+                            )
+                        newly_completed_jobs.append(job_from_db)
 
-                # TODO: Use bulk_create with update_conflicts=True to bulk create or update
+                # Queue notifications in the same transaction as the jobs, so
+                # they're sent (by the send_job_notifications service) if, and
+                # only if, the jobs are written
+                queue_job_notifications(newly_completed_jobs)
 
+        if jobs_to_upsert or skipped_job_identifiers:
+            span.set_attributes(
+                {
+                    "rap_status.skipped_job_count": len(skipped_job_identifiers),
+                    "rap_status.written_job_count": len(jobs_to_upsert),
+                }
+            )
         if created_job_ids or updated_job_ids:
             status_loop_info = {
                 "created_job_ids": created_job_ids,
@@ -228,15 +277,89 @@ def rap_status_update(rap_ids):
             )
 
 
-def convert_runtime_fields(job_from_db):
-    # Ensure datetimes used to calculate runtime in notifications are python
-    # datetimes as expected by the notification code
-    # Datetimes returned in the RAP API response are isoformatted datetime strings
-    # When they are used as defaults in the update_or_create call, the returned
-    # job_from_db object does not yet have the python representations of those strings.
-    # (We could obtain them by calling job_from_db.refresh_from_db(), but this saves an
-    # additional db query)
-    for field in "started_at", "completed_at":
-        value = getattr(job_from_db, field)
-        if isinstance(value, str):  # pragma: no branch
-            setattr(job_from_db, field, datetime.datetime.fromisoformat(value))
+def job_has_changed(job, job_from_api):
+    """
+    Does a job from the RAP API differ from its existing row in the database?
+
+    The RAP API sends JSON, so each value is converted to its python
+    representation by the relevant model field before it is compared.
+    """
+    return any(
+        Job._meta.get_field(key).to_python(value) != getattr(job, key)
+        for key, value in job_from_api.items()
+    )
+
+
+def submit_job_request(job_request):
+    """
+    Ask the RAP API to create jobs for a claimed job request
+
+    The job request's status is updated by request_rap_creation, as it would
+    be for any other RAP.  This waits on the RAP API, so must not be called
+    inside a transaction.
+    """
+    with (
+        structlog.contextvars.bound_contextvars(job_request=job_request.id),
+        tracer.start_as_current_span(
+            "create_rap",
+            attributes={
+                "rap_id": job_request.identifier,
+                "requested_actions": job_request.requested_actions,
+            },
+        ),
+    ):
+        job_request.request_rap_creation()
+
+
+def claim_job_request():
+    """
+    Claim the oldest job request awaiting submission, if there is one
+
+    The job request's claimed_at is set, in a short transaction which skips
+    rows other services have locked, so it is only ever claimed once.  It
+    stays SUBMITTING, which the status service doesn't poll, until the RAP
+    API's response is recorded.  If we die before then, the claim expires
+    after RAP_SUBMISSION_CLAIM_TIMEOUT seconds and the job request is
+    submitted again.
+    """
+    with transaction.atomic():
+        job_request = (
+            JobRequest.objects.awaiting_submission()
+            .select_related("workspace__repo")
+            .select_for_update(skip_locked=True, of=("self",))
+            .order_by("created_at", "pk")
+            .first()
+        )
+        if job_request is not None:
+            job_request.claimed_at = timezone.now()
+            job_request.save(update_fields=["claimed_at"])
+
+    return job_request
+
+
+def submit_job_requests():
+    """
+    Submit a batch of job requests awaiting submission to the RAP API
+
+    Each job request is claimed (see claim_job_request), and then submitted
+    outside of any transaction, so no locks are held while we wait on the RAP
+    API. Up to RAP_SUBMISSION_BATCH_SIZE job requests are submitted, oldest
+    first.
+
+    Returns the number of job requests submitted.
+    """
+    with tracer.start_as_current_span("submit_job_requests") as span:
+        submitted = 0
+
+        while submitted < settings.RAP_SUBMISSION_BATCH_SIZE:
+            job_request = claim_job_request()
+            if job_request is None:
+                break
+
+            submit_job_request(job_request)
+
+            submitted += 1
+
+        span.set_attribute("rap_submission.submitted_count", submitted)
+
+        return submitted
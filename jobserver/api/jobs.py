@@ -1,23 +1,36 @@
-import datetime
 from collections import defaultdict
 
 import structlog
-from django.db.models import Q
+from django.db import transaction
 from django.http import Http404
-from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from jobserver.actions.notifications import queue_job_notifications
 from jobserver.api.authentication import get_backend_from_token
-from jobserver.emails import send_finished_notification
 from jobserver.models import Job, JobRequest, User, Workspace
 
 
 COMPLETED_STATES = {"failed", "succeeded"}
 
+# Job fields which job-runner can change after a Job has been created
+JOB_UPDATE_FIELDS = [
+    "action",
+    "run_command",
+    "status",
+    "status_code",
+    "status_message",
+    "created_at",
+    "updated_at",
+    "started_at",
+    "completed_at",
+    "trace_context",
+    "metrics",
+]
+
 
 logger = structlog.get_logger(__name__)
 
@@ -70,26 +83,32 @@ class JobAPIUpdate(APIView):
         serializer = self.serializer_class(data=request.data, many=True)
         serializer.is_valid(raise_exception=True)
 
-        # get JobRequest instances based on the identifiers in the payload
+        # get JobRequest instances, and their current Jobs, based on the
+        # identifiers in the payload
         incoming_job_request_ids = {
             j["job_request_id"] for j in serializer.validated_data
         }
         job_requests = JobRequest.objects.filter(
             identifier__in=incoming_job_request_ids
-        )
+        ).prefetch_related("jobs")
         job_request_lut = {jr.identifier: jr for jr in job_requests}
 
+        # job-runner shouldn't send us a Job twice, but if it does we keep the
+        # last copy, as applying the payload row by row would, rather than try
+        # to create or update the same Job twice
+        payload_jobs = {j["identifier"]: j for j in serializer.validated_data}
+
         # Map JobRequest identifiers to lists of associated Job instances for iteration.
         jobs_by_request = defaultdict(list)
-        for job in serializer.validated_data:
+        for job in payload_jobs.values():
             jobs_by_request[job["job_request_id"]].append(job)
 
-        created_job_ids = []
-        updated_job_ids = []
+        job_ids_to_delete = []
+        jobs_to_create = []
+        jobs_to_update = []
+        newly_completed_jobs = []
 
         for jr_identifier, jobs in jobs_by_request.items():
-            jobs = list(jobs)
-
             # get the JobRequest for this identifier
             job_request = job_request_lut.get(jr_identifier)
             if job_request is None:
@@ -104,36 +123,32 @@ class JobAPIUpdate(APIView):
             # bind the job request ID to further logs so looking them up in the UI is easier
             structlog.contextvars.bind_contextvars(job_request=job_request.id)
 
-            database_jobs = job_request.jobs.all()
-
             # get the current Jobs for the JobRequest, keyed on their identifier
-            jobs_by_identifier = {j.identifier: j for j in database_jobs}
+            jobs_by_identifier = {j.identifier: j for j in job_request.jobs.all()}
 
             payload_identifiers = {j["identifier"] for j in jobs}
 
             # delete local jobs not in the payload
-            identifiers_to_delete = set(jobs_by_identifier.keys()) - payload_identifiers
-            if identifiers_to_delete:
-                job_request.jobs.filter(identifier__in=identifiers_to_delete).delete()
+            job_ids_to_delete.extend(
+                job.pk
+                for identifier, job in jobs_by_identifier.items()
+                if identifier not in payload_identifiers
+            )
 
             for job_data in jobs:
                 # remove this value from the data, it's going to be set by
-                # creating/updating Job instances via the JobRequest instances
-                # related Jobs manager (ie job_request.jobs)
+                # building Job instances with the JobRequest instance
                 job_data.pop("job_request_id")
 
-                job, created = job_request.jobs.get_or_create(
-                    identifier=job_data["identifier"],
-                    defaults={**job_data},
-                )
-
-                if created:
-                    created_job_ids.append(str(job.id))
+                job = jobs_by_identifier.get(job_data["identifier"])
+                if job is None:
+                    job = Job(job_request=job_request, **job_data)
+                    jobs_to_create.append(job)
                     # For newly created jobs we can't tell if they've just transitioned
                     # to completed so we assume they have to avoid missing notifications
                     newly_completed = job_data["status"] in COMPLETED_STATES
                 else:
-                    updated_job_ids.append(str(job.id))
+                    jobs_to_update.append(job)
                     # check to see if the Job is about to transition to completed
                     # (failed or succeeded) so we can notify after the update
                     newly_completed = (
@@ -145,36 +160,35 @@ class JobAPIUpdate(APIView):
                     # status transition
                     for key, value in job_data.items():
                         setattr(job, key, value)
-                    job.save()
 
                 # We only send notifications or alerts for newly completed jobs
                 if newly_completed:
-                    # round trip the Job to the db so all fields are converted to their
-                    # python representations as expected by the notification code
-                    job.refresh_from_db()
-                    handle_job_notifications(job_request, job)
+                    newly_completed_jobs.append(job)
+
+        # Write the whole payload with a fixed number of statements, however
+        # many jobs job-runner sends us
+        with transaction.atomic():
+            if job_ids_to_delete:
+                Job.objects.filter(pk__in=job_ids_to_delete).delete()
+            if jobs_to_create:
+                Job.objects.bulk_create(jobs_to_create)
+            if jobs_to_update:
+                Job.objects.bulk_update(jobs_to_update, JOB_UPDATE_FIELDS)
+
+            # Queue notifications in the same transaction as the jobs, so
+            # they're sent (by the send_job_notifications service) if, and
+            # only if, the jobs are written
+            queue_job_notifications(newly_completed_jobs)
 
         logger.info(
             "Created or updated Jobs",
-            created_job_ids=",".join(created_job_ids),
-            updated_job_ids=",".join(updated_job_ids),
+            created_job_ids=",".join(str(job.id) for job in jobs_to_create),
+            updated_job_ids=",".join(str(job.id) for job in jobs_to_update),
         )
 
         return Response({"status": "success"}, status=200)
 
 
-def handle_job_notifications(job_request, job):
-    if job_request.will_notify:
-        send_finished_notification(
-            job_request.created_by.email,
-            job,
-        )
-        logger.info(
-            "Notified requesting user of completed job",
-            user_id=job_request.created_by_id,
-        )
-
-
 class WorkspaceSerializer(serializers.ModelSerializer):
     created_by = serializers.CharField(source="created_by.username", default=None)
     repo = serializers.CharField(source="repo.url", default=None)
@@ -236,31 +250,16 @@ class JobRequestAPIList(ListAPIView):
         return response
 
     def get_queryset(self):
-        active_job_request_ids = (
-            Job.objects.filter(status__in=["pending", "running"])
-            .values_list("job_request_id")
-            .distinct()
-        )
-
         backend_slug = getattr(self.backend, "slug", None)
         # Job requests use the RAP API on creation to create jobs (in the RAP controller, not in jobserver),
         # and are acknowledged immediately (they may legitimately have 0 jobs).
         # Filter "active" job_requests based on the job_request's status and the status of its individual jobs.
-        # Note that we use the "private" _status field here; this field can be stale
+        # Note that active() uses the "private" _status field; this field can be stale
         # as the jobs_status property updates it based on job status. However, if anything it
         # should be over-inclusive and ensure that we retrieve status updates for any job requests
         # that have been initially set to pending or unknown, but may not have jobs created yet.
-        # We also filter JobRequests that we identify by their _status field to only those created within the
-        # past 365 days, to avoid returning any very old job requests that may have unknown status due to
-        # historical differences in the way the job status field was set.
         qs = (
-            JobRequest.objects.filter(
-                Q(
-                    _status__in=JobRequest.active_statuses,
-                    created_at__gte=timezone.now() - datetime.timedelta(365),
-                )
-                | Q(id__in=active_job_request_ids)
-            )
+            JobRequest.objects.active()
             .select_related(
                 "backend",
                 "created_by",
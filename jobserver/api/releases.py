@@ -1,3 +1,4 @@
+from collections import defaultdict
 from email.message import Message
 
 import sentry_sdk
@@ -17,7 +18,7 @@ from rest_framework.exceptions import (
     ValidationError,
 )
 from rest_framework.generics import RetrieveAPIView
-from rest_framework.parsers import FileUploadParser, JSONParser
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
@@ -32,6 +33,7 @@ from jobserver.authorization import (
 from jobserver.authorization.permissions import Permission
 from jobserver.models import (
     Project,
+    ProjectCollaboration,
     PublishRequest,
     Release,
     ReleaseFile,
@@ -53,10 +55,13 @@ def get_filename(headers):
     """
     Get the filename from the Content-Disposition header
 
-    DRF validates and parses the Content-Disposition header, but sadly
-    strips any directory paths from the filename. We need those paths, so
-    we need to reparse the header to get them.
+    We parse the header with the stdlib rather than Django or DRF's helpers
+    because those strip any directory paths from the filename, and we need
+    those paths.  Returns None if there's no filename.
     """
+    if "Content-Disposition" not in headers:
+        return None
+
     m = Message()
     m["Content-Disposition"] = headers["Content-Disposition"]
     return m.get_filename()
@@ -279,31 +284,39 @@ class ReleaseWorkspaceAPI(APIView):
 class ReleaseAPI(APIView):
     authentication_classes = [SessionAuthentication]
 
-    # DRF file upload does not use multipart, is just a simple byte stream
-    parser_classes = [FileUploadParser]
+    # The upload is not multipart, just the file's bytes as the request body,
+    # which we read from request.stream ourselves rather than with a parser.
+    parser_classes = []
 
     def post(self, request, release_id):
         """Upload a file for this Release.
 
         File must be listed in Release.requested_files, and the hash must match.
+
+        The request body is streamed straight into the release's storage as
+        it's hashed, rather than parsed into an uploaded file first, which
+        Django would spool to a temporary file for anything over
+        FILE_UPLOAD_MAX_MEMORY_SIZE, writing large files to disk twice.
         """
         release = get_object_or_404(Release, id=release_id)
         backend, user = validate_upload_access(request, release.workspace)
 
-        # Django's InMemoryUploadedFile only reads the number of bytes
-        # specified in the Content-Length header so we can rely on just
-        # checking that instead of checking the file size as well.
+        # Django's request stream only reads the number of bytes specified in
+        # the Content-Length header so we can rely on just checking that
+        # instead of checking the file size as well.
         content_length = request.headers.get("Content-Length")
         if content_length and int(content_length) > settings.RELEASE_FILE_SIZE_LIMIT:
             size_limit = to_mb(settings.RELEASE_FILE_SIZE_LIMIT)
             raise ValidationError(f"File is too large, it must be below {size_limit}")
 
-        try:
-            upload = request.data["file"]
-        except KeyError:
+        # DRF gives us no stream when the body is empty
+        upload = request.stream
+        if upload is None:
             raise ValidationError({"detail": "No data uploaded"})
 
         filename = get_filename(request.headers)
+        if not filename:
+            raise ValidationError({"detail": "Missing filename"})
 
         if filename not in {f["name"] for f in release.requested_files}:
             raise ValidationError(
@@ -342,6 +355,105 @@ class ReleaseAPI(APIView):
         return Response(generate_index(files))
 
 
+class ReleaseFilesAPI(APIView):
+    """
+    Upload many of a Release's files in one request
+
+    Each file is a part of a multipart body, with the part's field name being
+    the file's name in the Release.  We authenticate once for the whole
+    request, and handle each file on its own, so one bad file doesn't stop the
+    rest being released; the response lists each file's result.  Clients can
+    send several batches concurrently, up to DATA_UPLOAD_MAX_NUMBER_FILES files
+    each, and resume an interrupted upload by asking which files are still
+    missing.
+    """
+
+    authentication_classes = [SessionAuthentication]
+    parser_classes = [MultiPartParser]
+
+    def get(self, request, release_id):
+        """List the requested files which haven't been uploaded yet."""
+        release = get_object_or_404(Release, id=release_id)
+        validate_upload_access(request, release.workspace)
+
+        uploaded = set(
+            release.files.filter(uploaded_at__isnull=False).values_list(
+                "name", flat=True
+            )
+        )
+        missing = [
+            {"name": f["name"], "sha256": f.get("sha256")}
+            for f in release.requested_files
+            if f["name"] not in uploaded
+        ]
+
+        return Response({"missing": missing})
+
+    def post(self, request, release_id):
+        release = get_object_or_404(Release, id=release_id)
+        backend, user = validate_upload_access(request, release.workspace)
+
+        # ensure this is being released from the same backend as the Release
+        # was created from
+        if release.backend != backend:
+            raise ValidationError(
+                {
+                    "detail": f"Release is from backend {release.backend.slug} not {backend.slug}"
+                }
+            )
+
+        if not request.FILES:
+            raise ValidationError({"detail": "No data uploaded"})
+
+        requested = {f["name"] for f in release.requested_files}
+        size_limit = to_mb(settings.RELEASE_FILE_SIZE_LIMIT)
+
+        results = {}
+        for filename, upload in request.FILES.items():
+            if filename not in requested:
+                results[filename] = {
+                    "status": "error",
+                    "detail": f"File {filename} not requested in release {release.id}",
+                }
+                continue
+
+            if upload.size > settings.RELEASE_FILE_SIZE_LIMIT:
+                results[filename] = {
+                    "status": "error",
+                    "detail": f"File is too large, it must be below {size_limit}",
+                }
+                continue
+
+            try:
+                rfile = releases.handle_file_upload(
+                    release, backend, user, upload, filename
+                )
+            except (
+                releases.ReleaseFileAlreadyExists,
+                releases.ReleaseFileHashMismatch,
+            ) as exc:
+                results[filename] = {"status": "error", "detail": str(exc)}
+                continue
+
+            results[filename] = {
+                "status": "uploaded",
+                "id": rfile.id,
+                "url": request.build_absolute_uri(rfile.get_api_url()),
+            }
+
+        # every file's result is listed, so the client knows which were stored
+        # and which to try again.  The status says whether all (201), some
+        # (207), or none (400) of them were stored.
+        uploaded = [r for r in results.values() if r["status"] == "uploaded"]
+        if len(uploaded) == len(results):
+            status = 201
+        elif uploaded:
+            status = 207
+        else:
+            status = 400
+        return Response({"files": results}, status=status)
+
+
 class ReleaseFileAPI(APIView):
     authentication_classes = [SessionAuthentication]
 
@@ -512,39 +624,60 @@ ONGOING_PROJECT_STATUSES = {
 }
 
 
-def build_level4_workspace(workspace, project):
+def build_level4_workspace(workspace, project, orgs):
     return {
         "project_details": {
             "name": project.name,
             "ongoing": project.status in ONGOING_PROJECT_STATUSES,
-            # If we have more than one org, always return the lead org first
-            "orgs": list(
-                project.orgs.order_by("-collaborations__is_lead").values_list(
-                    "name", flat=True
-                )
-            ),
+            "orgs": orgs,
         },
         "archived": workspace["is_archived"],
     }
 
 
 def build_level4_user(user):
-    workspaces = {}
-    copiloted_workspaces = {}
-
-    # this is 1 or 2 queries per project, not ideal, but the permissions are not stored in the db
-    for project in user.projects.all():
-        if has_permission(user, Permission.UNRELEASED_OUTPUTS_VIEW, project=project):
-            for workspace in project.workspaces.all().values("name", "is_archived"):
-                workspaces[workspace["name"]] = build_level4_workspace(
-                    workspace, project
-                )
+    # permissions aren't stored in the db, so we load the user's memberships
+    # and check their roles here, then fetch the workspaces and orgs for every
+    # project we need in one go, keeping this to a fixed number of queries
+    # however many projects the user is on
+    projects = [
+        m.project
+        for m in user.project_memberships.select_related("project")
+        if any(
+            Permission.UNRELEASED_OUTPUTS_VIEW in role.permissions
+            for role in [*user.roles, *m.roles]
+        )
+    ]
+    copiloted_projects = list(Project.objects.filter(copilot=user))
 
-    for project in Project.objects.filter(copilot=user):
-        for workspace in project.workspaces.all().values("name", "is_archived"):
-            copiloted_workspaces[workspace["name"]] = build_level4_workspace(
-                workspace, project
+    project_ids = {p.pk for p in projects + copiloted_projects}
+
+    workspaces_by_project = defaultdict(list)
+    for workspace in Workspace.objects.filter(project_id__in=project_ids).values(
+        "name", "is_archived", "project_id"
+    ):
+        workspaces_by_project[workspace["project_id"]].append(workspace)
+
+    # If we have more than one org, always return the lead org first
+    orgs_by_project = defaultdict(list)
+    for project_id, org_name in (
+        ProjectCollaboration.objects.filter(project_id__in=project_ids)
+        .order_by("-is_lead", "pk")
+        .values_list("project_id", "org__name")
+    ):
+        orgs_by_project[project_id].append(org_name)
+
+    def build_workspaces(projects):
+        return {
+            workspace["name"]: build_level4_workspace(
+                workspace, project, orgs_by_project[project.pk]
             )
+            for project in projects
+            for workspace in workspaces_by_project[project.pk]
+        }
+
+    workspaces = build_workspaces(projects)
+    copiloted_workspaces = build_workspaces(copiloted_projects)
 
     # using a DRF serializer for now, so we've *some* schema definition
     level4_user = Level4AuthenticatedUser(
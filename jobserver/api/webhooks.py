@@ -0,0 +1,196 @@
+import hashlib
+import hmac
+from datetime import UTC, datetime
+
+import structlog
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+from rest_framework.exceptions import NotAuthenticated, PermissionDenied
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from jobserver.models import Repo
+
+
+logger = structlog.get_logger(__name__)
+
+
+def verify_signature(body, signature):
+    """
+    Check a webhook delivery was signed with our secret
+
+    GitHub signs the raw request body with HMAC-SHA256, and sends the digest
+    in the X-Hub-Signature-256 header as "sha256=<hexdigest>".
+    """
+    if not settings.GITHUB_WEBHOOK_SECRET:
+        raise PermissionDenied("GitHub webhooks are not configured")
+
+    if not signature:
+        raise NotAuthenticated("X-Hub-Signature-256 header is missing")
+
+    expected = hmac.new(
+        settings.GITHUB_WEBHOOK_SECRET.encode(), body, hashlib.sha256
+    ).hexdigest()
+
+    if not hmac.compare_digest(f"sha256={expected}", signature):
+        raise NotAuthenticated("Invalid signature")
+
+
+def parse_timestamp(value):
+    """
+    Parse a timestamp from a webhook payload
+
+    Most payloads use ISO 8601 strings, but push payloads use Unix timestamps
+    for the repository's dates.
+    """
+    if value is None:
+        return None
+
+    if isinstance(value, int):
+        return datetime.fromtimestamp(value, tz=UTC)
+
+    return parse_datetime(value)
+
+
+class TimestampField(serializers.Field):
+    """A timestamp from a webhook payload, as parsed by parse_timestamp"""
+
+    def to_internal_value(self, data):
+        if not isinstance(data, int | str) or isinstance(data, bool):
+            raise serializers.ValidationError("Expected a timestamp")
+
+        try:
+            value = parse_timestamp(data)
+        except (OverflowError, OSError, ValueError):
+            value = None
+
+        if value is None:
+            raise serializers.ValidationError("Expected a timestamp")
+
+        return value
+
+
+class RepositorySerializer(serializers.Serializer):
+    """The parts of a payload's repository we use"""
+
+    html_url = serializers.URLField()
+    private = serializers.BooleanField()
+    topics = serializers.ListField(child=serializers.CharField(), default=list)
+    default_branch = serializers.CharField(
+        allow_blank=True, allow_null=True, default=""
+    )
+    created_at = TimestampField(allow_null=True, default=None)
+    pushed_at = TimestampField(allow_null=True, default=None)
+
+
+class PushSerializer(serializers.Serializer):
+    repository = RepositorySerializer()
+
+
+class RepositoryEventSerializer(serializers.Serializer):
+    action = serializers.CharField()
+    repository = RepositorySerializer()
+
+
+def get_repo_for_update(repository):
+    """Lock the Repo a payload is about, if we know about it"""
+    return (
+        Repo.objects.select_for_update()
+        .filter(url__iexact=repository["html_url"])
+        .first()
+    )
+
+
+def update_metadata(repo, repository):
+    """Copy the metadata we mirror from a payload's repository onto repo"""
+    repo.is_private = repository["private"]
+    repo.topics = repository["topics"]
+    repo.default_branch = repository["default_branch"] or ""
+    repo.created_at = repository["created_at"]
+    repo.pushed_at = repository["pushed_at"]
+    repo.metadata_updated_at = timezone.now()
+
+
+def handle_push(payload):
+    with transaction.atomic():
+        repo = get_repo_for_update(payload["repository"])
+        if repo is None:
+            return
+
+        # GitHub doesn't promise to deliver webhooks in order, so we ignore a
+        # push older than the last one we've heard about
+        pushed_at = payload["repository"]["pushed_at"]
+        if repo.pushed_at and pushed_at and pushed_at < repo.pushed_at:
+            return
+
+        update_metadata(repo, payload["repository"])
+        repo.save()
+
+    logger.info("Updated repo from push webhook", repo=repo.url)
+
+
+def handle_repository(payload):
+    if payload["action"] == "deleted":
+        return
+
+    with transaction.atomic():
+        repo = get_repo_for_update(payload["repository"])
+        if repo is None:
+            return
+
+        update_metadata(repo, payload["repository"])
+        repo.save()
+
+    logger.info(
+        "Updated repo from repository webhook",
+        repo=repo.url,
+        action=payload["action"],
+    )
+
+
+# the payload serializer and handler for each event we subscribe to
+EVENT_HANDLERS = {
+    "push": (PushSerializer, handle_push),
+    "repository": (RepositoryEventSerializer, handle_repository),
+}
+
+
+class GitHubWebhookAPI(APIView):
+    """
+    Receive webhook deliveries from GitHub
+
+    These keep the metadata we mirror onto Repo up to date as things change,
+    rather than when update_repo_metadata next polls.  Nothing else needs
+    invalidating: files are cached by commit sha, which never changes, and
+    GitHub responses are always revalidated with their ETags.
+    """
+
+    authentication_classes = []
+    permission_classes = []
+
+    def initial(self, request, *args, **kwargs):
+        verify_signature(request.body, request.headers.get("X-Hub-Signature-256"))
+
+        return super().initial(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        event = request.headers.get("X-GitHub-Event")
+
+        if event not in EVENT_HANDLERS:
+            # GitHub sends a ping when a webhook is set up, and we only
+            # subscribe to events we handle, so there's nothing to do here
+            return Response({"status": "ignored"}, status=200)
+
+        serializer_class, handler = EVENT_HANDLERS[event]
+
+        # a correctly signed payload should still be well formed, but we check
+        # rather than fail on it
+        serializer = serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        handler(serializer.validated_data)
+
+        return Response({"status": "success"}, status=200)
@@ -9,9 +9,43 @@ optional relationship.
 Each function is expected to handle the lookup of Roles in a given relationship.
 """
 
+import itertools
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+# Bumped whenever a ProjectMembership changes, so Roles cached on a User
+# instance are never used after the membership they came from has changed.
+_memberships_version = itertools.count()
+_current_version = next(_memberships_version)
+
+
+@receiver(post_delete, sender="jobserver.ProjectMembership")
+@receiver(post_save, sender="jobserver.ProjectMembership")
+def clear_project_roles_cache(**kwargs):
+    global _current_version
+
+    _current_version = next(_memberships_version)
+
 
 def get_project_roles_for_user(project, user):
-    try:
-        return project.memberships.get(user=user).roles
-    except project.memberships.model.DoesNotExist:
-        return []
+    """
+    Get the User's Roles on the Project
+
+    A view will often check a few permissions for the same User and Project,
+    so we cache the Roles on the User instance, which lives for as long as the
+    request does.
+    """
+    version, cache = getattr(user, "_project_roles_cache", (None, None))
+    if version != _current_version:
+        cache = {}
+        user._project_roles_cache = (_current_version, cache)
+
+    if project.pk not in cache:
+        try:
+            cache[project.pk] = project.memberships.get(user=user).roles
+        except project.memberships.model.DoesNotExist:
+            cache[project.pk] = []
+
+    return cache[project.pk]
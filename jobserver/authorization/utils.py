@@ -1,3 +1,4 @@
+import functools
 import inspect
 import itertools
 
@@ -94,20 +95,28 @@ def _get_roles(user, **context):
     return roles
 
 
+@functools.cache
+def _get_permissions(roles):
+    """
+    Get the set of Permissions granted by the given Roles
+
+    Roles are classes which don't change at runtime, and most requests see the
+    same few combinations of them, so we only flatten each combination once.
+    """
+    # Flatten each Roles permissions list into a single iterable
+    permissions = itertools.chain.from_iterable(r.permissions for r in roles)
+
+    return frozenset(permissions)
+
+
 def has_permission(user, permission, **context):
     if not user.is_authenticated:
         return False
 
     roles = _get_roles(user, **context)
 
-    # Flatten each Roles permissions list into a single iterable
-    permissions = itertools.chain.from_iterable(r.permissions for r in roles)
-
-    # convert the itertools.chain generator into a set so we can check membership
-    permissions = set(permissions)
-
     # return a boolean for whether the requested permission is in that set
-    return permission in permissions
+    return permission in _get_permissions(frozenset(roles))
 
 
 def has_role(user, role, **context):
@@ -0,0 +1,31 @@
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+
+
+class SizeBoundedLocMemCache(LocMemCache):
+    """
+    A LocMemCache which is bounded by the size of its values, as well as by
+    how many there are
+
+    LocMemCache only limits the number of entries, which doesn't bound its
+    memory use when values vary a lot in size.  This evicts the least recently
+    used entries once the pickled values add up to more than the MAX_SIZE
+    option, in bytes.  Like any LocMemCache, each process has its own.
+    """
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+
+        options = params.get("OPTIONS", {})
+        self._max_size = int(options.get("MAX_SIZE", 32 * 1024 * 1024))
+
+    def _set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        # this is called with the cache's lock held
+        super()._set(key, value, timeout)
+
+        # values are pickled bytes, and the least recently used are at the end
+        size = sum(len(v) for v in self._cache.values())
+        while size > self._max_size and self._cache:
+            old_key, old_value = self._cache.popitem()
+            del self._expire_info[old_key]
+            size -= len(old_value)
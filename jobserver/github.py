@@ -1,10 +1,13 @@
+import hashlib
 import json
 from datetime import UTC, datetime
 
 import requests
 import structlog
 from django.conf import settings
+from django.core.cache import cache
 from furl import furl
+from requests.structures import CaseInsensitiveDict
 
 
 logger = structlog.getLogger(__name__)
@@ -80,7 +83,7 @@ class GitHubAPI:
     def _post(self, *args, **kwargs):
         return self._request("post", *args, **kwargs)
 
-    def _request(self, method, *args, **kwargs):
+    def _request(self, method, url, **kwargs):
         """
         Make a request to the remote GitHub API.
 
@@ -92,6 +95,11 @@ class GitHubAPI:
         tokens (e.g., for production, CI verification tests, or unauthenticated
         queries) without setting the header globally on the session.
 
+        GET responses are cached with their validators (ETag/Last-Modified) and
+        repeat requests are made conditionally. GitHub answers those with a
+        304, which doesn't count against our rate limit, when nothing has
+        changed, and we serve the cached response instead.
+
         Raises locally-defined Exceptions for common connection errors.
         """
         headers = kwargs.pop("headers", {})
@@ -99,13 +107,73 @@ class GitHubAPI:
         if self.token and "Authorization" not in headers:
             headers = headers | {"Authorization": f"bearer {self.token}"}
 
+        if method != "get" or not settings.GITHUB_API_CACHE_TTL:
+            return self._send(method, url, headers=headers, **kwargs)
+
+        cache_key = self._cache_key(url, kwargs.get("params"), headers)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            headers = headers | cached["validators"]
+
+        r = self._send(method, url, headers=headers, **kwargs)
+
+        if cached is not None and r.status_code == 304:
+            logger.debug("Serving GitHub response from cache", url=url)
+            return self._cached_response(cached, r)
+
+        validators = {}
+        if etag := r.headers.get("ETag"):
+            validators["If-None-Match"] = etag
+        if last_modified := r.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = last_modified
+
+        if r.status_code == 200 and validators:
+            cached = {
+                "validators": validators,
+                "headers": dict(r.headers),
+                "content": r.content,
+                "encoding": r.encoding,
+            }
+            cache.set(cache_key, cached, settings.GITHUB_API_CACHE_TTL)
+
+        return r
+
+    def _send(self, method, url, **kwargs):
         try:
-            return self.session.request(method, *args, headers=headers, **kwargs)
+            return self.session.request(method, url, **kwargs)
         except requests.Timeout as exc:
             raise Timeout(exc)
         except requests.ConnectionError as exc:
             raise ConnectionException(exc)
 
+    def _cache_key(self, url, params, headers):
+        """
+        Build the cache key for a GET request
+
+        Responses vary by URL (including query params) and Accept header. We
+        include a hash of the Authorization header too, since different tokens
+        can see different things.
+        """
+        parts = [
+            url,
+            sorted((params or {}).items()),
+            headers.get("Accept", ""),
+            headers.get("Authorization", ""),
+        ]
+        digest = hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+        return f"{__name__}.response:{digest}"
+
+    def _cached_response(self, cached, not_modified):
+        """Rebuild the response we cached, in place of a 304 response"""
+        response = requests.Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict(cached["headers"])
+        response.encoding = cached["encoding"]
+        response._content = cached["content"]
+        response.url = not_modified.url
+        response.request = not_modified.request
+        return response
+
     def _raise_for_status(self, request):
         try:
             request.raise_for_status()
@@ -444,6 +512,33 @@ class GitHubAPI:
 
         return branch["commit"]["sha"]
 
+    def get_commit_sha(self, org, repo, ref):
+        """
+        Resolve any ref GitHub understands (a branch, tag, or short sha) to the
+        full sha of the commit it points at
+        """
+        path_segments = [
+            "repos",
+            org,
+            repo,
+            "commits",
+            ref,
+        ]
+        url = self._url(path_segments)
+
+        headers = {
+            "Accept": "application/vnd.github.sha",
+        }
+        r = self._get(url, headers=headers)
+
+        # GitHub responds with a 422 when there's no commit for the ref
+        if r.status_code in (404, 422):
+            return
+
+        self._raise_for_status(r)
+
+        return r.text
+
     def get_file(self, org, repo, branch, filepath="project.yaml"):
         path_segments = [
             "repos",
@@ -576,9 +671,15 @@ class GitHubAPI:
                 "branches": branches,
             }
 
-    def get_repos_with_dates(self, org):
+    def get_repos_with_metadata(self, org):
+        """
+        Get the metadata we mirror into Repo for every repo in the given org
+
+        This uses the GraphQL API so the whole org can be fetched in a handful
+        of requests, rather than one REST call per repo.
+        """
         query = """
-        query reposAndBranches($cursor: String, $org_name: String!) {
+        query reposWithMetadata($cursor: String, $org_name: String!) {
           organization(login: $org_name) {
             repositories(first: 100, after: $cursor) {
               nodes {
@@ -586,6 +687,10 @@ class GitHubAPI:
                 url
                 isPrivate
                 createdAt
+                pushedAt
+                defaultBranchRef {
+                  name
+                }
                 repositoryTopics(first: 100) {
                   nodes {
                     topic {
@@ -602,12 +707,15 @@ class GitHubAPI:
           }
         }
         """
+
+        def parse_date(value):
+            if value is None:
+                return None
+
+            return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=UTC)
+
         results = list(self._iter_query_results(query, org_name=org))
         for repo in results:
-            created_at = datetime.strptime(
-                repo["createdAt"], "%Y-%m-%dT%H:%M:%SZ"
-            ).replace(tzinfo=UTC)
-
             topics = []
             if repo["repositoryTopics"]["nodes"]:
                 topics = [
@@ -616,39 +724,21 @@ class GitHubAPI:
                     if n is not None
                 ]
 
+            # empty repos have no default branch
+            default_branch = ""
+            if repo["defaultBranchRef"]:
+                default_branch = repo["defaultBranchRef"]["name"]
+
             yield {
                 "name": repo["name"],
                 "url": repo["url"],
                 "is_private": repo["isPrivate"],
-                "created_at": created_at,
+                "created_at": parse_date(repo["createdAt"]),
+                "pushed_at": parse_date(repo["pushedAt"]),
+                "default_branch": default_branch,
                 "topics": topics,
             }
 
-    def get_repos_with_status_and_url(self, orgs):
-        query = """
-        query reposWithStatusAndURL($cursor: String, $org_name: String!) {
-          organization(login: $org_name) {
-            repositories(first: 100, after: $cursor) {
-              nodes {
-                url
-                isPrivate
-              }
-              pageInfo {
-                  endCursor
-                  hasNextPage
-              }
-            }
-          }
-        }
-        """
-        for org in orgs:
-            results = list(self._iter_query_results(query, org_name=org))
-            for repo in results:
-                yield {
-                    "is_private": repo["isPrivate"],
-                    "url": repo["url"],
-                }
-
 
 def _get_github_api():
     """Simple invocation wrapper of GitHubAPI"""
@@ -1,8 +1,8 @@
-from django.db import transaction
 from django_extensions.management.jobs import DailyJob
 from sentry_sdk.crons.decorator import monitor
 
 from jobserver.github import _get_github_api
+from jobserver.model_utils import bulk_update_changed
 from jobserver.models import Repo
 from services.sentry import monitor_config
 
@@ -47,7 +47,10 @@ class Job(DailyJob):
         results = _get_github_api()._iter_query_results(query, org_name="opensafely")
         has_outputs_by_url = {r["url"]: "github-releases" in topics(r) for r in results}
 
-        with transaction.atomic():
-            for repo in Repo.objects.all():
-                repo.has_github_outputs = has_outputs_by_url.get(repo.url, False)
-                repo.save(update_fields=["has_github_outputs"])
+        bulk_update_changed(
+            Repo.objects.only("pk", "url", "has_github_outputs"),
+            ["has_github_outputs"],
+            lambda repo: {
+                "has_github_outputs": has_outputs_by_url.get(repo.url, False)
+            },
+        )
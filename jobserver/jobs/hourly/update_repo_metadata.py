@@ -0,0 +1,98 @@
+import structlog
+from django.db import transaction
+from django.utils import timezone
+from django_extensions.management.jobs import HourlyJob
+from sentry_sdk.crons.decorator import monitor
+
+from jobserver.github import GitHubError, _get_github_api
+from jobserver.model_utils import bulk_update_changed
+from jobserver.models import Repo
+from services.sentry import monitor_config
+
+
+logger = structlog.get_logger(__name__)
+
+# Repo fields which mirror a key of the same name from get_repos_with_metadata()
+METADATA_FIELDS = [
+    "is_private",
+    "topics",
+    "default_branch",
+    "created_at",
+    "pushed_at",
+]
+
+
+class Job(HourlyJob):
+    help = "Mirror GitHub metadata (privacy, topics, dates, default branch) into Repo"
+
+    get_github_api = staticmethod(_get_github_api)
+
+    @monitor(
+        monitor_slug="update_repo_metadata",
+        monitor_config=monitor_config("0 * * * *"),
+    )
+    def execute(self):
+        orgs = {
+            r.owner
+            for r in Repo.objects.filter(url__startswith="https://github.com/").only(
+                "url"
+            )
+        }
+
+        # GitHub gives us canonical URLs, which don't always match the case of
+        # the URLs we were given when workspaces were created
+        metadata_by_url = {}
+        for org in sorted(orgs):
+            try:
+                results = list(self.get_github_api().get_repos_with_metadata(org))
+            except GitHubError:
+                logger.exception("Failed to get repo metadata from GitHub", org=org)
+                continue
+
+            metadata_by_url |= {r["url"].lower(): r for r in results}
+
+        # Webhooks can update a Repo while we're fetching from GitHub, so we
+        # lock and re-read the rows now, and leave alone any a webhook has
+        # told us about more recently than our fetch
+        with transaction.atomic():
+            repos = list(
+                Repo.objects.select_for_update().filter(
+                    url__startswith="https://github.com/"
+                )
+            )
+
+            def get_metadata(repo):
+                metadata = metadata_by_url.get(repo.url.lower())
+                if metadata is None:
+                    return None
+
+                if (
+                    repo.pushed_at
+                    and metadata["pushed_at"]
+                    and repo.pushed_at > metadata["pushed_at"]
+                ):
+                    return None
+
+                return metadata
+
+            def get_values(repo):
+                metadata = get_metadata(repo)
+                if metadata is None:
+                    return {}
+
+                return {field: metadata[field] for field in METADATA_FIELDS}
+
+            # only write the repos which have changed since we last looked, so
+            # a typical run is a handful of GraphQL pages and a small UPDATE
+            updated_count = bulk_update_changed(
+                repos,
+                METADATA_FIELDS,
+                get_values,
+                changed_values={"metadata_updated_at": timezone.now()},
+            )
+
+        logger.info(
+            "Updated repo metadata",
+            checked_count=len(repos),
+            updated_count=updated_count,
+        )
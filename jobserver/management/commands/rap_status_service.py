@@ -1,15 +1,21 @@
 """Management command to continually update the status of all active Jobs via the RAP API."""
 
 import argparse
+import concurrent.futures
+import random
 import time
+from datetime import timedelta
 
 import django.db
 import sentry_sdk
 import structlog
 from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.utils import timezone
 
-from jobserver.actions.rap import get_active_job_request_identifiers, rap_status_update
+from jobserver import rap_api
+from jobserver.actions.rap import get_active_job_requests, rap_status_update
+from jobserver.models import JobRequestStatus
 
 
 logger = structlog.get_logger(__name__)
@@ -26,6 +32,93 @@ def safe_close_old_db_connections():
         sentry_sdk.capture_exception(exc)
 
 
+def shard_rap_ids(rap_ids, shard_size):
+    """Split RAP ids into chunks of at most shard_size, preserving their order."""
+    return [rap_ids[i : i + shard_size] for i in range(0, len(rap_ids), shard_size)]
+
+
+def update_shard(rap_ids):
+    """Update the status of one shard of RAPs, returning any error raised.
+
+    Errors are logged and swallowed here so that one slow or failing shard
+    doesn't stop the other shards being updated. This runs in a worker thread,
+    which has its own database connection, so we tidy that up here too.
+    """
+    try:
+        rap_status_update(rap_ids)
+    except Exception as exc:
+        logger.error(exc, rap_ids=rap_ids)
+        sentry_sdk.capture_exception(exc)
+        return exc
+    finally:
+        safe_close_old_db_connections()
+
+
+class PollScheduler:
+    """Decide which RAPs to poll each cycle and how long to wait between cycles.
+
+    Running and recently created RAPs are polled every cycle, while RAPs which
+    have been pending (or in an unknown state) for a while are only polled
+    every RAP_API_SLOW_POLL_INTERVAL seconds.
+
+    When the RAP API is failing we back off exponentially, with jitter, up to
+    RAP_API_MAX_BACKOFF seconds between cycles. Otherwise we wait whatever is
+    left of RAP_API_POLL_INTERVAL, which is nothing if the cycle overran.
+    """
+
+    def __init__(self):
+        self.last_polled = {}
+        self.consecutive_failures = 0
+
+    def is_hot(self, job_request, now):
+        recent = timedelta(seconds=settings.RAP_API_RECENT_JOB_REQUEST_AGE)
+        return (
+            job_request.computed_status == JobRequestStatus.RUNNING
+            or now - job_request.created_at < recent
+        )
+
+    def due(self, job_requests):
+        """Return the identifiers of the given active job requests to poll now."""
+        now = timezone.now()
+        slow_interval = timedelta(seconds=settings.RAP_API_SLOW_POLL_INTERVAL)
+
+        # forget about RAPs which are no longer active
+        identifiers = {jr.identifier for jr in job_requests}
+        self.last_polled = {
+            k: v for k, v in self.last_polled.items() if k in identifiers
+        }
+
+        return [
+            jr.identifier
+            for jr in job_requests
+            if self.is_hot(jr, now)
+            or jr.identifier not in self.last_polled
+            or now - self.last_polled[jr.identifier] >= slow_interval
+        ]
+
+    def record_polled(self, rap_ids):
+        now = timezone.now()
+        for rap_id in rap_ids:
+            self.last_polled[rap_id] = now
+
+    def record_cycle(self, failed):
+        if failed:
+            self.consecutive_failures += 1
+        else:
+            self.consecutive_failures = 0
+
+    def sleep_time(self, elapsed):
+        """How long to sleep after a cycle that took elapsed seconds."""
+        if self.consecutive_failures:
+            delay = min(
+                settings.RAP_API_MAX_BACKOFF,
+                settings.RAP_API_POLL_INTERVAL * 2**self.consecutive_failures,
+            )
+            return random.uniform(delay / 2, delay)
+
+        return max(0, settings.RAP_API_POLL_INTERVAL - elapsed)
+
+
 class Command(BaseCommand):
     """Management command to continually update the status of all active Jobs via the RAP API."""
 
@@ -38,15 +131,43 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         run_fn = options["run_fn"]
-        while run_fn():
-            try:
-                active_job_requests_ids = get_active_job_request_identifiers()
-                logger.info("Active rap ids", rap_ids=active_job_requests_ids)
-                rap_status_update(active_job_requests_ids)
-            except Exception as exc:
-                logger.error(exc)
-                sentry_sdk.capture_exception(exc)
-            finally:
-                safe_close_old_db_connections()
-
-            time.sleep(settings.RAP_API_POLL_INTERVAL)
+        scheduler = PollScheduler()
+        # Keep a pool of threads, and therefore database connections, for
+        # the lifetime of the service rather than creating them every loop.
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=settings.RAP_API_STATUS_MAX_WORKERS,
+            thread_name_prefix="rap_status",
+        ) as pool:
+            while run_fn():
+                start = time.monotonic()
+                try:
+                    active_job_requests = get_active_job_requests()
+                    logger.info(
+                        "Active rap ids",
+                        rap_ids=[jr.identifier for jr in active_job_requests],
+                    )
+                    due_rap_ids = scheduler.due(active_job_requests)
+                    shards = shard_rap_ids(
+                        due_rap_ids, settings.RAP_API_STATUS_SHARD_SIZE
+                    )
+                    errors = list(pool.map(update_shard, shards))
+
+                    for shard, error in zip(shards, errors):
+                        if error is None:
+                            scheduler.record_polled(shard)
+                    if shards:
+                        scheduler.record_cycle(
+                            failed=any(
+                                isinstance(error, rap_api.RapAPIError)
+                                for error in errors
+                            )
+                        )
+                except Exception as exc:
+                    logger.error(exc)
+                    sentry_sdk.capture_exception(exc)
+                finally:
+                    safe_close_old_db_connections()
+
+                sleep_time = scheduler.sleep_time(time.monotonic() - start)
+                if sleep_time:
+                    time.sleep(sleep_time)
@@ -0,0 +1,44 @@
+"""Management command to continually submit queued job requests to the RAP API."""
+
+import argparse
+import time
+
+import sentry_sdk
+import structlog
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobserver.actions.rap import submit_job_requests
+from jobserver.management.commands.rap_status_service import (
+    safe_close_old_db_connections,
+)
+
+
+logger = structlog.get_logger(__name__)
+
+
+class Command(BaseCommand):
+    """Management command to continually submit queued job requests to the RAP API."""
+
+    help = "Submit queued job requests to the RAP API."
+
+    def add_arguments(self, parser):
+        # In production, we want this loop to run forever. Using a
+        # function means that we can test it on a finite number of loops.
+        parser.add_argument("--run-fn", default=lambda: True, help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        run_fn = options["run_fn"]
+        while run_fn():
+            count = 0
+            try:
+                count = submit_job_requests()
+            except Exception as exc:
+                logger.error(exc)
+                sentry_sdk.capture_exception(exc)
+            finally:
+                safe_close_old_db_connections()
+
+            # keep submitting while there's a backlog
+            if count < settings.RAP_SUBMISSION_BATCH_SIZE:
+                time.sleep(settings.RAP_SUBMISSION_POLL_INTERVAL)
@@ -5,6 +5,7 @@ from django.conf import settings
 from django.core.management.base import BaseCommand
 
 from jobserver import rap_api
+from jobserver.model_utils import bulk_update_changed
 from jobserver.models import Backend, Stats
 
 
@@ -17,16 +18,16 @@ class Command(BaseCommand):
             backend_status_response = rap_api.backend_status()
             backends = backend_status_response["backends"]
 
-            for backend_states in backends:
-                backend_slug = backend_states["slug"]
-
-                backend_object = Backend.objects.get(slug=backend_slug)
+            backends_by_slug = Backend.objects.in_bulk(
+                [b["slug"] for b in backends], field_name="slug"
+            )
 
+            def parse_state(backend_object, backend_states):
                 # Record the time we're told this backend was last seen alive, for availability
                 # reporting purposes
                 last_seen_at = backend_states["last_seen"]
                 if not last_seen_at:
-                    backend_object.last_seen_at = None
+                    last_seen_at_dt = None
                 else:
                     last_seen_at_dt = datetime.fromisoformat(last_seen_at)
                     Stats.objects.update_or_create(
@@ -34,37 +35,52 @@ class Command(BaseCommand):
                         url=settings.RAP_API_BASE_URL,
                         defaults={"api_last_seen": last_seen_at_dt},
                     )
-                    backend_object.last_seen_at = last_seen_at_dt
 
                 # Record the time this backend was last in maintenance mode
                 last_seen_in_maintenance_mode = backend_states["db_maintenance"][
                     "since"
                 ]
                 if not last_seen_in_maintenance_mode:
-                    backend_object.last_seen_maintenance_mode = None
-
+                    last_seen_dt_maintenance_mode = None
                 else:
                     last_seen_dt_maintenance_mode = datetime.fromisoformat(
                         last_seen_in_maintenance_mode
                     )
-                    backend_object.last_seen_maintenance_mode = (
-                        last_seen_dt_maintenance_mode
-                    )
-
-                backend_object.rap_api_state = backend_states
 
                 backend_maintenance_mode = backend_states["db_maintenance"]["status"]
 
-                backend_object.is_in_maintenance_mode = backend_maintenance_mode == "on"
+                return {
+                    "rap_api_state": backend_states,
+                    "last_seen_at": last_seen_at_dt,
+                    "last_seen_maintenance_mode": last_seen_dt_maintenance_mode,
+                    "is_in_maintenance_mode": backend_maintenance_mode == "on",
+                }
 
-                backend_object.save(
-                    update_fields=[
-                        "rap_api_state",
-                        "last_seen_at",
-                        "last_seen_maintenance_mode",
-                        "is_in_maintenance_mode",
-                    ]
+            values_by_backend = {}
+            for backend_states in backends:
+                backend_object = backends_by_slug.get(backend_states["slug"])
+                if backend_object is None:
+                    # skip it, but don't let it stop us updating the others
+                    logger.error(
+                        "Backend does not exist", backend=backend_states["slug"]
+                    )
+                    continue
+
+                values_by_backend[backend_object] = parse_state(
+                    backend_object, backend_states
                 )
+
+            # only write the backends whose state has changed
+            bulk_update_changed(
+                values_by_backend.keys(),
+                [
+                    "rap_api_state",
+                    "last_seen_at",
+                    "last_seen_maintenance_mode",
+                    "is_in_maintenance_mode",
+                ],
+                values_by_backend.get,
+            )
             logger.info(backend_status_response)
 
         except Exception as exc:
@@ -0,0 +1,44 @@
+"""Management command to continually send queued job completion notifications."""
+
+import argparse
+import time
+
+import sentry_sdk
+import structlog
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobserver.actions.notifications import send_job_notifications
+from jobserver.management.commands.rap_status_service import (
+    safe_close_old_db_connections,
+)
+
+
+logger = structlog.get_logger(__name__)
+
+
+class Command(BaseCommand):
+    """Management command to continually send queued job completion notifications."""
+
+    help = "Send queued job completion notifications."
+
+    def add_arguments(self, parser):
+        # In production, we want this loop to run forever. Using a
+        # function means that we can test it on a finite number of loops.
+        parser.add_argument("--run-fn", default=lambda: True, help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        run_fn = options["run_fn"]
+        while run_fn():
+            count = 0
+            try:
+                count = send_job_notifications()
+            except Exception as exc:
+                logger.error(exc)
+                sentry_sdk.capture_exception(exc)
+            finally:
+                safe_close_old_db_connections()
+
+            # keep draining the outbox while there's a backlog
+            if count < settings.JOB_NOTIFICATION_BATCH_SIZE:
+                time.sleep(settings.JOB_NOTIFICATION_POLL_INTERVAL)
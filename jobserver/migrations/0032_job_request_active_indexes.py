@@ -0,0 +1,38 @@
+# Generated by Django 5.2.16 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobserver", "0031_alter_project_category"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(("status__in", ["pending", "running"])),
+                fields=["job_request"],
+                name="job_active_job_request_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobrequest",
+            index=models.Index(
+                condition=models.Q(
+                    (
+                        "_status__in",
+                        [
+                            "pending",
+                            "running",
+                            "unknown",
+                            "unknown_error_creating_jobs",
+                        ],
+                    )
+                ),
+                fields=["created_at"],
+                name="jobrequest_active_status_idx",
+            ),
+        ),
+    ]
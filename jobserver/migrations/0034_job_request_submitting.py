@@ -0,0 +1,37 @@
+# Generated by Django 5.2.17 on 2026-10-17 05:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobserver", "0033_job_notification"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="jobrequest",
+            name="_status",
+            field=models.TextField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("running", "Running"),
+                    ("failed", "Failed"),
+                    ("succeeded", "Succeeded"),
+                    ("nothing_to_do", "Nothing To Do"),
+                    ("unknown", "Unknown"),
+                    ("unknown_error_creating_jobs", "Unknown Error Creating Jobs"),
+                    ("submitting", "Submitting"),
+                ],
+                default="unknown",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobrequest",
+            index=models.Index(
+                condition=models.Q(("_status", "submitting")),
+                fields=["created_at"],
+                name="jobrequest_submitting_idx",
+            ),
+        ),
+    ]
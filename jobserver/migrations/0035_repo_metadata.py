@@ -0,0 +1,45 @@
+# Generated by Django 5.2.17 on 2026-10-17 06:08
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobserver", "0034_job_request_submitting"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="repo",
+            name="created_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name="repo",
+            name="default_branch",
+            field=models.TextField(default=""),
+        ),
+        migrations.AddField(
+            model_name="repo",
+            name="is_private",
+            field=models.BooleanField(null=True),
+        ),
+        migrations.AddField(
+            model_name="repo",
+            name="metadata_updated_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name="repo",
+            name="pushed_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name="repo",
+            name="topics",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.TextField(), default=list, size=None
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.17 on 2026-10-17 08:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobserver", "0035_repo_metadata"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobrequest",
+            name="claimed_at",
+            field=models.DateTimeField(null=True),
+        ),
+    ]
@@ -16,6 +16,57 @@ def get_models():
     ]
 
 
+def bulk_update_changed(
+    objs, fields, get_values, *, changed_values=None, batch_size=1000
+):
+    """
+    Update objs with values from get_values, writing only those which changed
+
+    get_values is called with each object and returns a dict of new values for
+    some, or all, of fields.  Objects where every value matches what they
+    already have are skipped, and the rest are written with bulk_update in
+    batches of batch_size.  objs can be any iterable, including a
+    QuerySet.iterator(), so large tables don't have to be held in memory.
+
+    changed_values are set on just the objects which changed, eg to record
+    when that happened.
+
+    Objects are saved to the database they were loaded from.  Returns the
+    number of objects which were updated.
+    """
+    changed_values = changed_values or {}
+    update_fields = [*fields, *changed_values]
+
+    batch = []
+    count = 0
+
+    def write(batch):
+        model = type(batch[0])
+        model._default_manager.db_manager(batch[0]._state.db).bulk_update(
+            batch, update_fields
+        )
+
+    for obj in objs:
+        values = get_values(obj)
+        if all(getattr(obj, name) == value for name, value in values.items()):
+            continue
+
+        for name, value in (values | changed_values).items():
+            setattr(obj, name, value)
+
+        batch.append(obj)
+        count += 1
+
+        if len(batch) >= batch_size:
+            write(batch)
+            batch = []
+
+    if batch:
+        write(batch)
+
+    return count
+
+
 class ImmutableError(TypeError):
     pass
 
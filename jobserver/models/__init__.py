@@ -2,6 +2,7 @@ from .auditable_event import AuditableEvent
 from .backend import Backend
 from .backend_membership import BackendMembership
 from .job import Job
+from .job_notification import JobNotification
 from .job_request import JobRequest, JobRequestStatus
 from .org import Org
 from .org_membership import OrgMembership
@@ -25,6 +26,7 @@ __all__ = [
     "Backend",
     "BackendMembership",
     "Job",
+    "JobNotification",
     "JobRequest",
     "JobRequestStatus",
     "Org",
@@ -96,6 +96,14 @@ class Job(models.Model):
 
     class Meta:
         ordering = ["pk"]
+        indexes = [
+            # supports JobRequestQuerySet.active
+            models.Index(
+                fields=["job_request"],
+                condition=models.Q(status__in=PENDING_STATES + RUNNING_STATES),
+                name="job_active_job_request_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.action} ({self.pk})"
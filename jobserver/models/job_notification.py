@@ -0,0 +1,67 @@
+from django.db import models
+from django.utils import timezone
+
+
+class JobNotificationQuerySet(models.QuerySet):
+    def due(self, max_attempts):
+        """Notifications which are waiting to be sent, and ready to (re)try."""
+        return self.filter(
+            sent_at__isnull=True,
+            attempts__lt=max_attempts,
+            next_attempt_at__lte=timezone.now(),
+        )
+
+
+class JobNotification(models.Model):
+    """
+    An outbox of completed Jobs whose creators need to be notified
+
+    Rows are written in the same transaction as the Job status update which
+    completed the Job, and are sent by the send_job_notifications service, so
+    updating Jobs never waits on (or fails because of) sending email.
+    """
+
+    job = models.OneToOneField(
+        "Job",
+        on_delete=models.CASCADE,
+        related_name="notification",
+    )
+
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True)
+
+    # how many times we've tried to send this notification, and when we should
+    # next try
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(default="", blank=True)
+
+    objects = JobNotificationQuerySet.as_manager()
+
+    class DataScrubbing:
+        fields_to_scrub = {
+            "last_error": "fake job notification error",
+        }
+        allowed_fields = frozenset(
+            [
+                "id",
+                "attempts",
+                "created_at",
+                "job",
+                "next_attempt_at",
+                "sent_at",
+            ]
+        )
+
+    class Meta:
+        indexes = [
+            # supports JobNotificationQuerySet.due
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(sent_at__isnull=True),
+                name="jobnotification_unsent_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Notification for {self.job}"
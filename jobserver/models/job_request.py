@@ -1,8 +1,10 @@
 import base64
 import secrets
+from datetime import timedelta
 
 import sentry_sdk
 import structlog
+from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
 from django.db import models
 from django.db.models import (
@@ -13,9 +15,11 @@ from django.db.models import (
     FloatField,
     Min,
     Q,
+    Value,
     When,
     prefetch_related_objects,
 )
+from django.db.models.functions import Lower
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.functional import cached_property
@@ -28,6 +32,7 @@ from jobserver.models.job import (
     PENDING_STATES,
     RUNNING_STATES,
     SUCCEEDED_STATES,
+    Job,
 )
 
 from ..runtime import Runtime
@@ -62,6 +67,92 @@ def _pct(numerator):
 
 
 class JobRequestQuerySet(models.QuerySet):
+    def active(self):
+        """
+        Filter to job requests which may be active
+
+        That is, job requests with an active _status, created within the past
+        365 days, or with any pending or running Jobs. Since _status can be stale
+        this is over-inclusive; use with_computed_status to check the status
+        each job request's Jobs give it.
+
+        Both sides of this filter are covered by partial indexes, so its cost
+        depends on the number of active job requests rather than the size of
+        the table.
+        """
+        one_year_ago = timezone.now() - timedelta(days=365)
+        active_job_job_request_ids = Job.objects.filter(
+            status__in=PENDING_STATES + RUNNING_STATES
+        ).values("job_request_id")
+
+        return self.filter(
+            Q(_status__in=JobRequest.active_statuses, created_at__gte=one_year_ago)
+            | Q(id__in=active_job_job_request_ids)
+        )
+
+    def awaiting_submission(self):
+        """
+        Filter to job requests which haven't been sent to the RAP API yet
+
+        These are picked up by the rap_submission_service.  Job requests it
+        has claimed are left out until their claim has expired, after
+        RAP_SUBMISSION_CLAIM_TIMEOUT seconds, so one whose submitter died is
+        picked up again.
+        """
+        claim_expired_before = timezone.now() - timedelta(
+            seconds=settings.RAP_SUBMISSION_CLAIM_TIMEOUT
+        )
+        return self.filter(_status=JobRequestStatus.SUBMITTING).filter(
+            Q(claimed_at__isnull=True) | Q(claimed_at__lt=claim_expired_before)
+        )
+
+    def with_computed_status(self):
+        """
+        Annotate computed_status, the status JobRequest.jobs_status would give
+
+        This follows the same rules as jobs_status, but is calculated with one
+        aggregate query rather than per instance, and doesn't save anything.
+        """
+        status = Lower("jobs__status")
+        return self.annotate(
+            computed_num_jobs=Count("jobs"),
+            computed_num_statuses=Count(status, distinct=True),
+            computed_first_status=Min(status),
+            computed_num_active=Count(
+                "jobs",
+                filter=Q(jobs__status__iexact="pending")
+                | Q(jobs__status__iexact="running"),
+            ),
+            computed_num_failed=Count("jobs", filter=Q(jobs__status__iexact="failed")),
+        ).annotate(
+            computed_status=Case(
+                # completed statuses are final
+                When(
+                    ~Q(_status__in=JobRequest.active_statuses),
+                    then=F("_status"),
+                ),
+                # no jobs, so use the initially set status
+                When(computed_num_jobs=0, then=F("_status")),
+                # all jobs have the same status
+                When(
+                    computed_num_statuses=1,
+                    computed_first_status="",
+                    then=Value(JobRequestStatus.PENDING),
+                ),
+                When(
+                    computed_num_statuses=1,
+                    computed_first_status__in=JobRequestStatus.values,
+                    then=F("computed_first_status"),
+                ),
+                When(computed_num_statuses=1, then=Value(JobRequestStatus.UNKNOWN)),
+                # a mix of statuses
+                When(computed_num_active__gt=0, then=Value(JobRequestStatus.RUNNING)),
+                When(computed_num_failed__gt=0, then=Value(JobRequestStatus.FAILED)),
+                default=Value(JobRequestStatus.UNKNOWN),
+                output_field=models.TextField(),
+            )
+        )
+
     def with_started_at(self):
         return self.prefetch_related("jobs").annotate(
             started_at=Min("jobs__started_at")
@@ -91,6 +182,50 @@ class JobRequestQuerySet(models.QuerySet):
 class JobRequestManager(models.Manager.from_queryset(JobRequestQuerySet)):
     use_in_migrations = True
 
+    def refresh_statuses(self, job_requests):
+        """
+        Bring the _status of the given JobRequests up to date with their Jobs
+
+        This applies the same rules as jobs_status, but to many JobRequests at
+        once: one aggregate query to calculate their statuses and one bulk
+        update for those which have changed, rather than a save() each. The
+        given instances are updated too, so reading their jobs_status
+        afterwards won't trigger any further saves.
+        """
+        job_requests = list(job_requests)
+
+        # completed statuses are final, so only check active job requests
+        candidates = {
+            jr.pk: jr for jr in job_requests if jr._status in JobRequest.active_statuses
+        }
+        if not candidates:
+            return job_requests
+
+        computed_statuses = (
+            self.filter(pk__in=candidates)
+            .with_computed_status()
+            .values_list("pk", "computed_status")
+        )
+
+        changed = []
+        for pk, status in computed_statuses:
+            job_request = candidates[pk]
+            if job_request._status == status:
+                continue
+
+            job_request._status = status
+            job_request.status_message = (
+                "Failed due to job failure"
+                if status == JobRequestStatus.FAILED
+                else None
+            )
+            changed.append(job_request)
+
+        if changed:
+            self.bulk_update(changed, ["_status", "status_message"])
+
+        return job_requests
+
     def previous(self, job_request, filter_succeeded=None):
         workspace_backend_job_requests = super().filter(
             workspace=job_request.workspace,
@@ -127,6 +262,7 @@ class JobRequestStatus(models.TextChoices):
     NOTHING_TO_DO = "nothing_to_do"
     UNKNOWN = "unknown"
     UNKNOWN_ERROR_CREATING_JOBS = "unknown_error_creating_jobs"
+    SUBMITTING = "submitting"
 
 
 class JobRequest(models.Model):
@@ -175,9 +311,17 @@ class JobRequest(models.Model):
         JobRequestStatus.UNKNOWN,
         JobRequestStatus.UNKNOWN_ERROR_CREATING_JOBS,
     ]
+    # SUBMITTING job requests are waiting for the rap_submission_service to
+    # send them to the RAP API. They aren't active, since the controller
+    # doesn't know about them yet, but they aren't completed either.
+    incomplete_statuses = [*active_statuses, JobRequestStatus.SUBMITTING]
 
     status_message = models.TextField(null=True, blank=True)
 
+    # when the rap_submission_service claimed this SUBMITTING job request, to
+    # send it to the RAP API
+    claimed_at = models.DateTimeField(null=True)
+
     objects = JobRequestManager()
 
     class DataScrubbing:
@@ -188,6 +332,7 @@ class JobRequest(models.Model):
                 "_status",
                 "backend",
                 "cancelled_actions",
+                "claimed_at",
                 "codelists_ok",
                 "created_at",
                 "created_by",
@@ -203,6 +348,27 @@ class JobRequest(models.Model):
         )
 
     class Meta:
+        indexes = [
+            # supports JobRequestQuerySet.active
+            models.Index(
+                fields=["created_at"],
+                condition=Q(
+                    _status__in=[
+                        JobRequestStatus.PENDING,
+                        JobRequestStatus.RUNNING,
+                        JobRequestStatus.UNKNOWN,
+                        JobRequestStatus.UNKNOWN_ERROR_CREATING_JOBS,
+                    ]
+                ),
+                name="jobrequest_active_status_idx",
+            ),
+            # supports JobRequestQuerySet.awaiting_submission
+            models.Index(
+                fields=["created_at"],
+                condition=Q(_status=JobRequestStatus.SUBMITTING),
+                name="jobrequest_submitting_idx",
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 condition=(
@@ -298,7 +464,7 @@ class JobRequest(models.Model):
         # Is this job request in a completed status? We use the self.jobs_status
         # property here, which will first check the overall jobs_status, and
         # if necessary, calculate status from pending/running jobs
-        return self.jobs_status not in self.active_statuses
+        return self.jobs_status not in self.incomplete_statuses
 
     @property
     def num_completed(self):
@@ -362,6 +528,7 @@ class JobRequest(models.Model):
             # Handle nothing to do.
             if not actions_to_cancel:
                 if self.jobs_status in (
+                    JobRequestStatus.SUBMITTING,
                     JobRequestStatus.PENDING,
                     JobRequestStatus.UNKNOWN_ERROR_CREATING_JOBS,
                 ):
@@ -405,7 +572,14 @@ class JobRequest(models.Model):
             logger.info("Calling RAP API to create RAP")
 
             try:
-                json_response = rap_api.create(self)
+                try:
+                    json_response = rap_api.create(self)
+                finally:
+                    # Another process may have changed our status while we
+                    # waited on the RAP API, so update_status must compare the
+                    # result with the status in the database, not the one we
+                    # loaded
+                    self.refresh_from_db(fields=["_status", "status_message"])
                 logger.info("Response from RAP API", response=json_response)
 
                 if json_response["count"] > 0:
@@ -547,7 +721,7 @@ class JobRequest(models.Model):
         if self._status != new_status:
             self._status = new_status
             self.status_message = message
-            self.save()
+            self.save(update_fields=["_status", "status_message"])
         return new_status
 
     @property
@@ -1,6 +1,7 @@
 from urllib.parse import quote
 
 import structlog
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
 from django.db.models import Q
 from django.urls import reverse
@@ -14,6 +15,16 @@ class Repo(models.Model):
     url = models.TextField(unique=True)
     has_github_outputs = models.BooleanField(default=False)
 
+    # metadata mirrored from GitHub by the update_repo_metadata job, so pages
+    # which show it don't have to ask GitHub on every request.  These are
+    # empty until the job has seen the repo at least once.
+    is_private = models.BooleanField(null=True)
+    topics = ArrayField(models.TextField(), default=list)
+    default_branch = models.TextField(default="")
+    created_at = models.DateTimeField(null=True)
+    pushed_at = models.DateTimeField(null=True)
+    metadata_updated_at = models.DateTimeField(null=True)
+
     internal_signed_off_at = models.DateTimeField(null=True)
     internal_signed_off_by = models.ForeignKey(
         "User",
@@ -35,11 +46,17 @@ class Repo(models.Model):
         allowed_fields = frozenset(
             [
                 "id",
+                "created_at",
+                "default_branch",
                 "has_github_outputs",
                 "internal_signed_off_at",
                 "internal_signed_off_by",
+                "is_private",
+                "metadata_updated_at",
+                "pushed_at",
                 "researcher_signed_off_at",
                 "researcher_signed_off_by",
+                "topics",
                 "url",
             ]
         )
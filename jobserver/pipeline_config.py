@@ -1,3 +1,14 @@
+import hashlib
+import re
+import time
+from dataclasses import dataclass
+
+import structlog
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from opentelemetry import trace
+from pipeline import load_pipeline
 from pygments import highlight
 from pygments.formatters import HtmlFormatter
 from pygments.lexers import YamlLexer
@@ -7,20 +18,31 @@ from .opencodelists import _get_opencodelists_api
 from .permissions.sqlrunner import project_is_permitted_to_use_sqlrunner
 
 
+logger = structlog.get_logger(__name__)
+tracer = trace.get_tracer("pipeline_config")
+
+# a full commit sha, which always refers to the same content
+SHA_PATTERN = re.compile(r"[0-9a-f]{40}")
+
+_missing = object()
+
+
 class ActionConfigError(Exception):
     """
     Raised when a pipeline action cannot be run due to policy or configuration.
     """
 
 
-def check_cohortextractor_usage(config):
-    run_commands = [v.run.raw for v in config.actions.values()]
+def _get_run_commands(config):
+    return [v.run.raw for v in config.actions.values()]
+
+
+def _check_cohortextractor_usage(run_commands):
     if any("cohortextractor" in command for command in run_commands):
         raise ActionConfigError("Cohort-extractor is no longer supported")
 
 
-def check_sqlrunner_permission(project, config):
-    run_commands = [v.run.raw for v in config.actions.values()]
+def _check_sqlrunner_permission(project, run_commands):
     if not any("sqlrunner" in command for command in run_commands):
         # No need to check permission if project does not use SQL Runner.
         return
@@ -29,6 +51,14 @@ def check_sqlrunner_permission(project, config):
         raise ActionConfigError(msg)
 
 
+def check_cohortextractor_usage(config):
+    _check_cohortextractor_usage(_get_run_commands(config))
+
+
+def check_sqlrunner_permission(project, config):
+    _check_sqlrunner_permission(project, _get_run_commands(config))
+
+
 def get_actions(config):
     """Get actions from a pipeline config for this Workspace"""
     for action, children in config.actions.items():
@@ -51,10 +81,124 @@ def get_database_actions(config):
             yield name
 
 
+@dataclass(frozen=True)
+class PipelineSummary:
+    """
+    The parts of a pipeline config that running jobs needs
+
+    This is built from plain data, so it's cheap to cache, unlike the parsed
+    config itself.
+    """
+
+    actions: list
+    database_actions: list
+    run_commands: list
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            actions=list(get_actions(config)),
+            database_actions=list(get_database_actions(config)),
+            run_commands=_get_run_commands(config),
+        )
+
+    def check(self, project):
+        """Raise ActionConfigError if project can't run this pipeline"""
+        _check_cohortextractor_usage(self.run_commands)
+        _check_sqlrunner_permission(project, self.run_commands)
+
+
+def get_pipeline_summary(content):
+    """
+    Parse a project.yaml and summarise it, via the pipeline cache
+
+    Parsing a large project.yaml is slow, so summaries are cached by a hash
+    of the content. Invalid content raises as load_pipeline does, and isn't
+    cached.
+    """
+    with tracer.start_as_current_span("get_pipeline_summary") as span:
+        cache = caches["pipeline"]
+        key = f"summary:{hashlib.sha256(content.encode()).hexdigest()}"
+
+        summary = cache.get(key)
+        span.set_attribute("pipeline.cache_hit", summary is not None)
+        if summary is not None:
+            return summary
+
+        start = time.perf_counter()
+        summary = PipelineSummary.from_config(load_pipeline(content))
+        duration_ms = int((time.perf_counter() - start) * 1000)
+
+        span.set_attributes(
+            {
+                "pipeline.parse_duration_ms": duration_ms,
+                "pipeline.action_count": len(summary.actions),
+            }
+        )
+        logger.info(
+            "Parsed pipeline",
+            duration_ms=duration_ms,
+            action_count=len(summary.actions),
+        )
+
+        cache.set(key, summary)
+        return summary
+
+
+def _get_at_ref(org, repo, ref, path, fetch, timeout=DEFAULT_TIMEOUT):
+    """
+    Get something from a repo at the given ref, using fetch
+
+    Content at a commit never changes, so when ref is a commit sha we keep
+    what fetch returns in the pipeline cache, keyed on the repo, sha and path.
+    The cache evicts the least recently used entries once it's full.
+    """
+    if not SHA_PATTERN.fullmatch(ref):
+        return fetch()
+
+    cache = caches["pipeline"]
+    key = f"{org}/{repo}@{ref}:{path}"
+
+    value = cache.get(key, default=_missing)
+    if value is _missing:
+        value = fetch()
+        cache.set(key, value, timeout)
+
+    return value
+
+
+def get_commit_sha(org, repo, ref, get_github_api=_get_github_api):
+    """
+    Resolve a ref to a commit sha
+
+    Full commit shas are returned as they are.  Anything else is usually a
+    branch name, but can be any ref GitHub understands, such as a tag or short
+    sha, so we fall back to asking GitHub for the commit it points at.
+    """
+    if SHA_PATTERN.fullmatch(ref):
+        return ref
+
+    github_api = get_github_api()
+    sha = github_api.get_branch_sha(org, repo, ref)
+    if sha is None:
+        sha = github_api.get_commit_sha(org, repo, ref)
+
+    if sha is None:
+        raise Exception(f"Missing branch: '{ref}'")
+
+    return sha
+
+
 def get_project(org, repo, branch, get_github_api=_get_github_api):
     github_api = get_github_api()
 
-    content = github_api.get_file(org, repo, branch)
+    content = _get_at_ref(
+        org,
+        repo,
+        branch,
+        "project.yaml",
+        lambda: github_api.get_file(org, repo, branch),
+    )
 
     if content is not None:
         return content
@@ -75,23 +219,41 @@ def get_codelists_status(
     github_api = get_github_api()
     opencodelists_api = get_opencodelists_api()
 
+    def get_file(filepath):
+        return _get_at_ref(
+            org,
+            repo,
+            branch,
+            filepath,
+            lambda: github_api.get_file(org, repo, branch, filepath=filepath),
+        )
+
     codelists_content = (
-        github_api.get_file(org, repo, branch, filepath="codelists/codelists.txt"),
-        github_api.get_file(org, repo, branch, filepath="codelists/codelists.json"),
+        get_file("codelists/codelists.txt"),
+        get_file("codelists/codelists.json"),
     )
 
     if any(content is None for content in codelists_content):
         if github_api.get_branch(org, repo, branch) is None:
             raise Exception(f"Missing branch: '{branch}'")
 
-        if github_api.get_file(org, repo, branch, filepath="codelists") is not None:
+        if get_file("codelists") is not None:
             raise Exception("Could not find codelists.txt or codelists.json")
         # Missing codelists.txt/codelists.json files are only an issue if the
         # codelists directory exists. If the repo contains no codelists,
         # there's nothing to check.
         return "ok"
 
-    codelists_check = opencodelists_api.check_codelists(*codelists_content)
+    # The result of the check can change as codelists are updated on
+    # OpenCodelists, so unlike the files it's only cached for a while
+    codelists_check = _get_at_ref(
+        org,
+        repo,
+        branch,
+        "codelists-check",
+        lambda: opencodelists_api.check_codelists(*codelists_content),
+        timeout=settings.PIPELINE_CODELISTS_CHECK_TTL,
+    )
     return codelists_check["status"]
 
 
@@ -188,9 +350,40 @@ def render_definition(content, link_func):
         HtmlFormatter(cssclass="card-body my-0 rounded-0 highlight"),
     )
 
-    # replace the script lines with their links
-    links_map = map_run_scripts_to_links(content, link_func)
-    for script, link in links_map.items():
-        output = output.replace(script, link)
+    # replace the script lines with their links, skipping those without any
+    links_map = {
+        script: link
+        for script, link in map_run_scripts_to_links(content, link_func).items()
+        if script != link
+    }
+    if not links_map:
+        return output
+
+    # Replace them all in one pass over the output. Longer lines go first in
+    # the pattern, so a line which contains another is replaced whole.
+    pattern = re.compile(
+        "|".join(
+            re.escape(script) for script in sorted(links_map, key=len, reverse=True)
+        )
+    )
+    return pattern.sub(lambda match: links_map[match.group(0)], output)
+
+
+def get_rendered_definition(content, link_func, link_base):
+    """
+    Build a HTML version of the given project.yaml content, via the pipeline cache
+
+    The output depends on the content and where the links point, so it's
+    cached by a hash of the content and link_base, which should identify the
+    repo and commit link_func links to.
+    """
+    cache = caches["pipeline"]
+    digest = hashlib.sha256(f"{link_base}\n{content}".encode()).hexdigest()
+    key = f"definition:{digest}"
+
+    output = cache.get(key)
+    if output is None:
+        output = render_definition(content, link_func)
+        cache.set(key, output)
 
     return output
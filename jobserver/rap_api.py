@@ -21,18 +21,58 @@ errors, for example. They should probably not need to transform the response
 body defined in the spec. Clients of this module will interpret those further.
 """
 
+import time
 from json.decoder import JSONDecodeError
 from urllib.parse import urljoin
 
 import requests
 import structlog
 from django.conf import settings
+from opentelemetry import trace
+from requests.adapters import HTTPAdapter
 from structlog.contextvars import bound_contextvars
+from urllib3.util.retry import Retry
 
 from jobserver.permissions import dataset_permissions, population_permissions
 
 
 logger = structlog.get_logger(__name__)
+tracer = trace.get_tracer("rap_api")
+
+
+def _build_session():
+    """Build a session which keeps connections to the RAP API open between calls.
+
+    Failures to connect are retried, with backoff, for every request since the
+    request was never sent. Other failures, and 502/503/504 responses, are only
+    retried for GET requests: POST requests such as rap/create/ aren't safe to
+    repeat, and the status service retries rap/status/ on its next cycle anyway.
+    """
+    retry = Retry(
+        total=settings.RAP_API_MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_maxsize=settings.RAP_API_POOL_SIZE,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+session = _build_session()
+
+# The session methods to use for each of the request_methods _api_call allows
+SESSION_METHODS = {
+    requests.get: session.get,
+    requests.post: session.post,
+}
 
 
 class RapAPIError(Exception):
@@ -82,12 +122,8 @@ def _api_call(request_method, endpoint_path, json=None):
             )
 
         # Check the method is one covered in the tests of this module.
-        allowed_methods = {
-            requests.get,
-            requests.post,
-        }
         if (
-            request_method not in allowed_methods
+            request_method not in SESSION_METHODS
             # Special method name allowed for tests that aren't about a specific requests method.
             and request_method.__name__ != "fake_request_method"
         ):
@@ -103,18 +139,30 @@ def _api_call(request_method, endpoint_path, json=None):
                 "request_method requests.get and json parameter not allowed together"
             )
 
-        # Do the request-response cycle.
-        try:
-            response = request_method(
-                urljoin(settings.RAP_API_BASE_URL, endpoint_path),
-                headers={"Authorization": settings.RAP_API_TOKEN},
-                json=json,
-            )
-        except requests.exceptions.RequestException as exc:
-            logger.error("RequestException", exc=exc)
-            raise RapAPIRequestError(f"RAP API endpoint not available: {exc}")
-
-        logger.info("Success")
+        # Do the request-response cycle, using our pooled session for the real
+        # requests methods.
+        send = SESSION_METHODS.get(request_method, request_method)
+        with tracer.start_as_current_span("rap_api_call") as span:
+            span.set_attribute("rap_api.endpoint_path", endpoint_path)
+            start = time.monotonic()
+            try:
+                response = send(
+                    urljoin(settings.RAP_API_BASE_URL, endpoint_path),
+                    headers={"Authorization": settings.RAP_API_TOKEN},
+                    json=json,
+                    timeout=(
+                        settings.RAP_API_CONNECT_TIMEOUT,
+                        settings.RAP_API_READ_TIMEOUT,
+                    ),
+                )
+            except requests.exceptions.RequestException as exc:
+                logger.error("RequestException", exc=exc)
+                raise RapAPIRequestError(f"RAP API endpoint not available: {exc}")
+            finally:
+                duration_ms = round((time.monotonic() - start) * 1000)
+                span.set_attribute("rap_api.duration_ms", duration_ms)
+
+        logger.info("Success", duration_ms=duration_ms)
         return response
 
 
@@ -1,13 +1,19 @@
 import hashlib
 import io
+import json
+import os
+import re
+import shutil
+import uuid
 import zipfile
 from datetime import UTC, datetime
 from pathlib import Path
 
+from django.conf import settings
 from django.db import transaction
-from django.http import FileResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.utils import timezone
-from django.utils.http import http_date
+from django.utils.http import content_disposition_header, http_date
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 
@@ -27,7 +33,7 @@ class ReleaseFilesMismatch(Exception):
     pass
 
 
-def _build_paths(release, filename, data):
+def _build_paths(release, filename):
     """
     Build the absolute path for a given filename as part of a release
 
@@ -44,33 +50,198 @@ def _build_paths(release, filename, data):
     return relative_path, absolute_path
 
 
+# How much of each file we read at a time when streaming a zip
+ZIP_CHUNK_SIZE = 64 * 1024
+
+
+class ZipStream(io.RawIOBase):
+    """
+    A write-only stream which holds what's written until it's collected
+
+    ZipFile can write to unseekable streams, so we can hand this to it and
+    collect each part of the archive as soon as it's been written, rather than
+    building the whole archive in memory.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.chunks.append(bytes(b))
+        return len(b)
+
+    def collect(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
 def build_outputs_zip(release_files, url_builder_func):
-    # create an in memory stream so we don't need to write the file to disk
-    in_memory_zf = io.BytesIO()
+    """
+    Generate a zip of the given ReleaseFiles as a stream of bytes
+
+    Each file is read and yielded in chunks, so memory use doesn't depend on
+    the size of the archive and the first bytes are available straight away.
+    """
+    stream = ZipStream()
 
     # add each ReleaseFile to the zip using their name as the name in the
     # archive
-    with zipfile.ZipFile(in_memory_zf, "w") as zip_obj:
+    with zipfile.ZipFile(stream, "w") as zip_obj:
         for rfile in release_files:
             if not rfile.is_deleted:
-                zip_obj.write(rfile.absolute_path(), arcname=rfile.name)
+                path = rfile.absolute_path()
+                zinfo = zipfile.ZipInfo.from_file(path, arcname=rfile.name)
+
+                with open(path, "rb") as f, zip_obj.open(zinfo, "w") as dest:
+                    while chunk := f.read(ZIP_CHUNK_SIZE):
+                        dest.write(chunk)
+                        yield stream.collect()
+
                 continue
 
             # explain why an on-disk file was deleted, and potentially
             # overwrite the previously unredacted version.
-            name = rfile.deleted_by.fullname if rfile.deleted_by else "Unknown"
-            deleted_at = rfile.deleted_at if rfile.deleted_at else "Unknown"
-            first_line = f"This file was redacted by {name} on {deleted_at}"
+            zip_obj.writestr(rfile.name, redaction_notice(rfile, url_builder_func))
+
+    # the end of the last file and the archive's central directory
+    yield stream.collect()
+
+
+def redaction_notice(rfile, url_builder_func):
+    """Explain why a deleted ReleaseFile isn't in an archive"""
+    name = rfile.deleted_by.fullname if rfile.deleted_by else "Unknown"
+    deleted_at = rfile.deleted_at if rfile.deleted_at else "Unknown"
+    first_line = f"This file was redacted by {name} on {deleted_at}"
+
+    url = url_builder_func(rfile.get_absolute_url())
+    second_line = f"For more information see: {url}"
+
+    return f"{first_line}\n\n{second_line}"
 
-            url = url_builder_func(rfile.get_absolute_url())
-            second_line = f"For more information see: {url}"
 
-            zip_obj.writestr(rfile.name, f"{first_line}\n\n{second_line}")
+def archives_path(workspace):
+    """
+    Get the directory a Workspace's cached archives are stored in
+
+    Workspace names are slugs, so can't start with a dot and clash with this.
+    """
+    return settings.RELEASE_STORAGE / ".archives" / workspace.name
+
 
-    # rewind the file stream to the start
-    in_memory_zf.seek(0)
+def archive_path(workspace, release_files, url_builder_func):
+    """
+    Get the path to the cached archive of the given ReleaseFiles
+
+    Archives are keyed by everything which ends up in them, so a different
+    set of files, or a file being redacted, gives a different archive.
+    """
+    contents = [
+        [
+            rfile.id,
+            rfile.name,
+            rfile.filehash,
+            redaction_notice(rfile, url_builder_func) if rfile.is_deleted else None,
+        ]
+        for rfile in sorted(release_files, key=lambda f: f.name)
+    ]
+    key = hashlib.sha256(json.dumps(contents).encode()).hexdigest()
 
-    return in_memory_zf
+    return archives_path(workspace) / f"{key}.zip"
+
+
+def cache_archive(chunks, path):
+    """
+    Pass through the chunks of an archive, saving them to path as we go
+
+    The archive is only moved into place once it's complete, so an
+    interrupted download never leaves a partial archive to be served later.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.stem}.{uuid.uuid4().hex}.tmp")
+
+    try:
+        with tmp_path.open("wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+
+        tmp_path.replace(path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    evict_archives()
+
+
+def evict_archives():
+    """
+    Remove the least recently used archives over RELEASE_ARCHIVES_MAX_SIZE
+
+    We touch an archive each time it's served, so its mtime is when it was
+    last used.
+    """
+    archives = []
+    for path in (settings.RELEASE_STORAGE / ".archives").glob("*/*.zip"):
+        try:
+            archives.append((path.stat(), path))
+        except FileNotFoundError:  # evicted by another process
+            continue
+
+    archives.sort(key=lambda a: a[0].st_mtime, reverse=True)
+
+    total_size = 0
+    for stat, path in archives:
+        total_size += stat.st_size
+        if total_size > settings.RELEASE_ARCHIVES_MAX_SIZE:
+            path.unlink(missing_ok=True)
+
+
+def clear_archives(workspace):
+    """Remove a Workspace's cached archives, eg when one of its files is redacted"""
+    shutil.rmtree(archives_path(workspace), ignore_errors=True)
+
+
+def zip_response(request, workspace, release_files, filename):
+    """
+    Serve a zip of the given ReleaseFiles as an attachment
+
+    The first download of a set of files streams the archive as it's built,
+    and caches it under RELEASE_STORAGE.  Later downloads are served from the
+    cache, by nginx if the Releases-Redirect header is set, as with
+    serve_file.
+    """
+    release_files = list(release_files)
+    path = archive_path(workspace, release_files, request.build_absolute_uri)
+
+    try:
+        # mark the archive as recently used, so it's the last to be evicted
+        os.utime(path)
+    except FileNotFoundError:
+        chunks = build_outputs_zip(release_files, request.build_absolute_uri)
+        return StreamingHttpResponse(
+            cache_archive(chunks, path),
+            headers={
+                "Content-Type": "application/zip",
+                "Content-Disposition": content_disposition_header(True, filename),
+            },
+        )
+
+    internal_redirect = request.headers.get("Releases-Redirect")
+    if internal_redirect:
+        # we're behind nginx, so use X-Accel-Redirect to serve the archive
+        # from nginx, relative to RELEASE_STORAGE.
+        response = HttpResponse(content_type="application/zip")
+        response.headers["Content-Disposition"] = content_disposition_header(
+            True, filename
+        )
+        relative_path = path.relative_to(settings.RELEASE_STORAGE)
+        response.headers["X-Accel-Redirect"] = f"{internal_redirect}/{relative_path}"
+        return response
+
+    return FileResponse(path.open("rb"), as_attachment=True, filename=filename)
 
 
 @transaction.atomic
@@ -120,17 +291,109 @@ def create_release(workspace, backend, created_by, requested_files, **kwargs):
     return release
 
 
+# How much of an uploaded file we read at a time when writing it to disk
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def blob_path(filehash):
+    """
+    Get the path to the blob holding the contents with the given hash
+
+    Every uploaded file's contents are stored once in RELEASE_STORAGE/.blobs,
+    and hard linked to each ReleaseFile's path, so re-releasing an unchanged
+    file doesn't use any more disk.  The link count of a blob is the number of
+    ReleaseFiles using it, plus one for the blob itself.
+
+    Returns None if filehash isn't a SHA-256 hex digest, since it can come
+    from a client.
+    """
+    if not re.fullmatch(r"[0-9a-f]{64}", filehash or ""):
+        return None
+
+    return settings.RELEASE_STORAGE / ".blobs" / filehash[:2] / filehash
+
+
+def _temporary_path(path):
+    return path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+
+
+def _write_upload(upload, absolute_path):
+    """
+    Write an upload to a temporary file beside absolute_path
+
+    The upload is read and hashed in chunks, so we never hold the whole file
+    in memory.  Returns the temporary path, for the caller to move into place
+    or remove, and the upload's SHA-256 hash.
+    """
+    tmp_path = _temporary_path(absolute_path)
+    calculated_hash = hashlib.sha256()
+
+    try:
+        with tmp_path.open("wb") as f:
+            while chunk := upload.read(UPLOAD_CHUNK_SIZE):
+                calculated_hash.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    return tmp_path, calculated_hash.hexdigest()
+
+
+def _hash_upload(upload):
+    calculated_hash = hashlib.sha256()
+    while chunk := upload.read(UPLOAD_CHUNK_SIZE):
+        calculated_hash.update(chunk)
+
+    return calculated_hash.hexdigest()
+
+
+def _store_upload(tmp_path, filehash, absolute_path):
+    """
+    Move a written upload into the blob store, and link it to absolute_path
+
+    If we already have a blob with the same contents the upload is discarded
+    in favour of it.
+    """
+    blob = blob_path(filehash)
+    blob.parent.mkdir(parents=True, exist_ok=True)
+
+    if blob.exists():
+        tmp_path.unlink()
+    else:
+        tmp_path.replace(blob)
+
+    _link_blob(blob, absolute_path)
+
+
+def _link_blob(blob, absolute_path):
+    """Hard link a blob to absolute_path, replacing anything already there"""
+    tmp_path = _temporary_path(absolute_path)
+    os.link(blob, tmp_path)
+    tmp_path.replace(absolute_path)
+
+
+def remove_unused_blob(filehash):
+    """Remove the blob for filehash if no ReleaseFile is linked to it"""
+    blob = blob_path(filehash)
+    if blob is None:
+        return
+
+    try:
+        if blob.stat().st_nlink <= 1:
+            blob.unlink()
+    except FileNotFoundError:
+        # files uploaded before we stored blobs don't have one
+        pass
+
+
 @transaction.atomic
 def handle_file_upload(release, backend, user, upload, filename, **kwargs):
     """Validate and save an uploaded file to disk and database.
 
     Does basic detection of re-uploads of the same file, to avoid duplication.
     """
-    # This reads the whole file into memory, but should not be a problem.
-    # TODO: enforce a max upload size?
-    data = upload.read()
-    calculated_hash = hashlib.sha256(data).hexdigest()
-    relative_path, absolute_path = _build_paths(release, filename, data)
+    relative_path, absolute_path = _build_paths(release, filename)
 
     # Check if this filename for this release has been uploaded before.
     rfile = ReleaseFile.objects.filter(
@@ -139,8 +402,25 @@ def handle_file_upload(release, backend, user, upload, filename, **kwargs):
         name=filename,
     ).first()
 
+    # _is_ on disk
+    if rfile and rfile.uploaded_at:
+        # existence of a ReleaseFile isn't an error case now but a file-on-disk
+        # having already been uploaded is
+        raise ReleaseFileAlreadyExists(
+            f"This version of '{filename}' has already been uploaded from backend '{backend.slug}'"
+        )
+
+    blob = blob_path(rfile.filehash) if rfile else None
+    if blob and blob.exists():
+        # we already have the contents we're expecting, from an earlier
+        # release, so we only need to check the upload matches them
+        tmp_path = None
+        calculated_hash = _hash_upload(upload)
+    else:
+        tmp_path, calculated_hash = _write_upload(upload, absolute_path)
+
     if not rfile:  # old flow
-        absolute_path.write_bytes(data)
+        _store_upload(tmp_path, calculated_hash, absolute_path)
 
         mtime = datetime.fromtimestamp(absolute_path.stat().st_mtime, tz=UTC)
         size = absolute_path.stat().st_size
@@ -161,26 +441,25 @@ def handle_file_upload(release, backend, user, upload, filename, **kwargs):
         except Exception:
             # something went wrong, clean up file, they will need to reupload
             absolute_path.unlink(missing_ok=True)
+            remove_unused_blob(calculated_hash)
             raise
 
     # New flow
 
-    # _is_ on disk
-    if rfile.uploaded_at:
-        # existence of a ReleaseFile isn't an error case now but a file-on-disk
-        # having already been uploaded is
-        raise ReleaseFileAlreadyExists(
-            f"This version of '{filename}' has already been uploaded from backend '{backend.slug}'"
-        )
-
     # We have a ReleaseFile but no file-on-disk, but we still need to confirm
     # the uploaded files hash matches what was sent to us when the ReleaseFile
     # and Release were created.
     if rfile.filehash != calculated_hash:
+        if tmp_path:
+            tmp_path.unlink()
         msg = "Contents of uploaded file does not match the file which a review was requested for"
         raise ReleaseFileHashMismatch(msg)
 
-    absolute_path.write_bytes(data)
+    if tmp_path:
+        _store_upload(tmp_path, calculated_hash, absolute_path)
+    else:
+        _link_blob(blob, absolute_path)
+
     rfile.path = str(relative_path)
     rfile.uploaded_at = timezone.now()
     rfile.save(update_fields=["path", "uploaded_at"])
@@ -181,6 +181,51 @@ if READONLY_DATABASE_URL:
     DATABASES[READONLY_DATABASE_ALIAS] = dj_database_url.parse(READONLY_DATABASE_URL)
 
 
+# Caches
+# https://docs.djangoproject.com/en/5.2/ref/settings/#caches
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Files fetched from GitHub at a given commit, the OpenCodelists check of
+    # them, and parsed and rendered project.yamls. Content at a commit never
+    # changes, so entries don't expire, and the least recently used are
+    # evicted once there are PIPELINE_CACHE_MAX_ENTRIES of them or they add up
+    # to PIPELINE_CACHE_MAX_SIZE bytes. We don't have a shared cache server,
+    # so each gunicorn worker has its own copy of this cache, and the memory
+    # it can use is multiplied by the number of workers. See
+    # jobserver/pipeline_config.py.
+    "pipeline": {
+        "BACKEND": "jobserver.cache_backends.SizeBoundedLocMemCache",
+        "LOCATION": "pipeline",
+        "TIMEOUT": None,
+        "OPTIONS": {
+            "MAX_ENTRIES": int(
+                os.environ.get("PIPELINE_CACHE_MAX_ENTRIES", default="1000")
+            ),
+            "MAX_SIZE": int(
+                os.environ.get("PIPELINE_CACHE_MAX_SIZE", default=str(32 * 1024 * 1024))
+            ),
+        },
+    },
+}
+# The OpenCodelists check depends on the state of OpenCodelists as well as
+# the commit, so it's only cached for PIPELINE_CODELISTS_CHECK_TTL seconds.
+PIPELINE_CODELISTS_CHECK_TTL = int(
+    os.environ.get("PIPELINE_CODELISTS_CHECK_TTL", default="300")
+)
+
+# RedirectsMiddleware keeps all Redirects in memory, in each process, and
+# reloads them after REDIRECTS_CACHE_TTL seconds to pick up changes made by
+# other processes. Saving or deleting a Redirect only reloads them in the
+# process which made the change, so a new Redirect can take up to
+# REDIRECTS_CACHE_TTL seconds to apply in the other gunicorn workers. Redirects
+# which have been deleted, or had their old_url changed, are noticed when
+# they're next matched, and reloaded straight away. Reloading is one small
+# query, so we keep this short. See redirects/middleware.py.
+REDIRECTS_CACHE_TTL = int(os.environ.get("REDIRECTS_CACHE_TTL", default="10"))
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
@@ -457,6 +502,12 @@ RELEASE_FILE_SIZE_LIMIT = int(
 # surprises with django's default uploads implementation.
 RELEASE_STORAGE = Path(os.environ.get("RELEASE_STORAGE", default="releases"))
 
+# How much space archives of released files, cached in RELEASE_STORAGE for
+# "download all" links, can use before the least recently used are removed.
+RELEASE_ARCHIVES_MAX_SIZE = int(
+    os.environ.get("RELEASE_ARCHIVES_MAX_SIZE", default=str(10 * 1024**3))
+)
+
 # Path where the data scrubbing job writes the final scrubbed database dump.
 SCRUBBED_DATABASE_DUMP_PATH = Path(
     os.environ.get("JOBSERVER_SCRUBBED_DUMP_PATH", default="jobserver_scrubbed.dump")
@@ -524,8 +575,95 @@ UNIVERSITY_OF_BRISTOL_ORG_PK = 9
 # fetch job updates
 RAP_API_POLL_INTERVAL = int(os.environ.get("RAP_API_POLL_INTERVAL", default="60"))
 
+# Job requests which are running, or were created less than
+# RAP_API_RECENT_JOB_REQUEST_AGE seconds ago, are polled every
+# RAP_API_POLL_INTERVAL. Other active job requests (eg long-pending ones) are
+# only polled every RAP_API_SLOW_POLL_INTERVAL seconds.
+RAP_API_SLOW_POLL_INTERVAL = int(
+    os.environ.get("RAP_API_SLOW_POLL_INTERVAL", default="300")
+)
+RAP_API_RECENT_JOB_REQUEST_AGE = int(
+    os.environ.get("RAP_API_RECENT_JOB_REQUEST_AGE", default="3600")
+)
+
+# The longest time in seconds to back off between calls to the RAP API status
+# endpoint when it is returning errors
+RAP_API_MAX_BACKOFF = int(os.environ.get("RAP_API_MAX_BACKOFF", default="600"))
+
+# The RAP status service splits active RAP ids into shards of at most this
+# many ids, and fetches and processes up to RAP_API_STATUS_MAX_WORKERS shards
+# concurrently.
+RAP_API_STATUS_SHARD_SIZE = int(
+    os.environ.get("RAP_API_STATUS_SHARD_SIZE", default="100")
+)
+RAP_API_STATUS_MAX_WORKERS = int(
+    os.environ.get("RAP_API_STATUS_MAX_WORKERS", default="4")
+)
+
+# How long in seconds to wait to connect to the RAP API, and then for it to
+# respond, before giving up on a request
+RAP_API_CONNECT_TIMEOUT = int(os.environ.get("RAP_API_CONNECT_TIMEOUT", default="5"))
+RAP_API_READ_TIMEOUT = int(os.environ.get("RAP_API_READ_TIMEOUT", default="10"))
+
+# How many times to retry a failed RAP API request which is safe to retry, and
+# how many connections to the RAP API to keep open for reuse. The pool should
+# be at least as big as RAP_API_STATUS_MAX_WORKERS.
+#
+# RAP API calls are made from web requests (eg cancelling a job request), so
+# (connect + read timeout) * (retries + 1), plus the backoff between retries,
+# must fit inside gunicorn's worker timeout (see gunicorn.conf.py).  The
+# defaults come to 3 * 15 + 1 = 46 seconds.
+RAP_API_MAX_RETRIES = int(os.environ.get("RAP_API_MAX_RETRIES", default="2"))
+RAP_API_POOL_SIZE = int(os.environ.get("RAP_API_POOL_SIZE", default="10"))
+
+# The send_job_notifications service checks the job notification outbox every
+# JOB_NOTIFICATION_POLL_INTERVAL seconds, sending up to
+# JOB_NOTIFICATION_BATCH_SIZE notifications at a time. Failed notifications are
+# retried after JOB_NOTIFICATION_RETRY_DELAY seconds, doubling each time, until
+# they have been tried JOB_NOTIFICATION_MAX_ATTEMPTS times.
+JOB_NOTIFICATION_POLL_INTERVAL = int(
+    os.environ.get("JOB_NOTIFICATION_POLL_INTERVAL", default="10")
+)
+JOB_NOTIFICATION_BATCH_SIZE = int(
+    os.environ.get("JOB_NOTIFICATION_BATCH_SIZE", default="50")
+)
+JOB_NOTIFICATION_RETRY_DELAY = int(
+    os.environ.get("JOB_NOTIFICATION_RETRY_DELAY", default="60")
+)
+JOB_NOTIFICATION_MAX_ATTEMPTS = int(
+    os.environ.get("JOB_NOTIFICATION_MAX_ATTEMPTS", default="5")
+)
+
+# The rap_submission_service checks for job requests awaiting submission to
+# the RAP API every RAP_SUBMISSION_POLL_INTERVAL seconds, submitting up to
+# RAP_SUBMISSION_BATCH_SIZE of them at a time. Users wait on this after
+# requesting jobs, so keep the interval short.
+RAP_SUBMISSION_POLL_INTERVAL = int(
+    os.environ.get("RAP_SUBMISSION_POLL_INTERVAL", default="2")
+)
+RAP_SUBMISSION_BATCH_SIZE = int(
+    os.environ.get("RAP_SUBMISSION_BATCH_SIZE", default="10")
+)
+# A job request claimed by the rap_submission_service is submitted again if
+# its result hasn't been recorded after RAP_SUBMISSION_CLAIM_TIMEOUT seconds
+# (eg because the service died).  This must be longer than a submission can
+# take, including the RAP API's retries (see RAP_API_MAX_RETRIES).
+RAP_SUBMISSION_CLAIM_TIMEOUT = int(
+    os.environ.get("RAP_SUBMISSION_CLAIM_TIMEOUT", default="300")
+)
+
 # GitHub token for interactions with the GitHub API.
 # See jobserver/github.py for how this is used.
 # See DEVELOPERS.md and TESTING.md for information on how it is used in
 # production, CI, and developer environments.
 JOBSERVER_GITHUB_TOKEN = os.environ.get("JOBSERVER_GITHUB_TOKEN", default=None)
+
+# GET responses from GitHub's REST API are cached for up to
+# GITHUB_API_CACHE_TTL seconds, and revalidated with a conditional request
+# each time they're used. Set to 0 to disable the cache.
+GITHUB_API_CACHE_TTL = int(os.environ.get("GITHUB_API_CACHE_TTL", default="3600"))
+
+# The secret GitHub signs webhook deliveries with, which keep repo metadata
+# up to date. Webhooks are rejected when this isn't set.
+# See jobserver/api/webhooks.py.
+GITHUB_WEBHOOK_SECRET = os.environ.get("GITHUB_WEBHOOK_SECRET", default="")
@@ -18,6 +18,7 @@ from jobserver.api.releases import (
     Level4TokenAuthenticationAPI,
     ReleaseAPI,
     ReleaseFileAPI,
+    ReleaseFilesAPI,
     ReleaseWorkspaceAPI,
     ReviewAPI,
     SnapshotAPI,
@@ -25,6 +26,7 @@ from jobserver.api.releases import (
     SnapshotPublishAPI,
     WorkspaceStatusAPI,
 )
+from jobserver.api.webhooks import GitHubWebhookAPI
 from jobserver.views.health_check import HealthCheck
 
 from .views import yours
@@ -83,6 +85,7 @@ api_urls = [
     path("job-requests/", JobRequestAPIList.as_view()),
     path("jobs/", JobAPIUpdate.as_view()),
     path("users/<str:username>/", UserAPIDetail.as_view(), name="user-detail"),
+    path("webhooks/github/", GitHubWebhookAPI.as_view(), name="github-webhook"),
     path(
         "workspaces/<str:name>/statuses/",
         WorkspaceStatusesAPI.as_view(),
@@ -119,6 +122,11 @@ api_urls = [
         ReleaseAPI.as_view(),
         name="release",
     ),
+    path(
+        "releases/release/<str:release_id>/files",
+        ReleaseFilesAPI.as_view(),
+        name="release-files",
+    ),
     path(
         "releases/release/<str:release_id>/reviews",
         ReviewAPI.as_view(),
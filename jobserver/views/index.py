@@ -18,12 +18,16 @@ class Index(View):
             .order_by("-pk")
         )
 
+        # update statuses in bulk, rather than letting jobs_status save each
+        # job request as the template renders it
+        all_job_requests = JobRequest.objects.refresh_statuses(job_requests[:10])
+
         if not self.request.user.is_authenticated:
             return TemplateResponse(
                 request,
                 template="index-unauthenticated.html",
                 context={
-                    "all_job_requests": job_requests[:10],
+                    "all_job_requests": all_job_requests,
                 },
             )
 
@@ -58,10 +62,10 @@ class Index(View):
         }
 
         context = {
-            "all_job_requests": job_requests[:10],
+            "all_job_requests": all_job_requests,
             "applications": applications[:5],
             "counts": counts,
-            "job_requests": user_job_requests[:5],
+            "job_requests": JobRequest.objects.refresh_statuses(user_job_requests[:5]),
             "projects": projects,
             "workspaces": workspaces[:5],
         }
@@ -5,7 +5,6 @@ import structlog
 from django.conf import settings
 from django.contrib import messages
 from django.core.exceptions import MultipleObjectsReturned
-from django.db import transaction
 from django.db.models import Max, Q
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
@@ -14,7 +13,6 @@ from django.utils import timezone
 from django.utils.safestring import mark_safe
 from django.views.generic import CreateView, ListView, RedirectView, View
 from opentelemetry import trace
-from pipeline import load_pipeline
 
 from jobserver.rap_api import RapAPIError
 
@@ -24,19 +22,16 @@ from ..authorization.permissions import Permission
 from ..backends import backends_to_choices
 from ..forms import JobRequestCreateForm
 from ..github import _get_github_api
-from ..models import Backend, JobRequest, Workspace
+from ..models import Backend, JobRequest, JobRequestStatus, Workspace
 from ..pipeline_config import (
-    check_cohortextractor_usage,
-    check_sqlrunner_permission,
-    get_actions,
     get_codelists_status,
-    get_database_actions,
+    get_commit_sha,
+    get_pipeline_summary,
     get_project,
-    render_definition,
+    get_rendered_definition,
 )
 
 
-tracer = trace.get_tracer_provider().get_tracer("job_requests")
 logger = structlog.get_logger(__name__)
 
 
@@ -158,20 +153,27 @@ class JobRequestCreate(CreateView):
         # build actions as list or render the exception to the page
         ref = self.kwargs.get("ref", self.workspace.branch)
         try:
-            self.project = get_project(
+            # resolve the ref to a commit once, so the files below are fetched
+            # at a fixed commit, which lets pipeline_config cache them
+            self.sha = get_commit_sha(
                 self.workspace.repo.owner,
                 self.workspace.repo.name,
                 ref,
+                get_github_api=self.get_github_api,
+            )
+            self.project = get_project(
+                self.workspace.repo.owner,
+                self.workspace.repo.name,
+                self.sha,
             )
-            data = load_pipeline(self.project)
-            check_cohortextractor_usage(data)
-            check_sqlrunner_permission(self.workspace.project, data)
+            pipeline = get_pipeline_summary(self.project)
+            pipeline.check(self.workspace.project)
             # Find the status of the codelists in this workspace and branch
             # Codelist status is either "ok" or "error"
             self.codelists_status = get_codelists_status(
                 self.workspace.repo.owner,
                 self.workspace.repo.name,
-                ref,
+                self.sha,
             )
         except Exception as e:
             self.actions = []
@@ -184,10 +186,10 @@ class JobRequestCreate(CreateView):
             context = self.get_context_data()
             return self.render_to_response(context=context)
 
-        self.actions = list(get_actions(data))
+        self.actions = pipeline.actions
 
         # Find ehrql/cohort-extractor actions that will use codelists
-        self.database_actions = list(get_database_actions(data))
+        self.database_actions = pipeline.database_actions
         if self.codelists_status != "ok":
             # At this stage we don't know whether requested jobs depend on
             # codelists, so just show a warning.
@@ -200,23 +202,17 @@ class JobRequestCreate(CreateView):
 
         return super().dispatch(request, *args, **kwargs)
 
-    @transaction.atomic
     def form_valid(self, form):
-        if (sha := self.kwargs.get("ref")) is None:
-            # if a ref wasn't passed in the URL convert the branch to a sha
-            sha = self.get_github_api().get_branch_sha(
-                self.workspace.repo.owner,
-                self.workspace.repo.name,
-                self.workspace.branch,
-            )
-
         backend = Backend.objects.get(slug=form.cleaned_data.pop("backend"))
+        # Creating the RAP is left to the rap_submission_service, so we don't
+        # hold this request open while we wait on the RAP API
         job_request = backend.job_requests.create(
             workspace=self.workspace,
             created_by=self.request.user,
-            sha=sha,
+            sha=self.sha,
             project_definition=self.project,
             codelists_ok=self.codelists_status == "ok",
+            _status=JobRequestStatus.SUBMITTING,
             **form.cleaned_data,
         )
 
@@ -226,33 +222,10 @@ class JobRequestCreate(CreateView):
             "requested_actions": job_request.requested_actions,
         }
         trace.get_current_span().set_attributes(tracing_attributes)
-        # Trace the RAP API call
-        with tracer.start_as_current_span(
-            "create_rap",
-            attributes={
-                "rap_id": job_request.identifier,
-                "requested_actions": job_request.requested_actions,
-            },
-        ):
-            # Invoke the RAP API and handle RapAPIErrors.
-            job_count = job_request.request_rap_creation()
-            if job_count is not None and job_count > 0:
-                # Report success. Note we don't display a count of jobs created, even though we have that
-                # from the RAP API response, because the jobs have not been created on job server yet, so
-                # won't be immediately displayed in the UI
-                messages.success(self.request, self.success_message())
-            else:
-                # No jobs were created by the RAP controller, either an error, or there was nothing to
-                # do; we just report the job request status, and status message (if there is one)
-                extra = (
-                    f" ({job_request.status_message})"
-                    if job_request.status_message
-                    else ""
-                )
-                messages.info(
-                    self.request,
-                    f"No actions scheduled: {job_request.human_readable_status}{extra}",
-                )
+
+        # Note we don't know how many jobs will be created yet, the job
+        # request's status will show that once it has been submitted
+        messages.success(self.request, self.success_message())
 
         return redirect(
             "workspace-logs",
@@ -289,7 +262,7 @@ class JobRequestCreate(CreateView):
         )
 
     def success_message(self):
-        return "Requested actions have been scheduled to run."
+        return "Requested actions have been submitted and will be scheduled to run shortly."
 
 
 class JobRequestDetail(View):
@@ -389,6 +362,7 @@ class JobRequestDetail(View):
         # render slowly. The 10K character limit (~10-40KB) is arbitrary. It
         # could be refined, perhaps with telemetry. Length is an imperfect
         # proxy for render cost, but better than size, which ignores encoding.
+        # It also keeps the rendered HTML we cache per worker small.
         is_too_large = len(job_request.project_definition) > 10_000  # ~10-40KB
 
         if is_empty:
@@ -401,9 +375,10 @@ class JobRequestDetail(View):
             project_definition = "This file is too large to render."
         else:
             project_definition = mark_safe(
-                render_definition(
+                get_rendered_definition(
                     job_request.project_definition,
                     job_request.get_file_url,
+                    job_request.get_repo_url(),
                 )
             )
 
@@ -432,3 +407,12 @@ class JobRequestList(ListView):
             .prefetch_related("workspace__project__orgs")
             .order_by("-pk")
         )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        # update the statuses for this page in bulk, rather than letting
+        # jobs_status save each one as the template renders it
+        JobRequest.objects.refresh_statuses(context["object_list"])
+
+        return context
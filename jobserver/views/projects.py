@@ -1,5 +1,3 @@
-import concurrent
-import itertools
 import operator
 
 from django.core.exceptions import PermissionDenied
@@ -8,7 +6,6 @@ from django.db.models.functions import Least, Lower
 from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
 from django.views.generic import ListView, UpdateView, View
-from opentelemetry import context as otel_context
 from opentelemetry import trace
 
 from jobserver.actions import projects
@@ -16,18 +13,10 @@ from jobserver.utils import set_from_qs
 
 from ..authorization import has_permission
 from ..authorization.permissions import Permission
-from ..github import GitHubError, _get_github_api
 from ..models import Job, JobRequest, Project, PublishRequest, Repo, Snapshot
 
 
-# Create a global threadpool for getting repos.  This lets us have a single
-# pool across all requests and saves the overhead from setting up threads on
-# each request.
-repo_thread_pool = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="get_repo")
-
-
 class ProjectDetail(View):
-    get_github_api = staticmethod(_get_github_api)
     tracer = trace.get_tracer_provider().get_tracer(__name__)
 
     def get(self, request, *args, **kwargs):
@@ -72,9 +61,15 @@ class ProjectDetail(View):
                 first_job_ran_at = None
 
         with self.tracer.start_as_current_span("repos"):
+            # privacy comes from the metadata the update_repo_metadata job
+            # mirrors from GitHub, repos it hasn't seen yet are treated as
+            # private until it has
             repos = Repo.objects.filter(workspaces__in=workspaces).distinct()
 
-            all_repos = list(self.iter_repos(repos, otel_context.get_current()))
+            all_repos = [
+                {"name": r.name, "url": r.url, "is_private": r.is_private}
+                for r in repos
+            ]
 
             private_repos = sorted(
                 (r for r in all_repos if r["is_private"] or r["is_private"] is None),
@@ -131,35 +126,6 @@ class ProjectDetail(View):
             .order_by("-publish_requests__decision_at")
         )
 
-    def iter_repos(self, repos, ctx):
-        def get_repo(repo, ctx):
-            otel_context.attach(ctx)
-            with self.tracer.start_as_current_span("get_repo"):
-                try:
-                    is_private = self.get_github_api().get_repo_is_private(
-                        repo.owner, repo.name
-                    )
-                except GitHubError:
-                    is_private = None
-                span = trace.get_current_span()
-                span.set_attribute("repo_owner", repo.owner)
-                span.set_attribute("repo_name", repo.name)
-                span.set_attribute("repo_is_private", is_private)
-
-                return {
-                    "name": repo.name,
-                    "url": repo.url,
-                    "is_private": is_private,
-                }
-
-        # use the threadpool to parallelise the repo requests
-        try:
-            yield from repo_thread_pool.map(
-                get_repo, repos, itertools.repeat(ctx), timeout=30
-            )
-        except TimeoutError:
-            yield {"name": "GitHub API Unavailable", "is_private": None, "url": ""}
-
 
 class ProjectEdit(UpdateView):
     fields = [
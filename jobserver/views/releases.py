@@ -2,7 +2,7 @@ from csp.decorators import csp_exempt
 from django.contrib.humanize.templatetags.humanize import naturaltime
 from django.db import transaction
 from django.db.models import Prefetch
-from django.http import FileResponse, Http404
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
 from django.urls import reverse
@@ -20,7 +20,13 @@ from ..models import (
     Snapshot,
     Workspace,
 )
-from ..releases import build_outputs_zip, serve_file, workspace_files
+from ..releases import (
+    clear_archives,
+    remove_unused_blob,
+    serve_file,
+    workspace_files,
+    zip_response,
+)
 from ..utils import build_spa_base_url
 
 
@@ -169,11 +175,8 @@ class ReleaseDownload(View):
         ):
             raise Http404
 
-        zf = build_outputs_zip(release.files.all(), request.build_absolute_uri)
-        return FileResponse(
-            zf,
-            as_attachment=True,
-            filename=f"release-{release.pk}.zip",
+        return zip_response(
+            request, release.workspace, release.files.all(), f"release-{release.pk}.zip"
         )
 
 
@@ -198,8 +201,11 @@ class ReleaseFileDelete(View):
             raise Http404
 
         with transaction.atomic():
-            # delete file on disk
+            # delete file on disk, its contents if no other release has the
+            # same file, and any archives it's in
             rfile.absolute_path().unlink()
+            remove_unused_blob(rfile.filehash)
+            clear_archives(rfile.release.workspace)
 
             rfile.deleted_by = request.user
             rfile.deleted_at = timezone.now()
@@ -276,11 +282,11 @@ class SnapshotDownload(View):
         if snapshot.is_draft and not can_view_unpublished_files:
             raise Http404
 
-        zf = build_outputs_zip(snapshot.files.all(), request.build_absolute_uri)
-        return FileResponse(
-            zf,
-            as_attachment=True,
-            filename=f"release-{snapshot.pk}.zip",
+        return zip_response(
+            request,
+            snapshot.workspace,
+            snapshot.files.all(),
+            f"release-{snapshot.pk}.zip",
         )
 
 
@@ -6,7 +6,7 @@ from django.core.exceptions import PermissionDenied
 from django.db import transaction
 from django.db.models import Q
 from django.db.models.functions import Least
-from django.http import FileResponse, Http404
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
 from django.utils import timezone
@@ -30,7 +30,7 @@ from ..models import (
     Repo,
     Workspace,
 )
-from ..releases import build_outputs_zip, workspace_files
+from ..releases import workspace_files, zip_response
 from ..utils import build_spa_base_url
 
 
@@ -145,8 +145,6 @@ class WorkspaceCreate(CreateView):
 
 
 class WorkspaceDetail(View):
-    get_github_api = staticmethod(_get_github_api)
-
     def get(self, request, *args, **kwargs):
         workspace = get_object_or_404(
             Workspace,
@@ -168,12 +166,7 @@ class WorkspaceDetail(View):
         # https://docs.opensafely.org/repositories/#when-you-need-to-make-your-code-public
         eleven_months_ago = timezone.now() - timedelta(days=30 * 11)
         is_member = request.user in workspace.project.members.all()
-        try:
-            repo_is_private = self.get_github_api().get_repo_is_private(
-                workspace.repo.owner, workspace.repo.name
-            )
-        except GitHubError:
-            repo_is_private = None
+        repo_is_private = workspace.repo.is_private
         show_publish_repo_warning = (
             is_member
             and first_job
@@ -408,11 +401,8 @@ class WorkspaceLatestOutputsDownload(View):
         # get the latest files as an iterable of ReleaseFile instances
         latest_files = workspace_files(workspace).values()
 
-        zf = build_outputs_zip(latest_files, request.build_absolute_uri)
-        return FileResponse(
-            zf,
-            as_attachment=True,
-            filename=f"workspace-{workspace.name}.zip",
+        return zip_response(
+            request, workspace, latest_files, f"workspace-{workspace.name}.zip"
         )
 
 
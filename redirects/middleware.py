@@ -1,10 +1,83 @@
-from django.db.models import CharField, F, Value
-from django.db.models.functions import Length
+import threading
+import time
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.shortcuts import redirect
 
 from .models import Redirect
 
 
+class RedirectTrie:
+    """
+    A character trie of Redirect old_urls
+
+    Finding the longest old_url which prefixes a path means walking the path
+    once, rather than comparing it against every Redirect.
+    """
+
+    def __init__(self, redirects):
+        self.root = {}
+        for pk, old_url in redirects:
+            node = self.root
+            for char in old_url:
+                node = node.setdefault(char, {})
+            # None can't be a character of a URL, so we use it as the key for
+            # the Redirect which ends at this node
+            node[None] = pk
+
+    def longest_prefix(self, path):
+        """Get the PK of the Redirect with the longest old_url prefixing path"""
+        match = None
+        node = self.root
+        for char in path:
+            node = node.get(char)
+            if node is None:
+                break
+            match = node.get(None, match)
+        return match
+
+
+_lock = threading.Lock()
+_trie = None
+_loaded_at = 0
+
+
+def get_redirect_trie():
+    """
+    Get the trie of all Redirects, building it if needed
+
+    The trie is held per process, and rebuilt when a Redirect is saved or
+    deleted in this process, or once it's REDIRECTS_CACHE_TTL seconds old so
+    changes made by other processes are picked up too. Until then, another
+    process's new Redirects aren't applied here.
+    """
+    global _trie, _loaded_at
+
+    with _lock:
+        if (
+            _trie is None
+            or time.monotonic() - _loaded_at > settings.REDIRECTS_CACHE_TTL
+        ):
+            # order by PK so the newest Redirect wins for a duplicated old_url
+            _trie = RedirectTrie(
+                Redirect.objects.order_by("pk").values_list("pk", "old_url")
+            )
+            _loaded_at = time.monotonic()
+
+        return _trie
+
+
+@receiver(post_delete, sender=Redirect)
+@receiver(post_save, sender=Redirect)
+def clear_redirect_trie(**kwargs):
+    global _trie
+
+    with _lock:
+        _trie = None
+
+
 class RedirectsMiddleware:
     """Apply DB redirects to rewrite request URLs, with longer matches
     preferred. Exact matches take top priority."""
@@ -23,19 +96,26 @@ class RedirectsMiddleware:
 
         # Find the longest old_url that matches the start of request.path
         # (longer URLs are more specific). Exact matches take top priority.
+        pk = get_redirect_trie().longest_prefix(request.path)
+
+        # No match, allow the request to proceed.
+        if pk is None:
+            return self.get_response(request)
+
+        # We only hit the DB for requests we're redirecting, so we always
+        # redirect to where the target object is now
         redirection = (
-            Redirect.objects.annotate(
-                url_length=Length("old_url"),
-                request_url=Value(request.path, output_field=CharField()),
-            )
-            .filter(request_url__startswith=F("old_url"))
-            .order_by("-url_length")
+            Redirect.objects.select_related("org", "project", "workspace__project")
+            .filter(pk=pk)
             .first()
         )
 
-        # No match, allow the request to proceed.
-        if not redirection:
-            return self.get_response(request)
+        # Deleted, or moved to another old_url, by another process since we
+        # built the trie, so rebuild it and look again, in case a shorter
+        # old_url still matches.
+        if redirection is None or not request.path.startswith(redirection.old_url):
+            clear_redirect_trie()
+            return self(request)
 
         # Exact match, return the URL from the DB.
         if redirection.old_url == request.path:
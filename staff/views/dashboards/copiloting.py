@@ -11,62 +11,30 @@ from django.views.generic import TemplateView
 
 from jobserver.authorization.decorators import require_permission
 from jobserver.authorization.permissions import Permission
-from jobserver.github import GitHubError, _get_github_api
 from jobserver.models import Project, ReleaseFile, Repo
 
 
 logger = structlog.get_logger(__name__)
 
 
-class MissingGitHubReposError(Exception):
-    pass
-
-
-def build_repos_by_project(projects, get_github_api=_get_github_api):
+def build_repos_by_project(projects):
     """
     Build a dict with a list of repos indexed by project PK
 
-    We need to get public/private status from GitHub and we want to do that in
-    as few GraphQL and DB queries as possible.  This function gets all the
-    relevant repos from the db, and from GitHub, and combines them up into a
-    single structure.
+    We show each repo's public/private status, which the update_repo_metadata
+    job mirrors from GitHub onto Repo, so this gets all the relevant repos in a
+    single query.
 
-    It returns a dict of project PK -> list of relevant repos, pulled from the
-    list of combined ones.
+    It returns a dict of project PK -> list of relevant repos.
 
-    By building this structure up front we avoid various DB and HTTP queries.
+    By building this structure up front we avoid various DB queries.
     """
-    # get all the Repo instances from the db
     db_repos = Repo.objects.filter(workspaces__project__in=projects).distinct()
 
-    # Get a set of GitHub orgs so the API can pull repo details from each one
-    repo_orgs = {r.owner for r in db_repos}
-
-    try:
-        github_repos = list(get_github_api().get_repos_with_status_and_url(repo_orgs))
-    except GitHubError:
-        logger.exception(
-            "Failed to get repo status and URL from GitHub API",
-            repo_orgs=repo_orgs,
-        )
-        return {}
-
-    # index GitHub repo dicts by URL so they're easier to lookup
-    github_repos_by_url = {r["url"]: r for r in github_repos}
-
-    # sense check that we're not missing any repos from GitHub.  We shouldn't
-    # ever hit this path but it will be a lot easier to debug if we ever do
-    # manage to get into this state.
-    urls = {r.url for r in db_repos}
-    if missing := urls - set(github_repos_by_url.keys()):
-        output = "\n * ".join(missing)
-        raise MissingGitHubReposError(f"Missing repo URLs: {output}")
-
-    # merge the two representations of repo data into a single dict per repo
     repos = [
         {
             "get_staff_url": r.get_staff_url(),
-            "is_private": github_repos_by_url[r.url]["is_private"],
+            "is_private": r.is_private,
             "name": r.name,
             "pk": r.pk,
         }
@@ -81,7 +49,6 @@ def build_repos_by_project(projects, get_github_api=_get_github_api):
 @method_decorator(require_permission(Permission.STAFF_AREA_ACCESS), name="dispatch")
 @method_decorator(csp_exempt(), name="dispatch")
 class Copiloting(TemplateView):
-    get_github_api = staticmethod(_get_github_api)
     template_name = "staff/dashboards/copiloting.html"
 
     def get_context_data(self, **kwargs):
@@ -130,10 +97,7 @@ class Copiloting(TemplateView):
             p: len(list(files)) for p, files in release_files_by_project
         }
 
-        repos_by_project = build_repos_by_project(
-            projects=projects,
-            get_github_api=self.get_github_api,
-        )
+        repos_by_project = build_repos_by_project(projects=projects)
 
         def iter_projects(projects, file_counts_by_project, repos_by_project):
             """
@@ -12,7 +12,6 @@ from django.views.generic import View
 
 from jobserver.authorization.decorators import require_permission
 from jobserver.authorization.permissions import Permission
-from jobserver.github import _get_github_api
 from jobserver.models import Project, Repo, Workspace
 
 
@@ -21,8 +20,6 @@ logger = structlog.get_logger(__name__)
 
 @method_decorator(require_permission(Permission.STAFF_AREA_ACCESS), name="dispatch")
 class PrivateReposDashboard(View):
-    get_github_api = staticmethod(_get_github_api)
-
     @csp_exempt()
     def get(self, request, *args, **kwargs):
         """
@@ -39,12 +36,23 @@ class PrivateReposDashboard(View):
          * Not have the `non-research` topic.
          * First associated job was run > 11 months ago.
         """
-        all_repos = list(self.get_github_api().get_repos_with_dates("opensafely"))
-
-        # remove repos with the non-research topic
-        all_repos = [r for r in all_repos if "non-research" not in r["topics"]]
-
-        private_repos = [repo for repo in all_repos if repo["is_private"]]
+        # privacy and topics come from the metadata the update_repo_metadata
+        # job mirrors from GitHub
+        private_repos = [
+            {
+                "name": r.name,
+                "url": r.url,
+                "is_private": r.is_private,
+                "created_at": r.created_at,
+                "topics": r.topics,
+            }
+            for r in Repo.objects.filter(
+                url__istartswith="https://github.com/opensafely/", is_private=True
+            )
+            # remove repos with the non-research topic
+            .exclude(topics__contains=["non-research"])
+            .order_by(Lower("url"))
+        ]
 
         all_workspaces = list(
             Workspace.objects.exclude(project__slug="opensafely-testing")
@@ -67,7 +75,7 @@ class PrivateReposDashboard(View):
 
         def enhance(repo):
             """
-            Enhance the repo dict from get_repos_with_dates() with workspace data
+            Enhance the repo dict with workspace data
 
             We need to filter repos, not workspaces, so this gives us all the
             information we need when filtering further down.
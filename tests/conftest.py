@@ -10,7 +10,7 @@ import structlog
 from django.conf import settings
 from django.contrib.messages.storage.fallback import FallbackStorage
 from django.contrib.sessions.backends.db import SessionStore
-from django.core.cache import cache
+from django.core.cache import cache, caches
 from django.core.handlers.wsgi import WSGIRequest
 from django.test import RequestFactory, override_settings
 from django.utils import timezone
@@ -31,6 +31,7 @@ from jobserver.authorization.roles import (
     TechSupport,
 )
 from jobserver.models import SiteAlert, User
+from redirects import middleware
 from services.logging import base_processors
 from services.tracing import add_exporter, get_provider
 
@@ -95,6 +96,20 @@ def github_max_retry(monkeypatch):
     monkeypatch.setattr(settings, "DEFAULT_MAX_GITHUB_RETRIES", 1)
 
 
+@pytest.fixture(autouse=True)
+def clear_pipeline_cache():
+    """Clear content cached by commit so tests' fake repos don't pollute each other."""
+    yield
+    caches["pipeline"].clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_redirect_trie():
+    """Clear the in-memory Redirects so they don't outlive a test's DB."""
+    yield
+    middleware.clear_redirect_trie()
+
+
 @pytest.fixture
 def user():
     """
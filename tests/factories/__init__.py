@@ -4,6 +4,7 @@ from .backend import *
 from .backend_membership import *
 from .django.contrib.sessions.session import SessionFactory  # noqa: F401
 from .job import *
+from .job_notification import *
 from .job_request import *
 from .org import *
 from .org_membership import *
@@ -0,0 +1,14 @@
+import factory
+
+from jobserver.models import JobNotification
+
+
+class JobNotificationFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = JobNotification
+
+    job = factory.SubFactory(
+        "tests.factories.JobFactory",
+        job_request__will_notify=True,
+        status="succeeded",
+    )
@@ -61,6 +61,9 @@ class FakeGitHubAPI:
     def get_branch_sha(self, org, repo, branch):
         return self.get_branch(org, repo, branch)["commit"]["sha"]
 
+    def get_commit_sha(self, org, repo, ref):
+        return "abc123"
+
     def get_file(self, org, repo, branch, filepath="project.yaml"):
         return textwrap.dedent(
             """
@@ -92,13 +95,15 @@ class FakeGitHubAPI:
             },
         ]
 
-    def get_repos_with_dates(self, org):
+    def get_repos_with_metadata(self, org):
         return [
             {
                 "name": "predates-job-server",
                 "url": "https://github.com/opensafely/predates-job-server",
                 "is_private": True,
                 "created_at": datetime(2020, 7, 31, tzinfo=UTC),
+                "pushed_at": datetime(2020, 7, 31, tzinfo=UTC),
+                "default_branch": "main",
                 "topics": ["github-releases"],
             },
             {
@@ -106,6 +111,8 @@ class FakeGitHubAPI:
                 "url": "https://github.com/opensafely/research-repo-1",
                 "is_private": True,
                 "created_at": timezone.now(),
+                "pushed_at": timezone.now(),
+                "default_branch": "main",
                 "topics": ["github-releases"],
             },
             {
@@ -113,6 +120,8 @@ class FakeGitHubAPI:
                 "url": "https://github.com/opensafely/research-repo-2",
                 "is_private": True,
                 "created_at": timezone.now(),
+                "pushed_at": timezone.now(),
+                "default_branch": "main",
                 "topics": [],
             },
             {
@@ -120,6 +129,8 @@ class FakeGitHubAPI:
                 "url": "https://github.com/opensafely/research-repo-3",
                 "is_private": False,
                 "created_at": timezone.now(),
+                "pushed_at": timezone.now(),
+                "default_branch": "main",
                 "topics": ["github-releases"],
             },
             {
@@ -127,6 +138,8 @@ class FakeGitHubAPI:
                 "url": "https://github.com/opensafely/research-repo-4",
                 "is_private": True,
                 "created_at": timezone.now(),
+                "pushed_at": timezone.now(),
+                "default_branch": "main",
                 "topics": [],
             },
             {
@@ -134,34 +147,12 @@ class FakeGitHubAPI:
                 "url": "https://github.com/opensafely/research-repo-5",
                 "is_private": True,
                 "created_at": timezone.now(),
+                "pushed_at": timezone.now(),
+                "default_branch": "main",
                 "topics": [],
             },
         ]
 
-    def get_repos_with_status_and_url(self, orgs):
-        return [
-            {
-                "is_private": True,
-                "url": "https://github.com/opensafely/research-repo-1",
-            },
-            {
-                "is_private": True,
-                "url": "https://github.com/opensafely/research-repo-2",
-            },
-            {
-                "is_private": False,
-                "url": "https://github.com/opensafely/research-repo-3",
-            },
-            {
-                "is_private": True,
-                "url": "https://github.com/opensafely/research-repo-4",
-            },
-            {
-                "is_private": True,
-                "url": "https://github.com/opensafely/research-repo-5",
-            },
-        ]
-
 
 class FakeGitHubAPIWithErrors:
     """Fake GitHubAPI that returns an error for each corresponding public
@@ -204,6 +195,9 @@ class FakeGitHubAPIWithErrors:
     def get_branch_sha(self, org, repo, branch):
         raise GitHubError()
 
+    def get_commit_sha(self, org, repo, ref):
+        raise GitHubError()
+
     def get_file(self, org, repo, branch, filepath="project.yaml"):
         raise GitHubError()
 
@@ -222,10 +216,7 @@ class FakeGitHubAPIWithErrors:
     def get_repos_with_branches(self, org):
         raise GitHubError()
 
-    def get_repos_with_dates(self, org):
-        raise GitHubError()
-
-    def get_repos_with_status_and_url(self, orgs):
+    def get_repos_with_metadata(self, org):
         raise GitHubError()
 
 
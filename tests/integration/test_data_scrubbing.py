@@ -1,4 +1,5 @@
 import inspect
+import io
 
 import pytest
 from django.contrib.sessions.models import Session
@@ -6,7 +7,11 @@ from django.core.management import call_command
 from django.core.management.base import CommandError
 from social_django.models import Association, Code, Nonce, Partial, UserSocialAuth
 
-from data_scrubbing.management.commands.scrub_data import get_scrubbed_models
+from data_scrubbing.management.commands.scrub_data import (
+    get_fake_unique_email,
+    get_scrubbed_models,
+)
+from jobserver.models import User
 
 from ..factories import (
     AssociationFactory,
@@ -93,6 +98,31 @@ def test_scrub_data_command_success(freezer):
             )
 
 
+@pytest.mark.django_db
+@pytest.mark.slow_test
+def test_scrub_data_command_reports_every_record_scrubbed(monkeypatch):
+    """Test that the scrub_data command reports every record it scrubbed,
+    including those that already held their scrubbed values."""
+    # use our own fake e-mail generator so we don't move the shared one on
+    monkeypatch.setitem(
+        User.DataScrubbing.fields_to_scrub, "email", get_fake_unique_email()
+    )
+
+    StudyPurposePageFactory()
+    StudyPurposePageFactory()
+
+    expected = "Scrubbed 2 StudyPurposePage records from fields: "
+
+    stdout = io.StringIO()
+    call_command("scrub_data", "default", "--i-am-sure", stdout=stdout)
+    assert expected in stdout.getvalue()
+
+    # the second run has nothing left to write but still scrubbed both records
+    stdout = io.StringIO()
+    call_command("scrub_data", "default", "--i-am-sure", stdout=stdout)
+    assert expected in stdout.getvalue()
+
+
 def test_scrub_data_command_require_confirmation_on_default_database():
     """Test that the scrub_data command requires confirmation through an extra
     flag when running against the default database."""
@@ -13,7 +13,8 @@ from django.core import mail
 from django.core.management import call_command
 from django.urls import reverse
 
-from jobserver.actions.rap import rap_status_update
+from jobserver.actions.notifications import send_job_notifications
+from jobserver.actions.rap import rap_status_update, submit_job_requests
 from jobserver.authorization.permissions import Permission
 from jobserver.models import Job, JobRequest, JobRequestStatus
 from tests.factories import (
@@ -67,7 +68,8 @@ def setup_backend_workspace_user(mocker, project_membership, role_factory, user)
 @responses.activate
 def test_jobrequestcreate_post_success(client, setup_backend_workspace_user):
     """
-    Tests the view that creates a JobRequest and calls the RAP API create endpoint
+    Tests the view that creates a JobRequest, and the RAP API create endpoint call
+    made when it is submitted
     """
     responses.post(
         url=f"{settings.RAP_API_BASE_URL}rap/create/",
@@ -94,13 +96,18 @@ def test_jobrequestcreate_post_success(client, setup_backend_workspace_user):
     assert response.status_code == 302
 
     job_request = JobRequest.objects.first()
+    assert job_request.jobs_status == JobRequestStatus.SUBMITTING
+    submit_job_requests()
+
+    job_request.refresh_from_db()
     assert job_request.jobs_status == JobRequestStatus.PENDING
 
 
 @responses.activate
 def test_jobrequestcreate_post_nothing_to_do(client, setup_backend_workspace_user):
     """
-    Tests the view that creates a JobRequest and calls the RAP API create endpoint
+    Tests the view that creates a JobRequest, and the RAP API create endpoint call
+    made when it is submitted
     """
     responses.post(
         url=f"{settings.RAP_API_BASE_URL}rap/create/",
@@ -129,7 +136,12 @@ def test_jobrequestcreate_post_nothing_to_do(client, setup_backend_workspace_use
         },
     )
     assert response.status_code == 302
+
     job_request = JobRequest.objects.first()
+    assert job_request.jobs_status == JobRequestStatus.SUBMITTING
+    submit_job_requests()
+
+    job_request.refresh_from_db()
     assert job_request.jobs_status == JobRequestStatus.NOTHING_TO_DO
     assert (
         job_request.status_message == "All actions have already completed successfully"
@@ -139,7 +151,8 @@ def test_jobrequestcreate_post_nothing_to_do(client, setup_backend_workspace_use
 @responses.activate
 def test_jobrequestcreate_post_unexpected_error(client, setup_backend_workspace_user):
     """
-    Tests the view that creates a JobRequest and calls the RAP API create endpoint
+    Tests the view that creates a JobRequest, and the RAP API create endpoint call
+    made when it is submitted
     """
     responses.post(
         url=f"{settings.RAP_API_BASE_URL}rap/create/",
@@ -164,7 +177,12 @@ def test_jobrequestcreate_post_unexpected_error(client, setup_backend_workspace_
         },
     )
     assert response.status_code == 302
+
     job_request = JobRequest.objects.first()
+    assert job_request.jobs_status == JobRequestStatus.SUBMITTING
+    submit_job_requests()
+
+    job_request.refresh_from_db()
     assert job_request.jobs_status == JobRequestStatus.UNKNOWN_ERROR_CREATING_JOBS
 
 
@@ -309,7 +327,10 @@ def test_rap_status_update_notifications_on(setup_backend_workspace_user):
     job_request.refresh_from_db()
     assert job_request.jobs_status == JobRequestStatus.RUNNING
 
-    # One mail sent for each completed job
+    # One notification queued for each newly completed job, which are emailed
+    # by the send_job_notifications service
+    assert mail.outbox == []
+    assert send_job_notifications() == 2
     assert len(mail.outbox) == 2
 
 
@@ -1,6 +1,7 @@
 from django.urls import reverse
 from opentelemetry import trace
 
+from jobserver.actions.rap import submit_job_requests
 from jobserver.authorization.permissions import Permission
 from jobserver.models import JobRequest
 from tests.conftest import get_trace
@@ -80,9 +81,17 @@ def test_jobrequestcreate_post_telemetry(
     assert job_request.workspace == workspace
     assert job_request.requested_actions == ["twiddle"]
 
+    # the RAP is created by the rap_submission_service
+    submit_job_requests(get_github_api=FakeGitHubAPI)
+
     traced_attributes = {trace.name: trace.attributes for trace in get_trace()}
-    assert set(traced_attributes.keys()) == {"mock_django_span", "create_rap"}
+    assert set(traced_attributes.keys()) == {
+        "mock_django_span",
+        "submit_job_requests",
+        "create_rap",
+    }
 
-    for attributes in traced_attributes.values():
+    for name in ["mock_django_span", "create_rap"]:
+        attributes = traced_attributes[name]
         assert attributes["rap_id"] == job_request.identifier
         assert attributes["requested_actions"] == ("twiddle",)
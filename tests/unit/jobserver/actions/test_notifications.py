@@ -0,0 +1,183 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from jobserver.actions.notifications import (
+    claim_job_notifications,
+    queue_job_notifications,
+    retry_delay,
+    send_job_notifications,
+)
+from jobserver.models import JobNotification
+from tests.conftest import get_trace
+from tests.factories import JobFactory, JobNotificationFactory, JobRequestFactory
+
+
+def test_queue_job_notifications():
+    notify = JobFactory(job_request=JobRequestFactory(will_notify=True))
+    dont_notify = JobFactory(job_request=JobRequestFactory(will_notify=False))
+
+    queue_job_notifications([notify, dont_notify])
+
+    assert list(JobNotification.objects.values_list("job", flat=True)) == [notify.pk]
+
+
+def test_queue_job_notifications_deduplicates():
+    job = JobFactory(job_request=JobRequestFactory(will_notify=True))
+
+    queue_job_notifications([job])
+    queue_job_notifications([job])
+
+    assert JobNotification.objects.filter(job=job).count() == 1
+
+
+def test_queue_job_notifications_no_jobs(django_assert_num_queries):
+    with django_assert_num_queries(0):
+        queue_job_notifications([])
+
+
+def test_retry_delay(settings):
+    settings.JOB_NOTIFICATION_RETRY_DELAY = 60
+
+    assert retry_delay(1) == timedelta(seconds=60)
+    assert retry_delay(2) == timedelta(seconds=120)
+    assert retry_delay(3) == timedelta(seconds=240)
+
+
+def test_send_job_notifications(freezer, mocker, settings, log_output):
+    settings.JOB_NOTIFICATION_BATCH_SIZE = 2
+    mocked_send = mocker.patch(
+        "jobserver.actions.notifications.send_finished_notification", autospec=True
+    )
+    first, second, third = JobNotificationFactory.create_batch(3)
+
+    assert send_job_notifications() == 2
+
+    assert mocked_send.call_count == 2
+    for notification in [first, second]:
+        notification.refresh_from_db()
+        assert notification.sent_at == timezone.now()
+        assert notification.attempts == 1
+    third.refresh_from_db()
+    assert third.sent_at is None
+
+    assert log_output.entries[0]["event"] == "Notified requesting user of completed job"
+    assert log_output.entries[0]["job_identifier"] == first.job.identifier
+
+    spans = get_trace()
+    assert spans[-1].attributes == {
+        "job_notifications.sent_count": 2,
+        "job_notifications.failed_count": 0,
+        "job_notifications.abandoned_count": 0,
+    }
+
+    # the rest of the outbox is sent on the next call
+    assert send_job_notifications() == 1
+    assert send_job_notifications() == 0
+
+
+def test_send_job_notifications_claims_before_sending(mocker):
+    notification = JobNotificationFactory()
+
+    # another worker running while we're sending finds nothing left to send
+    def send(*args):
+        assert send_job_notifications() == 0
+
+    mocked_send = mocker.patch(
+        "jobserver.actions.notifications.send_finished_notification",
+        autospec=True,
+        side_effect=send,
+    )
+
+    assert send_job_notifications() == 1
+
+    mocked_send.assert_called_once()
+    notification.refresh_from_db()
+    assert notification.sent_at is not None
+    assert notification.attempts == 1
+
+
+def test_claim_job_notifications(freezer, settings):
+    settings.JOB_NOTIFICATION_RETRY_DELAY = 60
+    notification = JobNotificationFactory(attempts=1)
+
+    assert claim_job_notifications() == [notification]
+
+    # a claimed notification isn't due until its retry delay has passed, so if
+    # we never record a result it's retried like any other failure
+    notification.refresh_from_db()
+    assert notification.attempts == 2
+    assert notification.next_attempt_at == timezone.now() + timedelta(seconds=120)
+    assert claim_job_notifications() == []
+
+
+def test_send_job_notifications_retries(freezer, mocker, settings, log_output):
+    settings.JOB_NOTIFICATION_RETRY_DELAY = 60
+    settings.JOB_NOTIFICATION_MAX_ATTEMPTS = 5
+    mocked_send = mocker.patch(
+        "jobserver.actions.notifications.send_finished_notification", autospec=True
+    )
+    notification = JobNotificationFactory()
+    sent = JobNotificationFactory()
+
+    # one failure doesn't stop the rest of the batch being sent
+    mocked_send.side_effect = [Exception("SMTP is down"), None]
+    assert send_job_notifications() == 2
+
+    notification.refresh_from_db()
+    assert notification.sent_at is None
+    assert notification.attempts == 1
+    assert notification.last_error == "SMTP is down"
+    assert notification.next_attempt_at == timezone.now() + timedelta(seconds=60)
+
+    sent.refresh_from_db()
+    assert sent.sent_at == timezone.now()
+
+    assert log_output.entries[0]["event"] == (
+        "Failed to notify requesting user of completed job"
+    )
+    assert log_output.entries[0]["log_level"] == "warning"
+
+    # the failed notification isn't retried until its backoff has passed
+    assert send_job_notifications() == 0
+
+    freezer.tick(timedelta(seconds=60))
+    mocked_send.side_effect = None
+    assert send_job_notifications() == 1
+
+    notification.refresh_from_db()
+    assert notification.sent_at == timezone.now()
+    assert notification.attempts == 2
+    assert notification.last_error == ""
+
+
+def test_send_job_notifications_gives_up(freezer, mocker, settings, log_output):
+    settings.JOB_NOTIFICATION_MAX_ATTEMPTS = 3
+    mocker.patch(
+        "jobserver.actions.notifications.send_finished_notification",
+        autospec=True,
+        side_effect=Exception("bad address"),
+    )
+    mocked_capture = mocker.patch(
+        "jobserver.actions.notifications.sentry_sdk.capture_exception", autospec=True
+    )
+    notification = JobNotificationFactory(attempts=2)
+
+    assert send_job_notifications() == 1
+
+    notification.refresh_from_db()
+    assert notification.attempts == 3
+    assert notification.sent_at is None
+    mocked_capture.assert_called_once()
+
+    assert log_output.entries[0]["event"] == (
+        "Giving up on notifying requesting user of completed job"
+    )
+    assert log_output.entries[0]["log_level"] == "error"
+
+    spans = get_trace()
+    assert spans[-1].attributes["job_notifications.abandoned_count"] == 1
+
+    # we don't try again, however long we wait
+    freezer.tick(timedelta(days=1))
+    assert send_job_notifications() == 0
@@ -7,7 +7,8 @@ import pytest
 from django.utils import timezone
 
 from jobserver.actions import rap
-from jobserver.models import Job, JobRequest, JobRequestStatus
+from jobserver.models import Job, JobNotification, JobRequest, JobRequestStatus
+from jobserver.rap_api import RapAPIRequestError, RapAPIResponseError
 from tests.conftest import get_trace
 from tests.factories import (
     BackendFactory,
@@ -42,6 +43,23 @@ def test_get_active_job_request_ids():
     assert active_job_request_ids == [job_request.identifier]
 
 
+def test_get_active_job_requests():
+    job_request = JobRequestFactory(_status=JobRequestStatus.RUNNING)
+    JobRequestFactory(_status=JobRequestStatus.SUCCEEDED)
+    assert rap.get_active_job_requests() == [job_request]
+
+
+def test_get_active_job_request_ids_single_query(django_assert_num_queries):
+    for status in ["pending", "running", "succeeded"]:
+        job_request = JobRequestFactory(_status=JobRequestStatus.RUNNING)
+        JobFactory.create_batch(3, job_request=job_request, status=status)
+
+    with django_assert_num_queries(1):
+        active_job_request_ids = rap.get_active_job_request_identifiers()
+
+    assert len(active_job_request_ids) == 2
+
+
 def test_get_active_job_request_ids_stale_status():
     backend = BackendFactory()
     job_request = JobRequestFactory(backend=backend, _status=JobRequestStatus.RUNNING)
@@ -136,8 +154,11 @@ def test_rap_status_update_single_job_request(
 
     # Queries:
     # 1 & 2) Get all matching job requests, prefetching jobs
-    # 3-6) update_or_create on the job returned in the response
-    with django_assert_num_queries(6):
+    # 3) Upsert the job returned in the response
+    # 4) Calculate the job requests' statuses
+    # 5) Bulk update the job requests whose status has changed
+    # 6 & 7) Create and release a savepoint around the writes
+    with django_assert_num_queries(7):
         rap.rap_status_update([job_request.identifier])
 
     # we shouldn't have a different number of jobs
@@ -161,6 +182,101 @@ def test_rap_status_update_single_job_request(
     assert spans[0].attributes["rap_status.affected_job_count"] == 1
     assert spans[0].attributes["rap_status.created_job_count"] == 0
     assert spans[0].attributes["rap_status.updated_job_count"] == 1
+    assert spans[0].attributes["rap_status.skipped_job_count"] == 0
+    assert spans[0].attributes["rap_status.written_job_count"] == 1
+
+
+@patch("jobserver.rap_api.status")
+def test_rap_status_update_skips_unchanged_jobs(
+    mock_rap_api_status, log_output, django_assert_num_queries, now
+):
+    job_request = JobRequestFactory()
+    job1, job2 = JobFactory.create_batch(
+        2, job_request=job_request, status="running", completed_at=None
+    )
+
+    test_response_json = rap_status_response_factory(
+        [
+            {
+                "identifier": job1.identifier,
+                "rap_id": job_request.identifier,
+                "status": "running",
+                "completed_at": None,
+            },
+            {
+                "identifier": job2.identifier,
+                "rap_id": job_request.identifier,
+                "status": "running",
+                "completed_at": None,
+            },
+        ],
+        [],
+        now,
+    )
+
+    # the first poll writes both jobs
+    mock_rap_api_status.return_value = deepcopy(test_response_json)
+    rap.rap_status_update([job_request.identifier])
+
+    # only job2 has changed since the previous poll
+    test_response_json["jobs"][1]["status"] = "succeeded"
+    test_response_json["jobs"][1]["completed_at"] = now.isoformat()
+    mock_rap_api_status.return_value = deepcopy(test_response_json)
+
+    # Queries:
+    # 1 & 2) Get all matching job requests, prefetching jobs
+    # 3) Upsert the changed job
+    # 4) Calculate the job request's status, which hasn't changed
+    # 5 & 6) Create and release a savepoint around the writes
+    with django_assert_num_queries(6):
+        rap.rap_status_update([job_request.identifier])
+
+    assert log_output.entries[-1]["updated_job_ids"] == [job2.id]
+
+    # nothing has changed since the previous poll
+    mock_rap_api_status.return_value = deepcopy(test_response_json)
+
+    # Queries:
+    # 1 & 2) Get all matching job requests, prefetching jobs
+    with django_assert_num_queries(2):
+        rap.rap_status_update([job_request.identifier])
+
+    job2.refresh_from_db()
+    assert job2.status == "succeeded"
+    assert job2.completed_at == now
+
+    first, second, third = get_trace()
+    assert first.attributes["rap_status.skipped_job_count"] == 0
+    assert first.attributes["rap_status.written_job_count"] == 2
+    assert second.attributes["rap_status.skipped_job_count"] == 1
+    assert second.attributes["rap_status.written_job_count"] == 1
+    assert third.attributes == {
+        "rap_status.skipped_job_count": 2,
+        "rap_status.written_job_count": 0,
+    }
+
+
+def test_job_has_changed(now):
+    job = JobFactory(
+        status="running",
+        started_at=minutes_ago(now, 1),
+        completed_at=None,
+        metrics={"cpu_peak": 99},
+    )
+
+    assert not rap.job_has_changed(
+        job,
+        {
+            "identifier": job.identifier,
+            "status": "running",
+            "started_at": minutes_ago(now, 1).isoformat(),
+            "completed_at": None,
+            "metrics": {"cpu_peak": 99},
+        },
+    )
+    assert rap.job_has_changed(job, {"status": "succeeded"})
+    assert rap.job_has_changed(job, {"completed_at": now.isoformat()})
+    assert rap.job_has_changed(job, {"metrics": {"cpu_peak": 100}})
 
 
 @patch("jobserver.rap_api.status")
@@ -182,8 +298,11 @@ def test_rap_status_update_single_job_request_create_job(
 
     # Queries:
     # 1 & 2) Get all matching job requests, prefetching jobs
-    # 3-8) update_or_create on the job returned in the response (create requires 2 additional queries to update)
-    with django_assert_num_queries(8):
+    # 3) Upsert the job returned in the response
+    # 4) Calculate the job requests' statuses
+    # 5) Bulk update the job requests whose status has changed
+    # 6 & 7) Create and release a savepoint around the writes
+    with django_assert_num_queries(7):
         rap.rap_status_update([job_request.identifier])
 
     # we shouldn't have a different number of jobs
@@ -245,8 +364,11 @@ def test_rap_status_update_single_job_for_multiple_job_requests(
 
     # Queries:
     # 1 & 2) Get all matching job requests, prefetching jobs
-    # 3-6, 7-10) update_or_create on each job returned in the response
-    with django_assert_num_queries(10):
+    # 3) Upsert both jobs returned in the response
+    # 4) Calculate the job requests' statuses
+    # 5) Bulk update the job requests whose status has changed
+    # 6 & 7) Create and release a savepoint around the writes
+    with django_assert_num_queries(7):
         rap.rap_status_update([job_request1.identifier, job_request2.identifier])
 
     # we shouldn't have a different number of jobs
@@ -269,18 +391,12 @@ def test_rap_status_update_single_job_for_multiple_job_requests(
     assert spans[0].attributes["rap_status.updated_job_count"] == 2
 
 
-@pytest.mark.parametrize(
-    # Query counts: 2 initial queries to get all matching job requests, prefetching jobs
-    # Then 4 queries per job (3 jobs in test) to update or 6 queries per job to create
-    "pre_existing, query_count",
-    [(True, 2 + 3 * 4), (False, 2 + 3 * 6)],
-)
+@pytest.mark.parametrize("pre_existing", [True, False])
 @patch("jobserver.rap_api.status")
 def test_update_job_multiple(
     mock_rap_api_status,
     debug_log_output,
     pre_existing,
-    query_count,
     django_assert_num_queries,
     now,
 ):
@@ -343,7 +459,13 @@ def test_update_job_multiple(
     )
     mock_rap_api_status.return_value = test_response_json
 
-    with django_assert_num_queries(query_count):
+    # Queries:
+    # 1 & 2) Get all matching job requests, prefetching jobs
+    # 3) Upsert all jobs, whether they are created or updated
+    # 4) Calculate the job requests' statuses
+    # 5) Bulk update the job requests whose status has changed
+    # 6 & 7) Create and release a savepoint around the writes
+    with django_assert_num_queries(7):
         rap.rap_status_update([job_request.identifier])
 
     # we shouldn't have a different number of jobs
@@ -388,21 +510,13 @@ def test_update_job_multiple(
         },
     )
 
-    assert_log(
-        debug_log_output.entries[1],
-        {
-            "event": "Newly completed job",
-            "level": "debug",
-            "job_identifier": job1.identifier,
-        },
-    )
     # running
     assert job2.identifier == "job2"
     assert job2.started_at == minutes_ago(now, 1)
     assert job2.updated_at == now
     assert job2.completed_at is None
     assert_log(
-        debug_log_output.entries[2],
+        debug_log_output.entries[1],
         {
             "event": "RAP Job Status",
             "level": "debug",
@@ -417,7 +531,7 @@ def test_update_job_multiple(
     assert job3.updated_at == now
     assert job3.completed_at is None
     assert_log(
-        debug_log_output.entries[3],
+        debug_log_output.entries[2],
         {
             "event": "RAP Job Status",
             "level": "debug",
@@ -427,6 +541,16 @@ def test_update_job_multiple(
         },
     )
 
+    # notifications are handled once all jobs have been written
+    assert_log(
+        debug_log_output.entries[3],
+        {
+            "event": "Newly completed job",
+            "level": "debug",
+            "job_identifier": job1.identifier,
+        },
+    )
+
     assert spans[0].attributes["rap_status.affected_job_count"] == 3
 
     if pre_existing:
@@ -528,8 +652,11 @@ def test_update_jobs_multiple_job_requests(
 
     # Queries:
     # 1 & 2) Get all matching job requests, prefetching jobs
-    # 4 queries per job to update
-    with django_assert_num_queries(18):
+    # 3) Upsert all jobs across both job requests
+    # 4) Calculate the job requests' statuses
+    # 5) Bulk update the job requests whose status has changed
+    # 6 & 7) Create and release a savepoint around the writes
+    with django_assert_num_queries(7):
         rap.rap_status_update([job_request1.identifier, job_request2.identifier])
 
     # Check the command worked overall
@@ -586,6 +713,62 @@ def test_update_jobs_multiple_job_requests(
     check_job_request_status(job_request2.identifier, JobRequestStatus.RUNNING)
 
 
+@patch("jobserver.rap_api.status")
+def test_rap_status_update_query_count_is_constant(
+    mock_rap_api_status, django_assert_num_queries, now
+):
+    # A poll's query count must not scale with the number of jobs in the
+    # payload, whether those jobs are new or already exist
+    job_requests = JobRequestFactory.create_batch(5)
+    existing_jobs = [
+        JobFactory(job_request=job_request, status="pending")
+        for job_request in job_requests
+        for _ in range(10)
+    ]
+    new_jobs = [
+        {
+            "identifier": f"new-{job_request.identifier}-{i}",
+            "rap_id": job_request.identifier,
+        }
+        for job_request in job_requests
+        for i in range(10)
+    ]
+
+    test_response_json = rap_status_response_factory(
+        [
+            {
+                "identifier": job.identifier,
+                "rap_id": job.job_request.identifier,
+                "status": "running",
+                "completed_at": None,
+            }
+            for job in existing_jobs
+        ]
+        + new_jobs,
+        [],
+        now,
+    )
+    mock_rap_api_status.return_value = test_response_json
+
+    # Queries:
+    # 1 & 2) Get all matching job requests, prefetching jobs
+    # 3) Upsert all 100 jobs
+    # 4) Calculate the job requests' statuses
+    # 5) Bulk update the job requests whose status has changed
+    # 6 & 7) Create and release a savepoint around the writes
+    with django_assert_num_queries(7):
+        rap.rap_status_update([jr.identifier for jr in job_requests])
+
+    assert Job.objects.count() == 100
+    assert Job.objects.filter(status="running").count() == 50
+    assert Job.objects.filter(status="succeeded").count() == 50
+
+    spans = get_trace()
+    assert spans[0].attributes["rap_status.affected_job_count"] == 100
+    assert spans[0].attributes["rap_status.created_job_count"] == 50
+    assert spans[0].attributes["rap_status.updated_job_count"] == 50
+
+
 @patch("jobserver.rap_api.status")
 def test_unexpected_local_jobs(
     mock_rap_api_status, log_output, django_assert_num_queries, now
@@ -622,8 +805,11 @@ def test_unexpected_local_jobs(
 
     # Queries:
     # 1 & 2) Get all matching job requests, prefetching jobs
-    # 4 queries per job to update
-    with django_assert_num_queries(6):
+    # 3) Upsert the job returned in the response
+    # 4) Calculate the job requests' statuses
+    # 5) Bulk update the job requests whose status has changed
+    # 6 & 7) Create and release a savepoint around the writes
+    with django_assert_num_queries(7):
         rap.rap_status_update([job_request.identifier])
 
     # Unexpected lobs are not deleted
@@ -766,6 +952,29 @@ def test_rap_status_update_unrecognised_rap_ids(
     )
 
 
+@patch("jobserver.rap_api.status")
+def test_rap_status_update_unrecognised_rap_ids_job_request_submitted_meanwhile(
+    mock_rap_api_status, now
+):
+    job_request = JobRequestFactory(
+        _status=JobRequestStatus.UNKNOWN_ERROR_CREATING_JOBS
+    )
+
+    # another process updates the job request after we asked the controller
+    # about it, but before we update it
+    def status(rap_ids):
+        JobRequest.objects.filter(pk=job_request.pk).update(
+            _status=JobRequestStatus.PENDING
+        )
+        return rap_status_response_factory([], [job_request.identifier], now)
+
+    mock_rap_api_status.side_effect = status
+
+    rap.rap_status_update([job_request.identifier])
+
+    check_job_request_status(job_request.identifier, JobRequestStatus.PENDING)
+
+
 @patch("jobserver.rap_api.status")
 def test_rap_status_update_unrecognised_rap_ids_job_request_with_unknown_created_error(
     mock_rap_api_status, log_output, django_assert_num_queries, now
@@ -860,7 +1069,7 @@ def test_rap_status_update_notifications(
     mock_rap_api_status, now, mocker, notifcations_on, new_status, notify_expected
 ):
     """
-    Test that notifications are only sent for job requests with notifications
+    Test that notifications are only queued for job requests with notifications
     turned on, and only for job requests that have just completed
     """
     workspace = WorkspaceFactory()
@@ -886,12 +1095,169 @@ def test_rap_status_update_notifications(
     mock_rap_api_status.return_value = test_response_json
 
     mocked_send = mocker.patch(
-        "jobserver.api.jobs.send_finished_notification", autospec=True
+        "jobserver.actions.notifications.send_finished_notification", autospec=True
     )
 
     rap.rap_status_update([job_request.identifier])
 
-    if notify_expected:
-        mocked_send.assert_called_once()
-    else:
-        mocked_send.assert_not_called()
+    # notifications are sent by the send_job_notifications service, not inline
+    mocked_send.assert_not_called()
+    assert JobNotification.objects.filter(job=job).exists() == notify_expected
+
+
+@patch("jobserver.models.job_request.rap_api.create", autospec=True)
+def test_submit_job_requests(mock_create):
+    mock_create.return_value = {"count": 1, "details": "jobs created"}
+
+    first = JobRequestFactory(
+        _status=JobRequestStatus.SUBMITTING, created_at=minutes_ago(timezone.now(), 2)
+    )
+    second = JobRequestFactory(_status=JobRequestStatus.SUBMITTING)
+    JobRequestFactory(_status=JobRequestStatus.PENDING)
+
+    assert rap.submit_job_requests() == 2
+
+    # oldest first
+    assert [call.args[0] for call in mock_create.call_args_list] == [first, second]
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert first.jobs_status == JobRequestStatus.PENDING
+    assert second.jobs_status == JobRequestStatus.PENDING
+
+    spans = get_trace()
+    assert {span.name for span in spans} == {"create_rap", "submit_job_requests"}
+    create_spans = [span for span in spans if span.name == "create_rap"]
+    assert [span.attributes["rap_id"] for span in create_spans] == [
+        first.identifier,
+        second.identifier,
+    ]
+    submit_span = next(span for span in spans if span.name == "submit_job_requests")
+    assert submit_span.attributes["rap_submission.submitted_count"] == 2
+
+
+@patch("jobserver.rap_api.status")
+@patch("jobserver.models.job_request.rap_api.create", autospec=True)
+def test_submit_job_requests_claims_before_submitting(mock_create, mock_status, now):
+    job_request = JobRequestFactory(_status=JobRequestStatus.SUBMITTING, sha="abc")
+    mock_status.return_value = rap_status_response_factory(
+        [], [job_request.identifier], now
+    )
+
+    # by the time we ask the RAP API to create jobs, the job request has been
+    # claimed, so another service won't submit it too, and it isn't active, so
+    # a status poll landing now leaves it alone
+    def create(job_request):
+        assert rap.claim_job_request() is None
+        assert job_request.identifier not in rap.get_active_job_request_identifiers()
+        rap.rap_status_update([job_request.identifier])
+
+        saved = JobRequest.objects.get(pk=job_request.pk)
+        assert saved._status == JobRequestStatus.SUBMITTING
+        assert saved.claimed_at is not None
+        return {"count": 1, "details": "jobs created"}
+
+    mock_create.side_effect = create
+
+    assert rap.submit_job_requests() == 1
+
+    mock_create.assert_called_once()
+    job_request.refresh_from_db()
+    assert job_request.jobs_status == JobRequestStatus.PENDING
+
+
+@patch("jobserver.rap_api.status")
+@patch("jobserver.models.job_request.rap_api.create", autospec=True)
+def test_submit_job_requests_status_poll_then_timeout(mock_create, mock_status, now):
+    job_request = JobRequestFactory(_status=JobRequestStatus.SUBMITTING, sha="abc")
+    mock_status.return_value = rap_status_response_factory(
+        [], [job_request.identifier], now
+    )
+
+    # the controller doesn't know about the job request yet when it's polled,
+    # and then we can't tell whether it created the jobs
+    def create(job_request):
+        rap.rap_status_update([job_request.identifier])
+        raise RapAPIRequestError("Read timed out")
+
+    mock_create.side_effect = create
+
+    assert rap.submit_job_requests() == 1
+
+    # left for the status service to find out whether the jobs were created,
+    # rather than failed by the poll
+    job_request.refresh_from_db()
+    assert job_request.jobs_status == JobRequestStatus.UNKNOWN_ERROR_CREATING_JOBS
+
+
+def test_claim_job_request(freezer, settings):
+    settings.RAP_SUBMISSION_CLAIM_TIMEOUT = 60
+    job_request = JobRequestFactory(_status=JobRequestStatus.SUBMITTING)
+
+    assert rap.claim_job_request() == job_request
+
+    job_request.refresh_from_db()
+    assert job_request._status == JobRequestStatus.SUBMITTING
+    assert job_request.claimed_at == timezone.now()
+    assert rap.claim_job_request() is None
+
+    # a claim which is never resolved expires, so the job request is submitted
+    # again
+    freezer.tick(timedelta(seconds=61))
+    assert rap.claim_job_request() == job_request
+
+
+@patch("jobserver.models.job_request.rap_api.create", autospec=True)
+def test_submit_job_requests_batch_size(mock_create, settings):
+    settings.RAP_SUBMISSION_BATCH_SIZE = 2
+    mock_create.return_value = {"count": 1, "details": "jobs created"}
+    JobRequestFactory.create_batch(3, _status=JobRequestStatus.SUBMITTING)
+
+    assert rap.submit_job_requests() == 2
+    assert JobRequest.objects.awaiting_submission().count() == 1
+
+    assert rap.submit_job_requests() == 1
+    assert not JobRequest.objects.awaiting_submission().exists()
+
+
+def test_submit_job_requests_nothing_awaiting_submission():
+    JobRequestFactory(_status=JobRequestStatus.PENDING)
+
+    assert rap.submit_job_requests() == 0
+
+
+@patch("jobserver.models.job_request.rap_api.create", autospec=True)
+def test_submit_job_request_nothing_to_do(mock_create):
+    mock_create.return_value = {"count": 0, "details": "jobs already created"}
+    job_request = JobRequestFactory(_status=JobRequestStatus.SUBMITTING, sha="abc")
+
+    rap.submit_job_request(job_request)
+
+    job_request.refresh_from_db()
+    assert job_request.jobs_status == JobRequestStatus.NOTHING_TO_DO
+    assert job_request.status_message == "jobs already created"
+
+
+@patch("jobserver.models.job_request.rap_api.create", autospec=True)
+def test_submit_job_request_rapapierror(mock_create):
+    mock_create.side_effect = RapAPIResponseError(
+        "RAP API Error", body={"details": "Error creating jobs"}
+    )
+    job_request = JobRequestFactory(_status=JobRequestStatus.SUBMITTING, sha="abc")
+
+    rap.submit_job_request(job_request)
+
+    job_request.refresh_from_db()
+    assert job_request.jobs_status == JobRequestStatus.FAILED
+    assert job_request.status_message == "Error creating jobs"
+
+
+@patch("jobserver.models.job_request.rap_api.create", autospec=True)
+def test_submit_job_request_rapapirequesterror(mock_create):
+    mock_create.side_effect = RapAPIRequestError("Connection error")
+    job_request = JobRequestFactory(_status=JobRequestStatus.SUBMITTING, sha="abc")
+
+    rap.submit_job_request(job_request)
+
+    # left for the status service to find out whether the jobs were created
+    job_request.refresh_from_db()
+    assert job_request.jobs_status == JobRequestStatus.UNKNOWN_ERROR_CREATING_JOBS
@@ -13,7 +13,7 @@ from jobserver.api.jobs import (
     get_backend_from_token,
 )
 from jobserver.authorization import ProjectDeveloper, StaffAreaAdministrator
-from jobserver.models import Job, JobRequest, JobRequestStatus
+from jobserver.models import Job, JobNotification, JobRequest, JobRequestStatus
 from tests.factories import (
     BackendFactory,
     JobFactory,
@@ -209,6 +209,44 @@ def test_jobapiupdate_all_new(api_rf):
     assert Job.objects.count() == 3
 
 
+@pytest.mark.parametrize("existing", [False, True], ids=["new", "existing"])
+def test_jobapiupdate_repeated_identifier(api_rf, existing):
+    backend = BackendFactory()
+    job_request = JobRequestFactory()
+    if existing:
+        JobFactory(job_request=job_request, identifier="job1", status="pending")
+
+    now = timezone.now()
+
+    def job(status, completed_at):
+        return {
+            "identifier": "job1",
+            "job_request_id": job_request.identifier,
+            "action": "test-action",
+            "run_command": "do-research",
+            "status": status,
+            "status_code": "",
+            "status_message": "",
+            "created_at": minutes_ago(now, 2),
+            "started_at": minutes_ago(now, 1),
+            "updated_at": now,
+            "completed_at": completed_at,
+        }
+
+    data = [job("running", None), job("succeeded", now)]
+
+    request = api_rf.post(
+        "/", headers={"authorization": backend.auth_token}, data=data, format="json"
+    )
+    response = JobAPIUpdate.as_view()(request)
+
+    # the last copy of the job wins
+    assert response.status_code == 200, response.data
+    job = Job.objects.get()
+    assert job.identifier == "job1"
+    assert job.status == "succeeded"
+
+
 def test_jobapiupdate_two_jobrequests(api_rf):
     """Test that posting a Jobs update with three new jobs from two distinct
     Job Requests, interleaved, results in all three Job objects being updated
@@ -396,6 +434,49 @@ def test_jobapiupdate_mixture(api_rf, freezer):
     assert job3.completed_at is None
 
 
+def test_jobapiupdate_query_count_is_constant(api_rf, django_assert_num_queries):
+    backend = BackendFactory()
+    job_request = JobRequestFactory()
+    JobFactory.create_batch(50, job_request=job_request, status="running")
+    JobFactory(job_request=job_request, identifier="stale")
+
+    now = timezone.now()
+
+    def job_data(identifier, status):
+        return {
+            "identifier": identifier,
+            "job_request_id": job_request.identifier,
+            "action": "test",
+            "run_command": "do-research",
+            "status": status,
+            "status_code": "",
+            "status_message": "",
+            "created_at": minutes_ago(now, 2),
+            "started_at": minutes_ago(now, 1),
+            "updated_at": now,
+            "completed_at": None,
+        }
+
+    data = [
+        job_data(job.identifier, "running")
+        for job in job_request.jobs.exclude(identifier="stale")
+    ] + [job_data(f"new-{i}", "pending") for i in range(50)]
+
+    request = api_rf.post(
+        "/", headers={"authorization": backend.auth_token}, data=data, format="json"
+    )
+
+    # backend, job requests, jobs, savepoint, delete (collecting the stale job
+    # and deleting its notifications first), bulk_create, bulk_update, release
+    # savepoint
+    with django_assert_num_queries(10):
+        response = JobAPIUpdate.as_view()(request)
+
+    assert response.status_code == 200, response.data
+    assert job_request.jobs.count() == 100
+    assert not job_request.jobs.filter(identifier="stale").exists()
+
+
 def test_jobapiupdate_notifications_on_with_move_to_succeeded(api_rf, mocker):
     workspace = WorkspaceFactory()
     job_request = JobRequestFactory(workspace=workspace, will_notify=True)
@@ -404,7 +485,7 @@ def test_jobapiupdate_notifications_on_with_move_to_succeeded(api_rf, mocker):
     now = timezone.now()
 
     mocked_send = mocker.patch(
-        "jobserver.api.jobs.send_finished_notification", autospec=True
+        "jobserver.actions.notifications.send_finished_notification", autospec=True
     )
 
     data = [
@@ -430,21 +511,19 @@ def test_jobapiupdate_notifications_on_with_move_to_succeeded(api_rf, mocker):
     )
     response = JobAPIUpdate.as_view()(request)
 
-    mocked_send.assert_called_once()
+    # notifications are sent by the send_job_notifications service, not inline
+    mocked_send.assert_not_called()
+    assert JobNotification.objects.filter(job=job).exists()
     assert response.status_code == 200
 
 
-def test_jobapiupdate_notifications_on_without_move_to_completed(api_rf, mocker):
+def test_jobapiupdate_notifications_on_without_move_to_completed(api_rf):
     workspace = WorkspaceFactory()
     job_request = JobRequestFactory(workspace=workspace, will_notify=True)
     job = JobFactory(job_request=job_request, status="succeeded")
 
     now = timezone.now()
 
-    mocked_send_finished = mocker.patch(
-        "jobserver.api.jobs.send_finished_notification", autospec=True
-    )
-
     data = [
         {
             "identifier": job.identifier,
@@ -468,7 +547,7 @@ def test_jobapiupdate_notifications_on_without_move_to_completed(api_rf, mocker)
     )
     response = JobAPIUpdate.as_view()(request)
 
-    mocked_send_finished.assert_not_called()
+    assert not JobNotification.objects.exists()
     assert response.status_code == 200
 
 
@@ -5,6 +5,7 @@ from datetime import UTC, datetime
 
 import pytest
 from django.contrib.auth.models import AnonymousUser
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.utils import timezone
 from rest_framework.exceptions import NotAuthenticated, PermissionDenied
 
@@ -14,12 +15,14 @@ from jobserver.api.releases import (
     Level4TokenAuthenticationAPI,
     ReleaseAPI,
     ReleaseFileAPI,
+    ReleaseFilesAPI,
     ReleaseWorkspaceAPI,
     ReviewAPI,
     SnapshotAPI,
     SnapshotCreateAPI,
     SnapshotPublishAPI,
     WorkspaceStatusAPI,
+    build_level4_user,
     validate_release_access,
     validate_upload_access,
 )
@@ -289,6 +292,58 @@ def test_releaseapi_post_success(api_rf, slack_messages, build_release, file_con
     assert response.headers["File-Id"] == rfile.id
 
 
+def test_releaseapi_post_streams_large_file(api_rf, build_release, settings):
+    # bigger than Django would hold in memory, so parsing it as an uploaded
+    # file would have spooled it to a temporary file first
+    settings.FILE_UPLOAD_MAX_MEMORY_SIZE = 10
+    content = b"x" * 100
+
+    uploading_user = UserFactory(roles=[OutputChecker])
+    release = build_release(["output/file.txt"])
+    BackendMembershipFactory(backend=release.backend, user=uploading_user)
+
+    request = api_rf.post(
+        "/",
+        content_type="application/octet-stream",
+        data=content,
+        headers={
+            "content-disposition": "attachment; filename=output/file.txt",
+            "authorization": release.backend.auth_token,
+            "os-user": uploading_user.username,
+        },
+    )
+
+    response = ReleaseAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 201, response.data
+    rfile = release.files.get()
+    assert rfile.name == "output/file.txt"
+    assert rfile.size == len(content)
+    assert rfile.absolute_path().read_bytes() == content
+
+
+def test_releaseapi_post_without_filename(api_rf, build_release, file_content):
+    uploading_user = UserFactory(roles=[OutputChecker])
+    release = build_release(["file.txt"])
+    BackendMembershipFactory(backend=release.backend, user=uploading_user)
+
+    request = api_rf.post(
+        "/",
+        content_type="application/octet-stream",
+        data=file_content,
+        headers={
+            "authorization": release.backend.auth_token,
+            "os-user": uploading_user.username,
+        },
+    )
+
+    response = ReleaseAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 400
+    assert response.data["detail"] == "Missing filename"
+    assert not release.files.exists()
+
+
 def test_releaseapi_post_with_content_length_too_large(api_rf, build_release, settings):
     settings.RELEASE_FILE_SIZE_LIMIT = 5
 
@@ -372,6 +427,183 @@ def test_releaseapi_post_with_no_backend_token(api_rf):
     assert response.status_code == 403
 
 
+def release_files_request(api_rf, release, user, files):
+    data = {name: SimpleUploadedFile(name, content) for name, content in files.items()}
+    return api_rf.post(
+        "/",
+        data=data,
+        format="multipart",
+        headers={
+            "authorization": release.backend.auth_token,
+            "os-user": user.username,
+        },
+    )
+
+
+@pytest.fixture
+def uploading_user():
+    return UserFactory(roles=[OutputChecker])
+
+
+def test_releasefilesapi_post_success(api_rf, build_release, uploading_user):
+    release = build_release(["output/file1.txt", "output/file2.txt"])
+    BackendMembershipFactory(backend=release.backend, user=uploading_user)
+
+    request = release_files_request(
+        api_rf,
+        release,
+        uploading_user,
+        {"output/file1.txt": b"one", "output/file2.txt": b"two"},
+    )
+
+    response = ReleaseFilesAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 201, response.data
+    files = {f.name: f for f in release.files.all()}
+    assert files.keys() == {"output/file1.txt", "output/file2.txt"}
+    assert files["output/file2.txt"].absolute_path().read_bytes() == b"two"
+
+    result = response.data["files"]["output/file1.txt"]
+    assert result["status"] == "uploaded"
+    assert result["id"] == files["output/file1.txt"].id
+    assert result["url"].endswith(f"/releases/file/{result['id']}")
+
+
+def test_releasefilesapi_post_with_failures(
+    api_rf, build_release, settings, uploading_user
+):
+    settings.RELEASE_FILE_SIZE_LIMIT = 5
+
+    release = build_release(["file1.txt", "file2.txt"])
+    BackendMembershipFactory(backend=release.backend, user=uploading_user)
+
+    request = release_files_request(
+        api_rf,
+        release,
+        uploading_user,
+        {"file1.txt": b"one", "file2.txt": b"too large", "unknown.txt": b"three"},
+    )
+
+    response = ReleaseFilesAPI.as_view()(request, release_id=release.id)
+
+    # some files were stored, and some weren't
+    assert response.status_code == 207, response.data
+    results = response.data["files"]
+    assert results["file1.txt"]["status"] == "uploaded"
+    assert results["file2.txt"]["detail"].startswith("File is too large")
+    assert results["unknown.txt"]["detail"] == (
+        f"File unknown.txt not requested in release {release.id}"
+    )
+
+    # the good file was still released
+    assert list(release.files.values_list("name", flat=True)) == ["file1.txt"]
+
+
+def test_releasefilesapi_post_with_all_failures(
+    api_rf, build_release, settings, uploading_user
+):
+    settings.RELEASE_FILE_SIZE_LIMIT = 5
+
+    release = build_release(["file1.txt"])
+    BackendMembershipFactory(backend=release.backend, user=uploading_user)
+
+    request = release_files_request(
+        api_rf,
+        release,
+        uploading_user,
+        {"file1.txt": b"too large", "unknown.txt": b"three"},
+    )
+
+    response = ReleaseFilesAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 400, response.data
+    results = response.data["files"]
+    assert {r["status"] for r in results.values()} == {"error"}
+    assert not release.files.exists()
+
+
+def test_releasefilesapi_post_already_uploaded(
+    api_rf, build_release_with_files, uploading_user
+):
+    release = build_release_with_files(["file1.txt"])
+    BackendMembershipFactory(backend=release.backend, user=uploading_user)
+
+    request = release_files_request(
+        api_rf, release, uploading_user, {"file1.txt": b"one"}
+    )
+
+    response = ReleaseFilesAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 400, response.data
+    assert response.data["files"]["file1.txt"]["detail"].startswith(
+        "This version of 'file1.txt' has already been uploaded"
+    )
+
+
+def test_releasefilesapi_post_with_no_files(api_rf, build_release, uploading_user):
+    release = build_release(["file1.txt"])
+    BackendMembershipFactory(backend=release.backend, user=uploading_user)
+
+    request = release_files_request(api_rf, release, uploading_user, {})
+
+    response = ReleaseFilesAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 400, response.data
+    assert response.data["detail"] == "No data uploaded"
+
+
+def test_releasefilesapi_post_wrong_backend(api_rf, build_release, uploading_user):
+    release = build_release(["file1.txt"])
+    backend = BackendFactory()
+    BackendMembershipFactory(backend=backend, user=uploading_user)
+
+    request = api_rf.post(
+        "/",
+        data={"file1.txt": SimpleUploadedFile("file1.txt", b"one")},
+        format="multipart",
+        headers={
+            "authorization": backend.auth_token,
+            "os-user": uploading_user.username,
+        },
+    )
+
+    response = ReleaseFilesAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 400, response.data
+    assert "Release is from backend" in response.data["detail"]
+    assert not release.files.exists()
+
+
+def test_releasefilesapi_post_with_no_backend_token(api_rf):
+    release = ReleaseFactory()
+
+    request = api_rf.post("/")
+
+    response = ReleaseFilesAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 403
+
+
+def test_releasefilesapi_get(api_rf, build_release_with_files, uploading_user):
+    release = build_release_with_files(["file1.txt"])
+    release.requested_files.append({"name": "file2.txt", "sha256": "hash"})
+    release.save()
+    BackendMembershipFactory(backend=release.backend, user=uploading_user)
+
+    request = api_rf.get(
+        "/",
+        headers={
+            "authorization": release.backend.auth_token,
+            "os-user": uploading_user.username,
+        },
+    )
+
+    response = ReleaseFilesAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 200, response.data
+    assert response.data == {"missing": [{"name": "file2.txt", "sha256": "hash"}]}
+
+
 def test_releaseworkspaceapi_get_unknown_workspace(api_rf):
     request = api_rf.get("/")
 
@@ -1871,3 +2103,26 @@ def test_level4authorisationapi_invalid_user(api_rf, user):
 
     response = Level4AuthorisationAPI.as_view()(request)
     assert response.status_code == 403
+
+
+def test_build_level4_user_num_queries(
+    django_assert_num_queries, project_membership, role_factory
+):
+    user = UserFactory()
+    role = role_factory(permission=Permission.UNRELEASED_OUTPUTS_VIEW)
+
+    for _ in range(3):
+        project = ProjectFactory()
+        ProjectCollaborationFactory(project=project)
+        WorkspaceFactory.create_batch(2, project=project)
+        project_membership(user=user, project=project, roles=[role])
+
+        copiloted = ProjectFactory(copilot=user)
+        WorkspaceFactory(project=copiloted)
+
+    # memberships, copiloted projects, workspaces, and orgs
+    with django_assert_num_queries(4):
+        level4_user = build_level4_user(user)
+
+    assert len(level4_user.data["workspaces"]) == 6
+    assert len(level4_user.data["copiloted_workspaces"]) == 3
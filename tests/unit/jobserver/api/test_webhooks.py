@@ -0,0 +1,179 @@
+import hashlib
+import hmac
+import json
+from datetime import UTC, datetime
+
+import pytest
+
+from jobserver.api.webhooks import GitHubWebhookAPI, parse_timestamp
+from tests.factories import RepoFactory
+
+
+SECRET = "webhook-secret"
+URL = "https://github.com/opensafely/research"
+
+
+@pytest.fixture(autouse=True)
+def webhook_secret(settings):
+    settings.GITHUB_WEBHOOK_SECRET = SECRET
+
+
+def deliver(api_rf, event, payload, secret=SECRET):
+    body = json.dumps(payload).encode()
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+    request = api_rf.post(
+        "/",
+        data=body,
+        content_type="application/json",
+        headers={"X-GitHub-Event": event, "X-Hub-Signature-256": f"sha256={digest}"},
+    )
+    return GitHubWebhookAPI.as_view()(request)
+
+
+def repository(**kwargs):
+    return {
+        "html_url": URL,
+        "private": True,
+        "topics": ["github-releases"],
+        "default_branch": "main",
+        "created_at": "2020-07-31T13:37:00Z",
+        "pushed_at": "2024-01-01T00:00:00Z",
+    } | kwargs
+
+
+def push(pushed_at=1704067200):
+    return {
+        "ref": "refs/heads/main",
+        "after": "a" * 40,
+        "repository": repository(created_at=1596202620, pushed_at=pushed_at),
+    }
+
+
+def test_githubwebhookapi_invalid_signature(api_rf):
+    repo = RepoFactory(url=URL)
+
+    response = deliver(api_rf, "push", push(), secret="wrong")
+
+    assert response.status_code == 403
+    repo.refresh_from_db()
+    assert repo.metadata_updated_at is None
+
+
+def test_githubwebhookapi_missing_signature(api_rf):
+    request = api_rf.post(
+        "/", data=push(), format="json", headers={"X-GitHub-Event": "push"}
+    )
+    response = GitHubWebhookAPI.as_view()(request)
+
+    assert response.status_code == 403
+
+
+def test_githubwebhookapi_not_configured(api_rf, settings):
+    settings.GITHUB_WEBHOOK_SECRET = ""
+
+    response = deliver(api_rf, "push", push())
+
+    assert response.status_code == 403
+
+
+def test_githubwebhookapi_ping(api_rf):
+    response = deliver(api_rf, "ping", {"zen": "Keep it logically awesome."})
+
+    assert response.status_code == 200
+    assert response.data["status"] == "ignored"
+
+
+@pytest.mark.parametrize(
+    "event,payload",
+    [
+        ("push", {"ref": "refs/heads/main"}),
+        ("push", {"repository": {"private": True}}),
+        ("push", {"repository": repository(pushed_at="yesterday")}),
+        ("push", ["not", "an", "object"]),
+        ("repository", {"repository": repository()}),
+    ],
+    ids=[
+        "missing_repository",
+        "missing_html_url",
+        "bad_timestamp",
+        "not_an_object",
+        "missing_action",
+    ],
+)
+def test_githubwebhookapi_malformed_payload(api_rf, event, payload):
+    repo = RepoFactory(url=URL)
+
+    response = deliver(api_rf, event, payload)
+
+    assert response.status_code == 400
+    repo.refresh_from_db()
+    assert repo.metadata_updated_at is None
+
+
+def test_githubwebhookapi_push(api_rf):
+    repo = RepoFactory(url=URL.upper())
+
+    response = deliver(api_rf, "push", push())
+
+    assert response.status_code == 200
+    repo.refresh_from_db()
+    assert repo.is_private
+    assert repo.topics == ["github-releases"]
+    assert repo.created_at == datetime(2020, 7, 31, 13, 37, tzinfo=UTC)
+    assert repo.pushed_at == datetime(2024, 1, 1, tzinfo=UTC)
+    assert repo.metadata_updated_at is not None
+
+
+def test_githubwebhookapi_push_out_of_order(api_rf):
+    pushed_at = datetime(2024, 6, 1, tzinfo=UTC)
+    repo = RepoFactory(url=URL, pushed_at=pushed_at)
+
+    deliver(api_rf, "push", push())
+
+    repo.refresh_from_db()
+    assert repo.pushed_at == pushed_at
+    assert repo.is_private is None
+
+
+def test_githubwebhookapi_push_unknown_repo(api_rf):
+    response = deliver(api_rf, "push", push())
+
+    assert response.status_code == 200
+
+
+def test_githubwebhookapi_repository(api_rf):
+    repo = RepoFactory(url=URL, is_private=True)
+
+    response = deliver(
+        api_rf,
+        "repository",
+        {"action": "publicized", "repository": repository(private=False)},
+    )
+
+    assert response.status_code == 200
+    repo.refresh_from_db()
+    assert repo.is_private is False
+    assert repo.pushed_at == datetime(2024, 1, 1, tzinfo=UTC)
+    assert repo.metadata_updated_at is not None
+
+
+def test_githubwebhookapi_repository_deleted(api_rf):
+    repo = RepoFactory(url=URL, is_private=True)
+
+    deliver(
+        api_rf,
+        "repository",
+        {"action": "deleted", "repository": repository(private=False)},
+    )
+
+    repo.refresh_from_db()
+    assert repo.is_private
+
+
+def test_parse_timestamp():
+    expected = datetime(2020, 7, 31, 13, 37, tzinfo=UTC)
+
+    assert parse_timestamp(None) is None
+    assert parse_timestamp(1596202620) == expected
+    assert parse_timestamp("2020-07-31T13:37:00Z") == expected
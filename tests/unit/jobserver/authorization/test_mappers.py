@@ -33,3 +33,31 @@ def test_get_project_roles_for_user_without_roles(project_membership):
     roles = get_project_roles_for_user(project, user)
 
     assert roles == []
+
+
+def test_get_project_roles_for_user_is_cached(
+    django_assert_num_queries, project_membership
+):
+    project = ProjectFactory()
+    user = UserFactory()
+
+    project_membership(project=project, user=user, roles=[ProjectCollaborator])
+
+    with django_assert_num_queries(1):
+        assert get_project_roles_for_user(project, user) == [ProjectCollaborator]
+        assert get_project_roles_for_user(project, user) == [ProjectCollaborator]
+
+
+def test_get_project_roles_for_user_membership_changed(project_membership):
+    project = ProjectFactory()
+    user = UserFactory()
+
+    assert get_project_roles_for_user(project, user) == []
+
+    membership = project_membership(
+        project=project, user=user, roles=[ProjectCollaborator]
+    )
+    assert get_project_roles_for_user(project, user) == [ProjectCollaborator]
+
+    membership.delete(override=True)
+    assert get_project_roles_for_user(project, user) == []
@@ -11,6 +11,7 @@ from jobserver.authorization import (
     roles_with_permission,
     strings_to_roles,
 )
+from jobserver.authorization.utils import _get_permissions
 from jobserver.models import ProjectMembership
 
 from ....factories import ProjectFactory, UserFactory
@@ -34,6 +35,18 @@ def test_has_permission_success():
     assert has_permission(user, "snapshot_publish")
 
 
+def test_has_permission_with_context_queries_once(
+    django_assert_num_queries, project_membership
+):
+    project = ProjectFactory()
+    user = UserFactory()
+    project_membership(project=project, user=user, roles=[ProjectDeveloper])
+
+    with django_assert_num_queries(1):
+        for permission in ProjectDeveloper.permissions:
+            assert has_permission(user, permission, project=project)
+
+
 def test_has_permission_unauthenticated():
     user = AnonymousUser()
 
@@ -111,3 +124,11 @@ def test_roles_with_permission(role_factory):
 
     role_with_permission = roles_with_permission(permission=fake_permission)
     assert set(role_with_permission) == {role_with_permission0, role_with_permission1}
+
+
+def test_get_permissions():
+    permissions = _get_permissions(frozenset([OutputPublisher, ProjectCollaborator]))
+
+    assert permissions == frozenset(
+        OutputPublisher.permissions + ProjectCollaborator.permissions
+    )
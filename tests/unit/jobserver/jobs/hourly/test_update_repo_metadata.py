@@ -0,0 +1,90 @@
+from datetime import UTC, datetime
+
+from jobserver.jobs.hourly import update_repo_metadata
+from tests.fakes import FakeGitHubAPI, FakeGitHubAPIWithErrors
+
+from .....factories import RepoFactory
+
+
+def run_job(get_github_api):
+    job = update_repo_metadata.Job()
+    job.get_github_api = get_github_api
+    job.execute()
+
+
+def test_update_repo_metadata(log_output):
+    # GitHub reports canonical URLs, which won't always match ours
+    predates = RepoFactory(url="https://github.com/opensafely/Predates-Job-Server")
+    public = RepoFactory(url="https://github.com/opensafely/research-repo-3")
+    unknown = RepoFactory(url="https://github.com/opensafely/deleted")
+    on_disk = RepoFactory(url="/path/on/disk/to/repo")
+
+    run_job(FakeGitHubAPI)
+
+    predates.refresh_from_db()
+    assert predates.is_private
+    assert predates.topics == ["github-releases"]
+    assert predates.default_branch == "main"
+    assert predates.created_at == datetime(2020, 7, 31, tzinfo=UTC)
+    assert predates.pushed_at == datetime(2020, 7, 31, tzinfo=UTC)
+    assert predates.metadata_updated_at is not None
+
+    public.refresh_from_db()
+    assert public.is_private is False
+
+    unknown.refresh_from_db()
+    assert unknown.is_private is None
+    assert unknown.metadata_updated_at is None
+
+    on_disk.refresh_from_db()
+    assert on_disk.is_private is None
+
+    assert log_output.entries[-1]["event"] == "Updated repo metadata"
+    assert log_output.entries[-1]["checked_count"] == 3
+    assert log_output.entries[-1]["updated_count"] == 2
+
+
+def test_update_repo_metadata_skips_unchanged_repos(freezer):
+    metadata_updated_at = datetime(2024, 1, 1, tzinfo=UTC)
+    repo = RepoFactory(
+        url="https://github.com/opensafely/predates-job-server",
+        is_private=True,
+        topics=["github-releases"],
+        default_branch="main",
+        created_at=datetime(2020, 7, 31, tzinfo=UTC),
+        pushed_at=datetime(2020, 7, 31, tzinfo=UTC),
+        metadata_updated_at=metadata_updated_at,
+    )
+
+    run_job(FakeGitHubAPI)
+
+    repo.refresh_from_db()
+    assert repo.metadata_updated_at == metadata_updated_at
+
+
+def test_update_repo_metadata_keeps_newer_webhook_updates():
+    # a webhook has told us about a push since GitHub's data was fetched
+    pushed_at = datetime(2024, 1, 1, tzinfo=UTC)
+    repo = RepoFactory(
+        url="https://github.com/opensafely/predates-job-server",
+        is_private=False,
+        pushed_at=pushed_at,
+    )
+
+    run_job(FakeGitHubAPI)
+
+    repo.refresh_from_db()
+    assert repo.is_private is False
+    assert repo.pushed_at == pushed_at
+
+
+def test_update_repo_metadata_with_github_error(log_output):
+    repo = RepoFactory(url="https://github.com/opensafely/research-repo-1")
+
+    run_job(FakeGitHubAPIWithErrors)
+
+    repo.refresh_from_db()
+    assert repo.is_private is None
+
+    assert log_output.entries[0]["event"] == "Failed to get repo metadata from GitHub"
+    assert log_output.entries[0]["org"] == "opensafely"
@@ -1,24 +1,38 @@
+from datetime import timedelta
 from unittest.mock import Mock, patch
 
 from django.core.management import call_command
+from django.utils import timezone
 
 from jobserver.management.commands.rap_status_service import (
+    PollScheduler,
     safe_close_old_db_connections,
+    shard_rap_ids,
 )
+from jobserver.models import JobRequestStatus
+from jobserver.rap_api import RapAPIRequestError
+
+
+def active_job_request(identifier, status=JobRequestStatus.RUNNING, age=0):
+    return Mock(
+        identifier=identifier,
+        computed_status=status,
+        created_at=timezone.now() - timedelta(seconds=age),
+    )
 
 
 @patch(
     "jobserver.management.commands.rap_status_service.rap_status_update", autospec=True
 )
 @patch(
-    "jobserver.management.commands.rap_status_service.get_active_job_request_identifiers",
+    "jobserver.management.commands.rap_status_service.get_active_job_requests",
     autospec=True,
 )
 def test_call_rap_status_service_command(
-    mock_get_active_job_request_ids, mock_rap_status_update, settings
+    mock_get_active_job_requests, mock_rap_status_update, settings
 ):
     settings.RAP_API_POLL_INTERVAL = 0
-    mock_get_active_job_request_ids.return_value = ["identifier"]
+    mock_get_active_job_requests.return_value = [active_job_request("identifier")]
     # Mock run_fn so we loop twice then stop
     run_fn = Mock(side_effect=[True, True, False])
     call_command("rap_status_service", run_fn=run_fn)
@@ -31,22 +45,25 @@ def test_call_rap_status_service_command(
     "jobserver.management.commands.rap_status_service.rap_status_update", autospec=True
 )
 @patch(
-    "jobserver.management.commands.rap_status_service.get_active_job_request_identifiers",
+    "jobserver.management.commands.rap_status_service.get_active_job_requests",
     autospec=True,
 )
 def test_call_rap_status_service_command_error(
-    mock_get_active_job_request_ids, mock_rap_status_update, settings, log_output
+    mock_get_active_job_requests, mock_rap_status_update, settings, log_output
 ):
     settings.RAP_API_POLL_INTERVAL = 0
 
-    # Mock an unhandled exception the first time get_active_job_request_identifiers is called
-    mock_get_active_job_request_ids.side_effect = [Exception("bad ids"), ["identifier"]]
+    # Mock an unhandled exception the first time get_active_job_requests is called
+    mock_get_active_job_requests.side_effect = [
+        Exception("bad ids"),
+        [active_job_request("identifier")],
+    ]
 
     # Mock run_fn so we loop twice then stop
     run_fn = Mock(side_effect=[True, True, False])
 
     call_command("rap_status_service", run_fn=run_fn)
-    # rap_status_update is only called once, on the second loop when get_active_job_request_identifiers succeeded
+    # rap_status_update is only called once, on the second loop when get_active_job_requests succeeded
     assert mock_rap_status_update.call_count == 1
     mock_rap_status_update.assert_called_with(["identifier"])
 
@@ -54,6 +71,130 @@ def test_call_rap_status_service_command_error(
     assert "bad ids" in str(log_output.entries[0]["event"])
 
 
+@patch(
+    "jobserver.management.commands.rap_status_service.rap_status_update", autospec=True
+)
+@patch(
+    "jobserver.management.commands.rap_status_service.get_active_job_requests",
+    autospec=True,
+)
+def test_call_rap_status_service_command_shards(
+    mock_get_active_job_requests, mock_rap_status_update, settings, log_output
+):
+    settings.RAP_API_POLL_INTERVAL = 0
+    settings.RAP_API_STATUS_SHARD_SIZE = 2
+    mock_get_active_job_requests.return_value = [
+        active_job_request(identifier) for identifier in ["a", "b", "c", "d", "e"]
+    ]
+
+    # Mock one shard failing, which shouldn't stop the others being updated
+    def update(rap_ids):
+        if rap_ids == ["c", "d"]:
+            raise Exception("bad shard")
+
+    mock_rap_status_update.side_effect = update
+
+    run_fn = Mock(side_effect=[True, False])
+    call_command("rap_status_service", run_fn=run_fn)
+
+    assert sorted(call.args for call in mock_rap_status_update.call_args_list) == [
+        (["a", "b"],),
+        (["c", "d"],),
+        (["e"],),
+    ]
+
+    errors = [e for e in log_output.entries if e["log_level"] == "error"]
+    assert len(errors) == 1
+    assert "bad shard" in str(errors[0]["event"])
+    assert errors[0]["rap_ids"] == ["c", "d"]
+
+
+@patch("jobserver.management.commands.rap_status_service.time.sleep", autospec=True)
+@patch(
+    "jobserver.management.commands.rap_status_service.rap_status_update", autospec=True
+)
+@patch(
+    "jobserver.management.commands.rap_status_service.get_active_job_requests",
+    autospec=True,
+)
+def test_call_rap_status_service_command_backs_off(
+    mock_get_active_job_requests, mock_rap_status_update, mock_sleep, settings
+):
+    settings.RAP_API_POLL_INTERVAL = 10
+    settings.RAP_API_MAX_BACKOFF = 30
+    mock_get_active_job_requests.return_value = [active_job_request("identifier")]
+    mock_rap_status_update.side_effect = [
+        RapAPIRequestError("down"),
+        RapAPIRequestError("down"),
+        RapAPIRequestError("down"),
+        None,
+    ]
+
+    run_fn = Mock(side_effect=[True, True, True, True, False])
+    call_command("rap_status_service", run_fn=run_fn)
+
+    first, second, third, fourth = (call.args[0] for call in mock_sleep.call_args_list)
+    assert 10 <= first <= 20
+    assert 15 <= second <= 30
+    # capped at RAP_API_MAX_BACKOFF
+    assert 15 <= third <= 30
+    # back to normal once the RAP API recovers
+    assert 0 < fourth <= 10
+
+
+def test_poll_scheduler_due(freezer, settings):
+    settings.RAP_API_SLOW_POLL_INTERVAL = 300
+    settings.RAP_API_RECENT_JOB_REQUEST_AGE = 3600
+
+    running = active_job_request("running", age=7200)
+    recent = active_job_request("recent", status=JobRequestStatus.PENDING, age=60)
+    pending = active_job_request("pending", status=JobRequestStatus.PENDING, age=7200)
+    job_requests = [running, recent, pending]
+
+    scheduler = PollScheduler()
+
+    # everything is due the first time we see it
+    assert scheduler.due(job_requests) == ["running", "recent", "pending"]
+    scheduler.record_polled(["running", "recent", "pending"])
+
+    # long-pending job requests wait for the slow interval
+    freezer.tick(timedelta(seconds=60))
+    assert scheduler.due(job_requests) == ["running", "recent"]
+
+    freezer.tick(timedelta(seconds=240))
+    assert scheduler.due(job_requests) == ["running", "recent", "pending"]
+
+    # job requests which are no longer active are forgotten
+    scheduler.due([running])
+    assert list(scheduler.last_polled) == ["running"]
+
+
+def test_poll_scheduler_sleep_time(settings):
+    settings.RAP_API_POLL_INTERVAL = 60
+    settings.RAP_API_MAX_BACKOFF = 600
+
+    scheduler = PollScheduler()
+    assert scheduler.sleep_time(elapsed=15) == 45
+    # don't sleep at all if the cycle overran
+    assert scheduler.sleep_time(elapsed=90) == 0
+
+    scheduler.record_cycle(failed=True)
+    assert 60 <= scheduler.sleep_time(elapsed=1) <= 120
+
+    for _ in range(10):
+        scheduler.record_cycle(failed=True)
+    assert 300 <= scheduler.sleep_time(elapsed=1) <= 600
+
+    scheduler.record_cycle(failed=False)
+    assert scheduler.sleep_time(elapsed=1) == 59
+
+
+def test_shard_rap_ids():
+    assert shard_rap_ids([], 2) == []
+    assert shard_rap_ids(["a", "b"], 2) == [["a", "b"]]
+    assert shard_rap_ids(["a", "b", "c"], 2) == [["a", "b"], ["c"]]
+
+
 def test_safe_close_old_db_connections_handles_exceptions_on_failure(
     mocker, log_output
 ):
@@ -0,0 +1,41 @@
+from unittest.mock import Mock, patch
+
+from django.core.management import call_command
+
+
+@patch("jobserver.management.commands.rap_submission_service.time.sleep", autospec=True)
+@patch(
+    "jobserver.management.commands.rap_submission_service.submit_job_requests",
+    autospec=True,
+)
+def test_rap_submission_service(mock_submit, mock_sleep, settings):
+    settings.RAP_SUBMISSION_BATCH_SIZE = 2
+    settings.RAP_SUBMISSION_POLL_INTERVAL = 10
+
+    # a full batch, then a partial one, then nothing to submit
+    mock_submit.side_effect = [2, 1, 0]
+
+    run_fn = Mock(side_effect=[True, True, True, False])
+    call_command("rap_submission_service", run_fn=run_fn)
+
+    assert mock_submit.call_count == 3
+    # we don't wait between batches while there's a backlog
+    assert [call.args for call in mock_sleep.call_args_list] == [(10,), (10,)]
+
+
+@patch("jobserver.management.commands.rap_submission_service.time.sleep", autospec=True)
+@patch(
+    "jobserver.management.commands.rap_submission_service.submit_job_requests",
+    autospec=True,
+)
+def test_rap_submission_service_error(mock_submit, mock_sleep, settings, log_output):
+    settings.RAP_SUBMISSION_POLL_INTERVAL = 0
+    mock_submit.side_effect = [Exception("database is down"), 0]
+
+    run_fn = Mock(side_effect=[True, True, False])
+    call_command("rap_submission_service", run_fn=run_fn)
+
+    # the error doesn't stop the service
+    assert mock_submit.call_count == 2
+    assert log_output.entries[0]["log_level"] == "error"
+    assert "database is down" in str(log_output.entries[0]["event"])
@@ -83,6 +83,35 @@ def test_update_nonexistent_backend(patch_backend_status_api_call, log_output):
 
     assert "error" == log_output.entries[0]["log_level"]
     assert "does not exist" in str(log_output.entries[0]["event"])
+    assert log_output.entries[0]["backend"] == "other_backend"
+
+
+def test_update_nonexistent_backend_updates_others(monkeypatch, log_output):
+    backend = BackendFactory()
+    state = {
+        "last_seen": "2025-08-12T06:57:43.039078Z",
+        "paused": {"status": "off", "since": None},
+        "db_maintenance": {"status": "off", "since": None, "type": None},
+    }
+    test_response_body = {
+        "backends": [
+            {"slug": "other_backend", **state},
+            {"slug": backend.slug, **state},
+        ]
+    }
+    monkeypatch.setattr(
+        "jobserver.rap_api.backend_status",
+        lambda: test_response_body,
+    )
+
+    call_command("rap_update_backend_status")
+
+    assert log_output.entries[0]["log_level"] == "error"
+    assert log_output.entries[0]["backend"] == "other_backend"
+
+    backend.refresh_from_db()
+    assert backend.rap_api_state == test_response_body["backends"][1]
+    assert backend.last_seen_at == datetime.fromisoformat("2025-08-12T06:57:43.039078Z")
 
 
 def test_update_backend_state_no_timestamp(patch_backend_status_api_call):
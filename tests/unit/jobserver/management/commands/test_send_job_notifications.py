@@ -0,0 +1,43 @@
+from unittest.mock import Mock, patch
+
+from django.core.management import call_command
+
+
+@patch("jobserver.management.commands.send_job_notifications.time.sleep", autospec=True)
+@patch(
+    "jobserver.management.commands.send_job_notifications.send_job_notifications",
+    autospec=True,
+)
+def test_send_job_notifications_command(mock_send, mock_sleep, settings):
+    settings.JOB_NOTIFICATION_BATCH_SIZE = 2
+    settings.JOB_NOTIFICATION_POLL_INTERVAL = 10
+
+    # a full batch, then a partial one, then an empty outbox
+    mock_send.side_effect = [2, 1, 0]
+
+    run_fn = Mock(side_effect=[True, True, True, False])
+    call_command("send_job_notifications", run_fn=run_fn)
+
+    assert mock_send.call_count == 3
+    # we don't wait between batches while there's a backlog
+    assert [call.args for call in mock_sleep.call_args_list] == [(10,), (10,)]
+
+
+@patch("jobserver.management.commands.send_job_notifications.time.sleep", autospec=True)
+@patch(
+    "jobserver.management.commands.send_job_notifications.send_job_notifications",
+    autospec=True,
+)
+def test_send_job_notifications_command_error(
+    mock_send, mock_sleep, settings, log_output
+):
+    settings.JOB_NOTIFICATION_POLL_INTERVAL = 0
+    mock_send.side_effect = [Exception("database is down"), 0]
+
+    run_fn = Mock(side_effect=[True, True, False])
+    call_command("send_job_notifications", run_fn=run_fn)
+
+    # the error doesn't stop the service
+    assert mock_send.call_count == 2
+    assert log_output.entries[0]["log_level"] == "error"
+    assert "database is down" in str(log_output.entries[0]["event"])
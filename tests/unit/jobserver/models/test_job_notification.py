@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from jobserver.models import JobNotification
+
+from ....factories import JobFactory, JobNotificationFactory
+
+
+def test_jobnotification_due():
+    now = timezone.now()
+    due = JobNotificationFactory()
+    JobNotificationFactory(sent_at=now)
+    JobNotificationFactory(next_attempt_at=now + timedelta(minutes=1))
+    JobNotificationFactory(attempts=5)
+
+    assert list(JobNotification.objects.due(max_attempts=5)) == [due]
+
+
+def test_jobnotification_str():
+    job = JobFactory(action="my-action")
+    notification = JobNotificationFactory(job=job)
+
+    assert str(notification) == f"Notification for my-action ({job.pk})"
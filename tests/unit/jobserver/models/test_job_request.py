@@ -174,6 +174,13 @@ def test_jobrequest_is_completed_unknown_status():
     assert not jr.is_completed
 
 
+def test_jobrequest_is_completed_submitting():
+    job_request = JobRequestFactory(_status=JobRequestStatus.SUBMITTING)
+
+    assert job_request.jobs_status == JobRequestStatus.SUBMITTING
+    assert not job_request.is_completed
+
+
 def test_jobrequest_num_completed_no_jobs():
     assert JobRequestFactory().num_completed == 0
 
@@ -759,6 +766,94 @@ def test_jobrequest_jobs_status_without_prefetching_jobs(django_assert_num_queri
     assert "jobs" in job_request._prefetched_objects_cache
 
 
+@pytest.mark.parametrize(
+    "status,job_statuses",
+    [
+        (JobRequestStatus.PENDING, []),
+        (JobRequestStatus.SUCCEEDED, ["running"]),
+        (JobRequestStatus.UNKNOWN, ["failed", "failed"]),
+        (JobRequestStatus.UNKNOWN, ["", ""]),
+        (JobRequestStatus.UNKNOWN, ["foo", "foo"]),
+        (JobRequestStatus.UNKNOWN, ["Succeeded"]),
+        (JobRequestStatus.UNKNOWN, ["pending", "failed", "succeeded"]),
+        (JobRequestStatus.UNKNOWN, ["running", "failed"]),
+        (JobRequestStatus.UNKNOWN, ["failed", "succeeded"]),
+        (JobRequestStatus.UNKNOWN, ["foo", "succeeded"]),
+    ],
+)
+def test_jobrequestqueryset_with_computed_status(status, job_statuses):
+    job_request = JobRequestFactory(_status=status)
+    for job_status in job_statuses:
+        JobFactory(job_request=job_request, status=job_status)
+
+    computed_status = (
+        JobRequest.objects.with_computed_status().get(pk=job_request.pk).computed_status
+    )
+
+    # we should calculate the same status as the jobs_status property does
+    assert computed_status == JobRequest.objects.get(pk=job_request.pk).jobs_status
+
+
+def test_jobrequestqueryset_active():
+    active = JobRequestFactory(_status=JobRequestStatus.PENDING)
+    # stale _status, but still over-included
+    stale = JobRequestFactory(_status=JobRequestStatus.RUNNING)
+    JobFactory(job_request=stale, status="succeeded")
+    # old job request with a running job
+    old = JobRequestFactory(
+        _status=JobRequestStatus.FAILED,
+        created_at=timezone.now() - timedelta(weeks=104),
+    )
+    JobFactory(job_request=old, status="running")
+
+    # these are not included
+    JobRequestFactory(_status=JobRequestStatus.SUCCEEDED)
+    JobRequestFactory(
+        _status=JobRequestStatus.UNKNOWN,
+        created_at=timezone.now() - timedelta(weeks=104),
+    )
+    # not sent to the RAP API yet
+    JobRequestFactory(_status=JobRequestStatus.SUBMITTING)
+
+    assert set(JobRequest.objects.active()) == {active, stale, old}
+
+
+def test_jobrequestqueryset_active_created_within_365_days(freezer):
+    # 52 weeks is only 364 days, so this checks we look back a full 365
+    recent = JobRequestFactory(
+        _status=JobRequestStatus.UNKNOWN,
+        created_at=timezone.now() - timedelta(days=364, hours=12),
+    )
+    JobRequestFactory(
+        _status=JobRequestStatus.UNKNOWN,
+        created_at=timezone.now() - timedelta(days=365, seconds=1),
+    )
+
+    assert list(JobRequest.objects.active()) == [recent]
+
+
+def test_jobrequestqueryset_awaiting_submission():
+    submitting = JobRequestFactory(_status=JobRequestStatus.SUBMITTING)
+    JobRequestFactory(_status=JobRequestStatus.PENDING)
+    JobRequestFactory(_status=JobRequestStatus.UNKNOWN)
+
+    assert list(JobRequest.objects.awaiting_submission()) == [submitting]
+
+
+def test_jobrequestqueryset_awaiting_submission_claimed(freezer, settings):
+    settings.RAP_SUBMISSION_CLAIM_TIMEOUT = 60
+    expired = JobRequestFactory(
+        _status=JobRequestStatus.SUBMITTING,
+        claimed_at=timezone.now() - timedelta(seconds=61),
+    )
+    JobRequestFactory(
+        _status=JobRequestStatus.SUBMITTING,
+        claimed_at=timezone.now() - timedelta(seconds=59),
+    )
+
+    assert list(JobRequest.objects.awaiting_submission()) == [expired]
+
+
 def test_jobrequest_str():
     job_request = JobRequestFactory()
 
@@ -895,6 +990,32 @@ def test_jobrequest_request_rap_creation_failed_to_request(
     assert job_request.status_message is None
 
 
+@patch("jobserver.rap_api.create")
+def test_jobrequest_request_rap_creation_status_changed_meanwhile(
+    mock_rap_api_create, build_job_request
+):
+    job_request = build_job_request(project_number=1)
+    job_request.update_status(JobRequestStatus.UNKNOWN_ERROR_CREATING_JOBS)
+
+    # another process fails the job request while we wait on the RAP API, so
+    # our copy of its status is stale when we record the result
+    def create(job_request):
+        JobRequest.objects.filter(pk=job_request.pk).update(
+            _status=JobRequestStatus.FAILED
+        )
+        raise RapAPIRequestError("something went wrong")
+
+    mock_rap_api_create.side_effect = create
+
+    job_request.request_rap_creation()
+
+    job_request.refresh_from_db()
+    assert (
+        JobRequestStatus(job_request.jobs_status)
+        == JobRequestStatus.UNKNOWN_ERROR_CREATING_JOBS
+    )
+
+
 @patch("jobserver.rap_api.create")
 def test_jobrequest_request_rap_creation_error(
     mock_rap_api_create, build_job_request, log_output
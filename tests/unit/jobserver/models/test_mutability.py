@@ -36,6 +36,7 @@ MUTABLE_MODELS = [
         "jobserver.Backend",
         "jobserver.BackendMembership",
         "jobserver.Job",
+        "jobserver.JobNotification",
         "jobserver.JobRequest",
         "jobserver.Org",
         "jobserver.OrgMembership",
@@ -308,8 +308,11 @@ UNPAIRED_FIELDS = [
     ),
     ("jobserver.Backend", "created_at", "updated_at", "last_seen_at"),
     ("jobserver.Job", "completed_at", "created_at", "started_at", "updated_at"),
+    ("jobserver.JobNotification", "created_at", "next_attempt_at", "sent_at"),
+    ("jobserver.JobRequest", "claimed_at"),
     ("jobserver.Project", "copilot_support_ends_at"),
     ("jobserver.ReleaseFile", "uploaded_at"),
+    ("jobserver.Repo", "created_at", "metadata_updated_at", "pushed_at"),
     ("jobserver.User", "created_by", "login_token_expires_at", "pat_expires_at"),
     ("redirects.Redirect", "expires_at", "updated_at"),
 ]
@@ -0,0 +1,32 @@
+from jobserver.cache_backends import SizeBoundedLocMemCache
+
+
+def build_cache(max_size):
+    return SizeBoundedLocMemCache(
+        "test-size-bounded", {"OPTIONS": {"MAX_SIZE": max_size}}
+    )
+
+
+def test_sizeboundedlocmemcache_evicts_least_recently_used():
+    cache = build_cache(max_size=1000)
+    cache.clear()
+
+    cache.set("a", "a" * 400)
+    cache.set("b", "b" * 400)
+    cache.get("a")
+    cache.set("c", "c" * 400)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_sizeboundedlocmemcache_value_larger_than_max_size():
+    cache = build_cache(max_size=100)
+    cache.clear()
+
+    cache.set("a", "a" * 10)
+    cache.set("b", "b" * 1000)
+
+    assert cache.get("a") is None
+    assert cache.get("b") is None
@@ -1,4 +1,6 @@
 import pytest
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
 
 from jobserver.github import GitHubAPI
 
@@ -20,3 +22,128 @@ def test_githubapi_url(parts, query_args, expected):
     api = GitHubAPI(_session=None)
 
     assert api._url(parts, query_args) == f"https://api.github.com{expected}"
+
+
+class FakeSession:
+    """Record requests, and reply with the given responses in turn"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        return self.responses.pop(0)
+
+
+def build_response(status_code, content=b"", headers=None):
+    response = Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers = CaseInsensitiveDict(headers or {})
+    response.encoding = "utf-8"
+    return response
+
+
+@pytest.mark.usefixtures("clear_cache")
+def test_githubapi_get_serves_not_modified_from_cache():
+    session = FakeSession(
+        build_response(200, b'{"private": true}', {"ETag": '"abc"'}),
+        build_response(304),
+    )
+    api = GitHubAPI(_session=session, token="token")
+
+    assert api.get_repo("opensafely", "cached") == {"private": True}
+    assert api.get_repo("opensafely", "cached") == {"private": True}
+
+    first, second = [kwargs["headers"] for _, _, kwargs in session.requests]
+    assert "If-None-Match" not in first
+    assert second["If-None-Match"] == '"abc"'
+    assert second["Authorization"] == "bearer token"
+
+
+@pytest.mark.usefixtures("clear_cache")
+def test_githubapi_get_replaces_modified_response():
+    session = FakeSession(
+        build_response(200, b"version: 3", {"Last-Modified": "Mon, 01 Jan 2024"}),
+        build_response(200, b"version: 4", {"Last-Modified": "Tue, 02 Jan 2024"}),
+        build_response(304),
+    )
+    api = GitHubAPI(_session=session)
+
+    assert api.get_file("opensafely", "modified", "main") == "version: 3"
+    assert api.get_file("opensafely", "modified", "main") == "version: 4"
+    assert api.get_file("opensafely", "modified", "main") == "version: 4"
+
+    headers = [kwargs["headers"] for _, _, kwargs in session.requests]
+    assert headers[1]["If-Modified-Since"] == "Mon, 01 Jan 2024"
+    assert headers[2]["If-Modified-Since"] == "Tue, 02 Jan 2024"
+
+
+@pytest.mark.usefixtures("clear_cache")
+def test_githubapi_get_cache_is_keyed_on_accept_header():
+    session = FakeSession(
+        build_response(200, b'{"name": "main"}', {"ETag": '"json"'}),
+        build_response(200, b"raw", {"ETag": '"raw"'}),
+    )
+    api = GitHubAPI(_session=session)
+
+    url = api._url(["repos", "opensafely", "accept"])
+    api._get(url, headers={"Accept": "application/vnd.github.v3+json"})
+    api._get(url, headers={"Accept": "application/vnd.github.3.raw"})
+
+    # the second request isn't conditional on the first response
+    assert "If-None-Match" not in session.requests[1][2]["headers"]
+
+
+@pytest.mark.usefixtures("clear_cache")
+def test_githubapi_get_without_validators_is_not_cached():
+    session = FakeSession(
+        build_response(200, b"[]"),
+        build_response(200, b"[]"),
+    )
+    api = GitHubAPI(_session=session)
+
+    api.get_labels("opensafely", "uncached")
+    api.get_labels("opensafely", "uncached")
+
+    assert "If-None-Match" not in session.requests[1][2]["headers"]
+
+
+@pytest.mark.usefixtures("clear_cache")
+def test_githubapi_get_cache_disabled(settings):
+    settings.GITHUB_API_CACHE_TTL = 0
+    session = FakeSession(
+        build_response(200, b"[]", {"ETag": '"abc"'}),
+        build_response(200, b"[]", {"ETag": '"abc"'}),
+    )
+    api = GitHubAPI(_session=session)
+
+    api.get_labels("opensafely", "disabled")
+    api.get_labels("opensafely", "disabled")
+
+    assert "If-None-Match" not in session.requests[1][2]["headers"]
+
+
+@pytest.mark.parametrize(
+    "status_code,content,expected",
+    [
+        (
+            200,
+            b"0123456789abcdef0123456789abcdef01234567",
+            "0123456789abcdef0123456789abcdef01234567",
+        ),
+        (404, b"", None),
+        (422, b"", None),
+    ],
+)
+def test_githubapi_get_commit_sha(status_code, content, expected, settings):
+    settings.GITHUB_API_CACHE_TTL = 0
+    session = FakeSession(build_response(status_code, content))
+    api = GitHubAPI(_session=session, token="token")
+
+    assert api.get_commit_sha("opensafely", "test", "v1.0") == expected
+
+    _, url, kwargs = session.requests[0]
+    assert url == "https://api.github.com/repos/opensafely/test/commits/v1.0"
+    assert kwargs["headers"]["Accept"] == "application/vnd.github.sha"
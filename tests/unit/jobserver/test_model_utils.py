@@ -0,0 +1,64 @@
+from django.utils import timezone
+
+from jobserver.model_utils import bulk_update_changed
+from jobserver.models import Repo
+
+from ...factories import RepoFactory
+
+
+def test_bulk_update_changed(django_assert_num_queries):
+    changed = RepoFactory(has_github_outputs=False)
+    unchanged = RepoFactory(has_github_outputs=True)
+
+    repos = list(Repo.objects.all())
+    with django_assert_num_queries(1):
+        count = bulk_update_changed(
+            repos, ["has_github_outputs"], lambda r: {"has_github_outputs": True}
+        )
+
+    assert count == 1
+
+    changed.refresh_from_db()
+    assert changed.has_github_outputs
+    unchanged.refresh_from_db()
+    assert unchanged.has_github_outputs
+
+
+def test_bulk_update_changed_with_changed_values():
+    changed = RepoFactory(is_private=None)
+    unchanged = RepoFactory(is_private=True)
+
+    bulk_update_changed(
+        Repo.objects.all(),
+        ["is_private"],
+        lambda r: {"is_private": True},
+        changed_values={"metadata_updated_at": timezone.now()},
+    )
+
+    changed.refresh_from_db()
+    assert changed.metadata_updated_at is not None
+    unchanged.refresh_from_db()
+    assert unchanged.metadata_updated_at is None
+
+
+def test_bulk_update_changed_in_batches(django_assert_num_queries):
+    RepoFactory.create_batch(5)
+
+    with django_assert_num_queries(4):
+        # one query to stream the repos, then one per batch of two
+        count = bulk_update_changed(
+            Repo.objects.iterator(),
+            ["default_branch"],
+            lambda r: {"default_branch": "main"},
+            batch_size=2,
+        )
+
+    assert count == 5
+    assert set(Repo.objects.values_list("default_branch", flat=True)) == {"main"}
+
+
+def test_bulk_update_changed_with_nothing_to_do(django_assert_num_queries):
+    repo = RepoFactory()
+
+    with django_assert_num_queries(0):
+        assert bulk_update_changed([repo], ["is_private"], lambda r: {}) == 0
@@ -2,20 +2,27 @@ import textwrap
 
 import pytest
 from furl import furl
+from pipeline import load_pipeline
+from pipeline.exceptions import ProjectValidationError
 from pipeline.models import Pipeline
 
 from jobserver.pipeline_config import (
     ActionConfigError,
+    PipelineSummary,
     check_cohortextractor_usage,
     check_sqlrunner_permission,
     get_actions,
     get_codelists_status,
+    get_commit_sha,
     get_database_actions,
+    get_pipeline_summary,
     get_project,
+    get_rendered_definition,
     link_run_scripts,
     map_run_scripts_to_links,
     render_definition,
 )
+from tests.conftest import get_trace
 
 from ...factories import ProjectFactory
 from ...fakes import FakeGitHubAPI, FakeOpenCodelistsAPI
@@ -38,6 +45,40 @@ dummy_project = {
 }
 
 
+SHA = "0123456789abcdef0123456789abcdef01234567"
+
+
+class CountingGitHubAPI(FakeGitHubAPI):
+    """FakeGitHubAPI which counts the calls made to it"""
+
+    calls = []
+
+    def get_branch_sha(self, org, repo, branch):
+        self.calls.append(("get_branch_sha", branch))
+        return super().get_branch_sha(org, repo, branch)
+
+    def get_file(self, org, repo, branch, filepath="project.yaml"):
+        self.calls.append(("get_file", filepath))
+        return super().get_file(org, repo, branch, filepath)
+
+
+class CountingOpenCodelistsAPI(FakeOpenCodelistsAPI):
+    """FakeOpenCodelistsAPI which counts the calls made to it"""
+
+    calls = []
+
+    def check_codelists(self, txt_content, json_content):
+        self.calls.append("check_codelists")
+        return super().check_codelists(txt_content, json_content)
+
+
+@pytest.fixture
+def counting_apis():
+    CountingGitHubAPI.calls = []
+    CountingOpenCodelistsAPI.calls = []
+    yield CountingGitHubAPI, CountingOpenCodelistsAPI
+
+
 def link_func(path):
     f = furl("example.com")
     f.path /= path
@@ -112,6 +153,93 @@ def test_check_sqlrunner_permission_no_sqlrunner_actions():
     check_sqlrunner_permission(ProjectFactory(id=101, number=1), config)
 
 
+def test_pipeline_summary_from_config():
+    summary = PipelineSummary.from_config(Pipeline.build(**dummy_project))
+
+    assert summary.actions == [
+        {"name": "generate_study_population", "needs": []},
+        {"name": "run_model", "needs": ["generate_study_population"]},
+        {"name": "run_all", "needs": ["generate_study_population", "run_model"]},
+    ]
+    assert summary.database_actions == ["generate_study_population"]
+    assert summary.run_commands == [
+        "ehrql:v1 generate-dataset --output output/input.csv",
+        "stata-mp:latest analysis/model.do",
+    ]
+
+
+def test_pipeline_summary_check():
+    summary = PipelineSummary(
+        actions=[], database_actions=[], run_commands=["sqlrunner:latest"]
+    )
+
+    # The internal project has permission
+    summary.check(ProjectFactory(id=28))
+
+    with pytest.raises(ActionConfigError):
+        summary.check(ProjectFactory(id=102, number=1))
+
+
+def test_pipeline_summary_check_cohortextractor_usage():
+    summary = PipelineSummary(
+        actions=[],
+        database_actions=[],
+        run_commands=["cohortextractor:latest generate_cohort"],
+    )
+
+    with pytest.raises(ActionConfigError):
+        summary.check(ProjectFactory(id=28))
+
+
+def test_get_pipeline_summary_caches_by_content(mocker):
+    mocked_load = mocker.patch(
+        "jobserver.pipeline_config.load_pipeline", wraps=load_pipeline
+    )
+    content = textwrap.dedent(
+        """
+        version: "3.0"
+        expectations:
+          population_size: 1000
+        actions:
+          generate_study_population:
+            run: ehrql:v1 generate-dataset --output output/input.csv
+            outputs:
+              highly_sensitive:
+                cohort: output/input.csv
+          run_model:
+            run: stata-mp:latest analysis/model.do
+            needs: [generate_study_population]
+            outputs:
+              moderately_sensitive:
+                log: logs/model.log
+        """
+    )
+
+    first = get_pipeline_summary(content)
+    second = get_pipeline_summary(content)
+
+    assert first == second
+    mocked_load.assert_called_once_with(content)
+
+    first_span, second_span = get_trace()
+    assert first_span.attributes["pipeline.cache_hit"] is False
+    assert first_span.attributes["pipeline.action_count"] == 3
+    assert "pipeline.parse_duration_ms" in first_span.attributes
+    assert second_span.attributes["pipeline.cache_hit"] is True
+
+
+def test_get_pipeline_summary_invalid_content_is_not_cached(mocker):
+    mocked_load = mocker.patch(
+        "jobserver.pipeline_config.load_pipeline", wraps=load_pipeline
+    )
+
+    for _ in range(2):
+        with pytest.raises(ProjectValidationError):
+            get_pipeline_summary("not: a: pipeline")
+
+    assert mocked_load.call_count == 2
+
+
 def test_get_actions_missing_needs():
     dummy = Pipeline.build(
         version=3,
@@ -217,6 +345,67 @@ def test_get_project_success():
     assert pipeline_config == expected
 
 
+def test_get_project_caches_content_at_sha(counting_apis):
+    github_api, _ = counting_apis
+
+    first = get_project("opensafely", "test", SHA, get_github_api=github_api)
+    second = get_project("opensafely", "test", SHA, get_github_api=github_api)
+
+    assert first == second
+    assert github_api.calls == [("get_file", "project.yaml")]
+
+
+def test_get_project_does_not_cache_content_at_branch(counting_apis):
+    github_api, _ = counting_apis
+
+    get_project("opensafely", "test", "main", get_github_api=github_api)
+    get_project("opensafely", "test", "main", get_github_api=github_api)
+
+    assert len(github_api.calls) == 2
+
+
+def test_get_commit_sha_with_sha(counting_apis):
+    github_api, _ = counting_apis
+
+    assert get_commit_sha("opensafely", "test", SHA, get_github_api=github_api) == SHA
+    assert github_api.calls == []
+
+
+def test_get_commit_sha_with_branch(counting_apis):
+    github_api, _ = counting_apis
+
+    sha = get_commit_sha("opensafely", "test", "main", get_github_api=github_api)
+
+    assert sha == "abc123"
+    assert github_api.calls == [("get_branch_sha", "main")]
+
+
+@pytest.mark.parametrize("ref", ["v1.0", "0123456"], ids=["tag", "short_sha"])
+def test_get_commit_sha_with_other_ref(ref):
+    class TagGitHubAPI(FakeGitHubAPI):
+        def get_branch_sha(self, org, repo, branch):
+            return None
+
+        def get_commit_sha(self, org, repo, ref):
+            return {"v1.0": SHA, "0123456": SHA}.get(ref)
+
+    sha = get_commit_sha("opensafely", "test", ref, get_github_api=TagGitHubAPI)
+
+    assert sha == SHA
+
+
+def test_get_commit_sha_with_missing_branch():
+    class BrokenGitHubAPI:
+        def get_branch_sha(self, *args):
+            return None
+
+        def get_commit_sha(self, *args):
+            return None
+
+    with pytest.raises(Exception, match="Missing branch: 'main'"):
+        get_commit_sha("opensafely", "test", "main", get_github_api=BrokenGitHubAPI)
+
+
 class BrokenOpenCodelistsAPI:
     def check_codelists(self, *args):
         return {"status": "error"}
@@ -341,6 +530,44 @@ def test_get_codelists_status_no_codelist_dir():
     assert codelists_status == "ok"
 
 
+def test_get_codelists_status_caches_content_and_check_at_sha(counting_apis):
+    github_api, opencodelists_api = counting_apis
+
+    for _ in range(2):
+        codelists_status = get_codelists_status(
+            "opensafely",
+            "test",
+            SHA,
+            get_github_api=github_api,
+            get_opencodelists_api=opencodelists_api,
+        )
+        assert codelists_status == "ok"
+
+    assert github_api.calls == [
+        ("get_file", "codelists/codelists.txt"),
+        ("get_file", "codelists/codelists.json"),
+    ]
+    assert opencodelists_api.calls == ["check_codelists"]
+
+
+def test_get_codelists_status_check_expires(counting_apis, settings):
+    settings.PIPELINE_CODELISTS_CHECK_TTL = 0
+    github_api, opencodelists_api = counting_apis
+
+    for _ in range(2):
+        get_codelists_status(
+            "opensafely",
+            "test",
+            SHA,
+            get_github_api=github_api,
+            get_opencodelists_api=opencodelists_api,
+        )
+
+    # the files are still cached, but the check is made again
+    assert len(github_api.calls) == 2
+    assert opencodelists_api.calls == ["check_codelists", "check_codelists"]
+
+
 def test_link_run_scripts():
     line = "some:command --a-switch /output/super-sekret.log /workspace/script1.py ./analysis/script2.do /script3"
 
@@ -452,6 +679,50 @@ def test_render_definition():
     assert output == expected
 
 
+def test_render_definition_with_overlapping_run_lines():
+    content = """
+    actions:
+      a:
+        run: python:latest analysis/a.py
+      b:
+        run: python:latest analysis/a.py --all
+    """
+
+    output = render_definition(content, link_func)
+
+    # the longer line is linked whole, not via the shorter line it contains
+    assert output.count('<a href="example.com/analysis/a.py">analysis/a.py</a>') == 2
+    assert "<a href" not in output.replace(
+        '<a href="example.com/analysis/a.py">analysis/a.py</a>', ""
+    )
+
+
+def test_render_definition_without_scripts():
+    content = """
+    actions:
+      a:
+        run: ehrql:v1 generate-dataset
+    """
+
+    assert "<a href" not in render_definition(content, link_func)
+
+
+def test_get_rendered_definition_caches_by_content_and_link_base(mocker):
+    mocked_render = mocker.patch(
+        "jobserver.pipeline_config.render_definition", wraps=render_definition
+    )
+    content = "actions:\n  a:\n    run: python:latest analysis/a.py\n"
+
+    first = get_rendered_definition(content, link_func, "example.com/tree/abc")
+    second = get_rendered_definition(content, link_func, "example.com/tree/abc")
+    assert first == second
+    assert mocked_render.call_count == 1
+
+    # the links depend on the repo and commit too
+    get_rendered_definition(content, link_func, "example.com/tree/def")
+    assert mocked_render.call_count == 2
+
+
 @pytest.mark.parametrize(
     "actions,expected_db_actions",
     [
@@ -9,12 +9,14 @@ When adding an endpoint make sure that the request method you use has tests for
 it in TestAPICall."""
 
 import json
+import runpy
 from unittest.mock import Mock
 
 import pytest
 import requests
 import responses
 import responses.matchers
+from django.conf import settings
 
 from jobserver.rap_api import (
     RapAPIRequestError,
@@ -24,8 +26,10 @@ from jobserver.rap_api import (
     backend_status,
     cancel,
     create,
+    session,
     status,
 )
+from tests.conftest import get_trace
 from tests.factories import JobRequestFactory, ProjectFactory, WorkspaceFactory
 
 
@@ -156,6 +160,73 @@ class TestApiCall:
         assert response.status_code == 200
         assert response.json() == response_body
 
+    def test_timeouts(self, rap_api_base_url, rap_api_token, settings):
+        """Test that requests are given connect and read timeouts."""
+        settings.RAP_API_CONNECT_TIMEOUT = 3
+        settings.RAP_API_READ_TIMEOUT = 30
+
+        def fake_request_method(url, **kwargs):
+            return (url, kwargs)
+
+        response = _api_call(fake_request_method, "some/path/")
+
+        assert response[1]["timeout"] == (3, 30)
+
+    def test_worst_case_fits_in_worker_timeout(self):
+        """Test that a retried GET can't outlast a gunicorn worker with the
+        default settings."""
+        gunicorn_conf = runpy.run_path(settings.BASE_DIR / "gunicorn.conf.py")
+        retry = session.get_adapter("https://").max_retries
+
+        # urllib3 doesn't wait before the first retry, then backs off
+        # exponentially
+        backoff = sum(
+            retry.backoff_factor * 2 ** (n - 1) for n in range(2, retry.total + 1)
+        )
+        timeouts = (retry.total + 1) * (
+            settings.RAP_API_CONNECT_TIMEOUT + settings.RAP_API_READ_TIMEOUT
+        )
+
+        assert timeouts + backoff < gunicorn_conf["timeout"]
+
+    def test_requests_get_retries(self, rap_api_base_url, rap_api_token):
+        """Test that GET requests are retried when the RAP API is unavailable."""
+        path = "some/path/"
+
+        with responses.RequestsMock() as rsps:
+            rsps.add(responses.GET, f"{rap_api_base_url}{path}", status=503)
+            rsps.add(responses.GET, f"{rap_api_base_url}{path}", json={}, status=200)
+            response = _api_call(requests.get, path)
+
+        assert response.status_code == 200
+
+    def test_requests_post_not_retried(self, rap_api_base_url, rap_api_token):
+        """Test that POST requests, which may not be safe to repeat, aren't retried."""
+        path = "some/path/"
+
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            rsps.add(responses.POST, f"{rap_api_base_url}{path}", status=503)
+            rsps.add(responses.POST, f"{rap_api_base_url}{path}", json={}, status=200)
+            response = _api_call(requests.post, path, json={})
+
+        assert response.status_code == 503
+
+    def test_records_duration(self, rap_api_base_url, rap_api_token, log_output):
+        """Test that the time each request takes is logged and traced."""
+
+        def fake_request_method(url, **kwargs):
+            return (url, kwargs)
+
+        _api_call(fake_request_method, "some/path/")
+
+        assert log_output.entries[-1]["event"] == "Success"
+        assert log_output.entries[-1]["duration_ms"] >= 0
+
+        span = get_trace()[-1]
+        assert span.name == "rap_api_call"
+        assert span.attributes["rap_api.endpoint_path"] == "some/path/"
+        assert span.attributes["rap_api.duration_ms"] >= 0
+
 
 class FakeResponse:
     """Lightweight fake response similar enough to requests.Response for these tests."""
@@ -1,8 +1,10 @@
 import hashlib
 import io
+import os
 import zipfile
 
 import pytest
+from django.conf import settings
 from django.db import DatabaseError
 from django.utils import timezone
 from rest_framework.exceptions import NotFound
@@ -26,7 +28,7 @@ def raise_error(**kwargs):
 
 
 def test_build_outputs_zip(release):
-    zf = releases.build_outputs_zip(release.files.all(), None)
+    zf = io.BytesIO(b"".join(releases.build_outputs_zip(release.files.all(), None)))
 
     with zipfile.ZipFile(zf, "r") as zip_obj:
         assert zip_obj.testzip() is None
@@ -58,7 +60,7 @@ def test_build_outputs_zip_with_missing_files(build_release_with_files):
     release.requested_files.append([{"name": "test2"}, {"name": "test4"}])
     files = release.files.order_by("name")
 
-    zf = releases.build_outputs_zip(files, lambda u: u)
+    zf = io.BytesIO(b"".join(releases.build_outputs_zip(files, lambda u: u)))
 
     with zipfile.ZipFile(zf, "r") as zip_obj:
         assert zip_obj.testzip() is None
@@ -84,6 +86,117 @@ def test_build_outputs_zip_with_missing_files(build_release_with_files):
             assert "This file was redacted by" in zipped_contents, zipped_contents
 
 
+def test_build_outputs_zip_streams_in_chunks(build_release_with_files, monkeypatch):
+    monkeypatch.setattr(releases, "ZIP_CHUNK_SIZE", 4)
+    release = build_release_with_files(["test1", "test2"])
+
+    chunks = list(releases.build_outputs_zip(release.files.order_by("name"), None))
+
+    # each file is read in more than one chunk, so the archive arrives as we
+    # build it rather than all at once
+    assert len(chunks) > 3
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks)), "r") as zip_obj:
+        assert zip_obj.testzip() is None
+        assert zip_obj.namelist() == ["test1", "test2"]
+
+
+def test_zip_response_caches_archive(rf, release):
+    request = rf.get("/")
+
+    response = releases.zip_response(
+        request, release.workspace, release.files.all(), "release.zip"
+    )
+    assert response.headers["Content-Disposition"] == (
+        'attachment; filename="release.zip"'
+    )
+    streamed = b"".join(response.streaming_content)
+
+    path = releases.archive_path(
+        release.workspace, release.files.all(), request.build_absolute_uri
+    )
+    assert path.read_bytes() == streamed
+
+    response = releases.zip_response(
+        request, release.workspace, release.files.all(), "release.zip"
+    )
+    assert response.headers["Content-Disposition"] == (
+        'attachment; filename="release.zip"'
+    )
+    assert b"".join(response.streaming_content) == streamed
+
+
+def test_zip_response_with_nginx(rf, release, settings):
+    request = rf.get("/", headers={"Releases-Redirect": "/storage"})
+    response = releases.zip_response(
+        request, release.workspace, release.files.all(), "release.zip"
+    )
+    b"".join(response.streaming_content)
+
+    response = releases.zip_response(
+        request, release.workspace, release.files.all(), "release.zip"
+    )
+
+    path = releases.archive_path(
+        release.workspace, release.files.all(), request.build_absolute_uri
+    )
+    relative_path = path.relative_to(settings.RELEASE_STORAGE)
+    assert response.headers["X-Accel-Redirect"] == f"/storage/{relative_path}"
+    assert response.headers["Content-Type"] == "application/zip"
+
+
+def test_zip_response_interrupted(rf, release):
+    request = rf.get("/")
+    response = releases.zip_response(
+        request, release.workspace, release.files.all(), "release.zip"
+    )
+
+    # the client goes away after the first chunk
+    next(iter(response.streaming_content))
+    response.close()
+
+    assert list(releases.archives_path(release.workspace).iterdir()) == []
+
+
+def test_archive_path_changes_on_redaction(release):
+    rfile = release.files.first()
+    before = releases.archive_path(release.workspace, [rfile], lambda u: u)
+
+    rfile.deleted_at = timezone.now()
+    rfile.deleted_by = UserFactory()
+
+    assert releases.archive_path(release.workspace, [rfile], lambda u: u) != before
+
+
+def test_evict_archives(settings):
+    settings.RELEASE_ARCHIVES_MAX_SIZE = 10
+
+    archives = settings.RELEASE_STORAGE / ".archives" / "workspace"
+    archives.mkdir(parents=True)
+
+    for i, name in enumerate(["oldest", "middle", "newest"]):
+        path = archives / f"{name}.zip"
+        path.write_bytes(b"12345")
+        os.utime(path, (i, i))
+
+    releases.evict_archives()
+
+    assert sorted(p.name for p in archives.iterdir()) == ["middle.zip", "newest.zip"]
+
+
+def test_clear_archives(release):
+    archives = releases.archives_path(release.workspace)
+    archives.mkdir(parents=True)
+    (archives / "archive.zip").touch()
+
+    releases.clear_archives(release.workspace)
+
+    assert not archives.exists()
+
+    # a workspace without any archives is fine too
+    releases.clear_archives(release.workspace)
+
+
 def test_create_release_already_exists(build_release):
     workspace = WorkspaceFactory(name="workspace")
     backend = BackendFactory()
@@ -278,6 +391,136 @@ def test_handle_release_upload_exists_with_incorrect_filehash(file_content):
             "file1.txt",
         )
 
+    # the upload was removed rather than moved into place
+    directory = (
+        settings.RELEASE_STORAGE
+        / existing.release.workspace.name
+        / "releases"
+        / str(existing.release.id)
+    )
+    assert list(directory.iterdir()) == []
+
+
+def test_handle_release_upload_reads_in_chunks(
+    build_release, file_content, monkeypatch
+):
+    monkeypatch.setattr(releases, "UPLOAD_CHUNK_SIZE", 4)
+    release = build_release(["file1.txt"])
+
+    reads = []
+
+    class Upload(io.BytesIO):
+        def read(self, size=-1):
+            reads.append(size)
+            return super().read(size)
+
+    rfile = releases.handle_file_upload(
+        release,
+        release.backend,
+        release.created_by,
+        Upload(file_content),
+        "file1.txt",
+    )
+
+    assert set(reads) == {4}
+    assert rfile.filehash == hashlib.sha256(file_content).hexdigest()
+    assert rfile.absolute_path().read_bytes() == file_content
+    assert [p.name for p in rfile.absolute_path().parent.iterdir()] == ["file1.txt"]
+
+
+def test_handle_release_upload_deduplicates_contents(build_release, file_content):
+    release1 = build_release(["file1.txt"])
+    release2 = build_release(["file1.txt"])
+
+    rfile1 = releases.handle_file_upload(
+        release1,
+        release1.backend,
+        release1.created_by,
+        io.BytesIO(file_content),
+        "file1.txt",
+    )
+    rfile2 = releases.handle_file_upload(
+        release2,
+        release2.backend,
+        release2.created_by,
+        io.BytesIO(file_content),
+        "file1.txt",
+    )
+
+    blob = releases.blob_path(rfile1.filehash)
+    assert rfile1.absolute_path().stat().st_ino == blob.stat().st_ino
+    assert rfile2.absolute_path().stat().st_ino == blob.stat().st_ino
+    assert blob.stat().st_nlink == 3
+
+
+def test_handle_release_upload_with_known_contents(file_content, monkeypatch):
+    filehash = hashlib.sha256(file_content).hexdigest()
+
+    blob = releases.blob_path(filehash)
+    blob.parent.mkdir(parents=True)
+    blob.write_bytes(file_content)
+
+    existing = ReleaseFileFactory(name="file1.txt", filehash=filehash, uploaded_at=None)
+
+    def fail(*args):  # pragma: no cover
+        raise AssertionError("upload should not be written to disk")
+
+    monkeypatch.setattr(releases, "_write_upload", fail)
+
+    releases.handle_file_upload(
+        existing.release,
+        existing.release.backend,
+        existing.created_by,
+        io.BytesIO(file_content),
+        "file1.txt",
+    )
+
+    existing.refresh_from_db()
+    assert existing.uploaded_at
+    assert existing.absolute_path().stat().st_ino == blob.stat().st_ino
+
+
+def test_handle_release_upload_with_known_contents_and_incorrect_upload(file_content):
+    filehash = hashlib.sha256(b"other").hexdigest()
+
+    blob = releases.blob_path(filehash)
+    blob.parent.mkdir(parents=True)
+    blob.write_bytes(b"other")
+
+    existing = ReleaseFileFactory(name="file1.txt", filehash=filehash, uploaded_at=None)
+
+    with pytest.raises(releases.ReleaseFileHashMismatch):
+        releases.handle_file_upload(
+            existing.release,
+            existing.release.backend,
+            existing.created_by,
+            io.BytesIO(file_content),
+            "file1.txt",
+        )
+
+
+def test_remove_unused_blob(build_release, file_content):
+    release = build_release(["file1.txt"])
+    rfile = releases.handle_file_upload(
+        release,
+        release.backend,
+        release.created_by,
+        io.BytesIO(file_content),
+        "file1.txt",
+    )
+    blob = releases.blob_path(rfile.filehash)
+
+    releases.remove_unused_blob(rfile.filehash)
+    assert blob.exists()
+
+    rfile.absolute_path().unlink()
+    releases.remove_unused_blob(rfile.filehash)
+    assert not blob.exists()
+
+    # files uploaded before blobs, and hashes which aren't SHA-256s
+    releases.remove_unused_blob(rfile.filehash)
+    releases.remove_unused_blob("../hash")
+
 
 def test_handle_release_upload_db_error(monkeypatch, build_release):
     release = build_release(["file1.txt"])
@@ -17,6 +17,7 @@ from jobserver.api.releases import (
     Level4TokenAuthenticationAPI,
     ReleaseAPI,
     ReleaseFileAPI,
+    ReleaseFilesAPI,
     ReleaseWorkspaceAPI,
     SnapshotAPI,
     SnapshotCreateAPI,
@@ -104,6 +105,7 @@ def test_url_permanent_redirects(client, url, redirect):
         ("/api/v2/workspaces/w/status", WorkspaceStatusAPI),
         ("/api/v2/releases/workspace/w", ReleaseWorkspaceAPI),
         ("/api/v2/releases/release/42", ReleaseAPI),
+        ("/api/v2/releases/release/42/files", ReleaseFilesAPI),
         ("/api/v2/releases/file/42", ReleaseFileAPI),
         ("/api/v2/releases/authenticate", Level4TokenAuthenticationAPI),
         ("/api/v2/releases/authorise", Level4AuthorisationAPI),
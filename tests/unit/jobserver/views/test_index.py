@@ -50,7 +50,7 @@ def test_index_authenticated(
     request = rf.get("/")
     request.user = user
 
-    with django_assert_num_queries(14):
+    with django_assert_num_queries(16):
         response = Index.as_view()(request)
 
         assert len(response.context_data["all_job_requests"]) == 10
@@ -79,7 +79,7 @@ def test_index_authenticated_display_active_backend_job_requests(
     request = rf.get("/")
     request.user = user
 
-    with django_assert_num_queries(9):
+    with django_assert_num_queries(14):
         response = Index.as_view()(request)
 
         assert len(response.context_data["all_job_requests"]) == 1
@@ -91,7 +91,7 @@ def test_index_authenticated_client(client, django_assert_num_queries):
     user = UserFactory()
     JobRequestFactory.create_batch(10)
 
-    with django_assert_num_queries(41):
+    with django_assert_num_queries(42):
         client.force_login(user)
         response = client.get("/")
         content = response.rendered_content
@@ -106,7 +106,7 @@ def test_index_unauthenticated(rf, django_assert_num_queries):
     request = rf.get("/")
     request.user = AnonymousUser()
 
-    with django_assert_num_queries(3):
+    with django_assert_num_queries(4):
         response = Index.as_view()(request)
         assert len(response.context_data["all_job_requests"]) == 10
 
@@ -115,7 +115,7 @@ def test_index_unauthenticated(rf, django_assert_num_queries):
 def test_index_unauthenticated_client(client, django_assert_num_queries):
     JobRequestFactory.create_batch(10)
 
-    with django_assert_num_queries(14):
+    with django_assert_num_queries(15):
         response = client.get("/")
         assert response.status_code == 200
         assert "OpenSAFELY Jobs" in response.rendered_content
@@ -12,7 +12,7 @@ from jobserver import honeycomb
 from jobserver.authorization import StaffAreaAdministrator
 from jobserver.authorization.permissions import Permission
 from jobserver.models import JobRequest, JobRequestStatus
-from jobserver.rap_api import RapAPIError, RapAPIResponseError
+from jobserver.rap_api import RapAPIError
 from jobserver.utils import set_from_qs
 from jobserver.views.job_requests import (
     JobRequestCancel,
@@ -331,7 +331,7 @@ def test_jobrequestcreate_get_success(
     request = rf.get("/")
     request.user = user
 
-    response = JobRequestCreate.as_view()(
+    response = JobRequestCreate.as_view(get_github_api=FakeGitHubAPI)(
         request,
         project_slug=workspace.project.slug,
         workspace_slug=workspace.name,
@@ -369,7 +369,7 @@ def test_jobrequestcreate_get_with_all_backends_removed(
     request.user = user
 
     with pytest.raises(Http404):
-        JobRequestCreate.as_view()(
+        JobRequestCreate.as_view(get_github_api=FakeGitHubAPI)(
             request,
             project_slug=workspace.project.slug,
             workspace_slug=workspace.name,
@@ -408,7 +408,7 @@ def test_jobrequestcreate_get_with_permission(
     request = rf.get("/")
     request.user = user
 
-    response = JobRequestCreate.as_view()(
+    response = JobRequestCreate.as_view(get_github_api=FakeGitHubAPI)(
         request,
         project_slug=workspace.project.slug,
         workspace_slug=workspace.name,
@@ -444,7 +444,7 @@ def test_jobrequestcreate_get_with_project_yaml_errors(
     request = rf.get("/")
     request.user = user
 
-    response = JobRequestCreate.as_view()(
+    response = JobRequestCreate.as_view(get_github_api=FakeGitHubAPI)(
         request,
         project_slug=workspace.project.slug,
         workspace_slug=workspace.name,
@@ -544,7 +544,7 @@ def test_jobrequestcreate_get_with_out_of_date_codelist(
     request._messages = FallbackStorage(request)
     request.user = user
 
-    response = JobRequestCreate.as_view()(
+    response = JobRequestCreate.as_view(get_github_api=FakeGitHubAPI)(
         request,
         project_slug=workspace.project.slug,
         workspace_slug=workspace.name,
@@ -592,10 +592,8 @@ def test_jobrequestcreate_post_success(
         return_value=dummy_yaml,
     )
 
-    mocker.patch(
-        "jobserver.models.job_request.rap_api.create",
-        autospec=True,
-        return_value={"count": 1, "details": "jobs created"},
+    mock_create = mocker.patch(
+        "jobserver.models.job_request.rap_api.create", autospec=True
     )
 
     data = {
@@ -626,172 +624,19 @@ def test_jobrequestcreate_post_success(
     assert job_request.sha == "abc123"
     assert job_request.codelists_ok
     assert not job_request.jobs.exists()
-    assert job_request.jobs_status == JobRequestStatus.PENDING
-
-    messages = [message for message in get_messages(request)]
-    assert len(messages) == 1
-    assert messages[0].message == "Requested actions have been scheduled to run."
+    assert job_request.jobs_status == JobRequestStatus.SUBMITTING
 
-
-def test_jobrequestcreate_post_success_nothing_to_do(
-    rf,
-    mocker,
-    user,
-    mock_codelists_ok,
-    project_membership,
-    role_factory,
-):
-    backend = BackendFactory()
-    workspace = WorkspaceFactory()
-
-    BackendMembershipFactory(backend=backend, user=user)
-    project_membership(
-        project=workspace.project,
-        user=user,
-        roles=[role_factory(permission=Permission.JOB_RUN)],
-    )
-
-    dummy_yaml = """
-    version: 3
-    expectations:
-      population_size: 1000
-    actions:
-      twiddle:
-        run: test:latest
-        outputs:
-          moderately_sensitive:
-            cohort: path/to/output.csv
-    """
-
-    mocker.patch(
-        "jobserver.views.job_requests.get_project",
-        autospec=True,
-        return_value=dummy_yaml,
-    )
-
-    mocker.patch(
-        "jobserver.models.job_request.rap_api.create",
-        autospec=True,
-        return_value={"count": 0, "details": "jobs already created"},
-    )
-
-    data = {
-        "backend": backend.slug,
-        "requested_actions": ["twiddle"],
-        "callback_url": "test",
-    }
-    request = rf.post("/", data)
-    request.user = user
-    request.session = "session"
-    request._messages = FallbackStorage(request)
-
-    response = JobRequestCreate.as_view(get_github_api=FakeGitHubAPI)(
-        request,
-        project_slug=workspace.project.slug,
-        workspace_slug=workspace.name,
-        ref="abc123",
-    )
-
-    assert response.status_code == 302, response.context_data["form"].errors
-    assert response.url == workspace.get_logs_url()
-
-    job_request = JobRequest.objects.first()
-    assert job_request.created_by == user
-    assert job_request.workspace == workspace
-    assert job_request.backend.slug == backend.slug
-    assert job_request.requested_actions == ["twiddle"]
-    assert job_request.sha == "abc123"
-    assert job_request.codelists_ok
-    assert job_request.jobs_status == JobRequestStatus.NOTHING_TO_DO
-    assert not job_request.jobs.exists()
+    # the RAP is created later, by the rap_submission_service
+    mock_create.assert_not_called()
 
     messages = [message for message in get_messages(request)]
     assert len(messages) == 1
     assert (
         messages[0].message
-        == "No actions scheduled: Nothing to do (jobs already created)"
+        == "Requested actions have been submitted and will be scheduled to run shortly."
     )
 
 
-def test_jobrequestcreate_post_rapapierror(
-    rf,
-    mocker,
-    user,
-    mock_codelists_ok,
-    project_membership,
-    role_factory,
-):
-    backend = BackendFactory()
-    workspace = WorkspaceFactory()
-
-    BackendMembershipFactory(backend=backend, user=user)
-    project_membership(
-        project=workspace.project,
-        user=user,
-        roles=[role_factory(permission=Permission.JOB_RUN)],
-    )
-
-    dummy_yaml = """
-    version: 3
-    expectations:
-      population_size: 1000
-    actions:
-      twiddle:
-        run: test:latest
-        outputs:
-          moderately_sensitive:
-            cohort: path/to/output.csv
-    """
-
-    mocker.patch(
-        "jobserver.views.job_requests.get_project",
-        autospec=True,
-        return_value=dummy_yaml,
-    )
-
-    mocker.patch(
-        "jobserver.models.job_request.rap_api.create",
-        autospec=True,
-        side_effect=RapAPIResponseError(
-            "RAP API Error", body={"details": "Error creating jobs"}
-        ),
-    )
-
-    data = {
-        "backend": backend.slug,
-        "requested_actions": ["twiddle"],
-        "callback_url": "test",
-    }
-    request = rf.post("/", data)
-    request.user = user
-    request.session = "session"
-    request._messages = FallbackStorage(request)
-
-    response = JobRequestCreate.as_view(get_github_api=FakeGitHubAPI)(
-        request,
-        project_slug=workspace.project.slug,
-        workspace_slug=workspace.name,
-        ref="abc123",
-    )
-
-    assert response.status_code == 302, response.context_data["form"].errors
-    assert response.url == workspace.get_logs_url()
-
-    job_request = JobRequest.objects.first()
-    assert job_request.created_by == user
-    assert job_request.workspace == workspace
-    assert job_request.backend.slug == backend.slug
-    assert job_request.requested_actions == ["twiddle"]
-    assert job_request.sha == "abc123"
-    assert job_request.codelists_ok
-    assert job_request.jobs_status == JobRequestStatus.FAILED
-    assert not job_request.jobs.exists()
-
-    messages = [message for message in get_messages(request)]
-    assert len(messages) == 1
-    assert messages[0].message == "No actions scheduled: Failed (Error creating jobs)"
-
-
 def test_jobrequestcreate_post_with_invalid_backend(
     rf, mocker, user, project_membership, role_factory
 ):
@@ -1145,7 +990,7 @@ def test_jobrequestcreate_unknown_workspace(rf, user):
 
     request = rf.get("/")
     request.user = user
-    response = JobRequestCreate.as_view()(
+    response = JobRequestCreate.as_view(get_github_api=FakeGitHubAPI)(
         request,
         project_slug=project.slug,
         workspace_slug="test",
@@ -1170,7 +1015,7 @@ def test_jobrequestcreate_with_archived_workspace(rf, project_membership, role_f
     request._messages = FallbackStorage(request)
     request.user = user
 
-    response = JobRequestCreate.as_view()(
+    response = JobRequestCreate.as_view(get_github_api=FakeGitHubAPI)(
         request,
         project_slug=workspace.project.slug,
         workspace_slug=workspace.name,
@@ -1194,7 +1039,7 @@ def test_jobrequestcreate_with_no_backends(rf, project_membership, role_factory)
     request.user = user
 
     with pytest.raises(Http404):
-        JobRequestCreate.as_view()(
+        JobRequestCreate.as_view(get_github_api=FakeGitHubAPI)(
             request,
             project_slug=workspace.project.slug,
             workspace_slug=workspace.name,
@@ -1208,7 +1053,7 @@ def test_jobrequestcreate_without_permission(rf):
     request.user = UserFactory()
 
     with pytest.raises(Http404):
-        JobRequestCreate.as_view()(
+        JobRequestCreate.as_view(get_github_api=FakeGitHubAPI)(
             request,
             project_slug=workspace.project.slug,
             workspace_slug=workspace.name,
@@ -1540,3 +1385,29 @@ def test_jobrequestlist_success(rf):
     assert response.status_code == 200
 
     assert set_from_qs(response.context_data["object_list"]) == {job_request.pk}
+
+
+def test_jobrequestlist_refreshes_statuses(rf, django_assert_num_queries):
+    succeeded = JobRequestFactory()
+    JobFactory.create_batch(2, job_request=succeeded, status="succeeded")
+    running = JobRequestFactory()
+    JobFactory(job_request=running, status="running")
+    JobFactory(job_request=running, status="pending")
+
+    request = rf.get("/")
+    request.user = UserFactory()
+
+    response = JobRequestList.as_view()(request)
+
+    # both statuses are saved by one bulk update, not a save() each
+    assert set(JobRequest.objects.values_list("_status", flat=True)) == {
+        JobRequestStatus.SUCCEEDED,
+        JobRequestStatus.RUNNING,
+    }
+
+    # reading jobs_status on the refreshed page doesn't save anything
+    with django_assert_num_queries(0):
+        assert {jr.jobs_status for jr in response.context_data["object_list"]} == {
+            "succeeded",
+            "running",
+        }
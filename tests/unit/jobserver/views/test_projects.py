@@ -13,7 +13,6 @@ from jobserver.views.projects import (
     ProjectEdit,
     ProjectEventLog,
 )
-from tests.fakes import FakeGitHubAPI, FakeGitHubAPIWithErrors
 from tests.utils import minutes_ago
 
 from ....factories import (
@@ -32,7 +31,9 @@ from ....factories import (
 @pytest.mark.parametrize("user", [UserFactory, AnonymousUser])
 def test_projectdetail_success(rf, user):
     project = ProjectFactory()
-    repo = RepoFactory(url="https://github.com/opensafely/some-research")
+    repo = RepoFactory(
+        url="https://github.com/opensafely/some-research", is_private=True
+    )
     workspace = WorkspaceFactory(project=project, repo=repo)
     job_request = JobRequestFactory(workspace=workspace)
     JobFactory(job_request=job_request, started_at=timezone.now())
@@ -44,9 +45,7 @@ def test_projectdetail_success(rf, user):
     # parametrize call
     request.user = user()
 
-    response = ProjectDetail.as_view(get_github_api=FakeGitHubAPI)(
-        request, project_slug=project.slug
-    )
+    response = ProjectDetail.as_view()(request, project_slug=project.slug)
 
     assert response.status_code == 200
 
@@ -113,9 +112,7 @@ def test_projectdetail_with_multiple_releases(rf, freezer):
     # FIXME: remove this role when releases is deployed to all users
     request.user = UserFactory(roles=[StaffAreaAdministrator])
 
-    response = ProjectDetail.as_view(get_github_api=FakeGitHubAPI)(
-        request, project_slug=project.slug
-    )
+    response = ProjectDetail.as_view()(request, project_slug=project.slug)
 
     assert response.status_code == 200
 
@@ -134,30 +131,27 @@ def test_projectdetail_with_multiple_releases(rf, freezer):
     assert snapshot4 not in snapshots
 
 
-def test_projectdetail_with_github_error(rf):
+def test_projectdetail_with_public_repo(rf):
     project = ProjectFactory(org=OrgFactory())
     WorkspaceFactory(
-        project=project, repo=RepoFactory(url="https://github.com/owner/repo")
+        project=project,
+        repo=RepoFactory(url="https://github.com/owner/repo", is_private=False),
     )
-    WorkspaceFactory(project=project, repo=RepoFactory(url="/path/on/disk/to/repo"))
 
     request = rf.get("/")
     request.user = UserFactory()
 
-    response = ProjectDetail.as_view(get_github_api=FakeGitHubAPIWithErrors)(
-        request, project_slug=project.slug
-    )
+    response = ProjectDetail.as_view()(request, project_slug=project.slug)
 
     assert response.status_code == 200
 
-    # check there is no public/private badge when GitHub returns an
-    # unsuccessful response
-    assert not response.context_data["public_repos"]
-    assert response.context_data["private_repos"][0]["is_private"] is None
-    assert "Public" not in response.rendered_content
+    assert not response.context_data["private_repos"]
+    assert response.context_data["public_repos"] == [
+        {"name": "repo", "url": "https://github.com/owner/repo", "is_private": False}
+    ]
 
 
-def test_projectdetail_with_timed_out_github(rf):
+def test_projectdetail_with_unsynced_repo_metadata(rf):
     project = ProjectFactory(org=OrgFactory())
     WorkspaceFactory(
         project=project, repo=RepoFactory(url="https://github.com/owner/repo")
@@ -167,24 +161,14 @@ def test_projectdetail_with_timed_out_github(rf):
     request = rf.get("/")
     request.user = UserFactory()
 
-    class BrokenGitHubAPI:
-        def get_repo_is_private(self, *args):
-            raise TimeoutError
-
-    response = ProjectDetail.as_view(get_github_api=BrokenGitHubAPI)(
-        request, project_slug=project.slug
-    )
+    response = ProjectDetail.as_view()(request, project_slug=project.slug)
 
     assert response.status_code == 200
 
-    # check there is no public/private badge when GitHub returns an
-    # unsuccessful response
+    # check there is no public/private badge when the update_repo_metadata job
+    # hasn't seen a repo yet
     assert not response.context_data["public_repos"]
-    assert response.context_data["private_repos"][0] == {
-        "name": "GitHub API Unavailable",
-        "is_private": None,
-        "url": "",
-    }
+    assert response.context_data["private_repos"][0]["is_private"] is None
     assert "Public" not in response.rendered_content
 
 
@@ -194,9 +178,7 @@ def test_projectdetail_with_no_jobs(rf):
     request = rf.get("/")
     request.user = UserFactory()
 
-    response = ProjectDetail.as_view(get_github_api=FakeGitHubAPI)(
-        request, project_slug=project.slug
-    )
+    response = ProjectDetail.as_view()(request, project_slug=project.slug)
 
     assert response.status_code == 200
 
@@ -209,9 +191,7 @@ def test_projectdetail_with_no_releases(rf):
     request = rf.get("/")
     request.user = UserFactory()
 
-    response = ProjectDetail.as_view(get_github_api=FakeGitHubAPI)(
-        request, project_slug=project.slug
-    )
+    response = ProjectDetail.as_view()(request, project_slug=project.slug)
 
     assert response.status_code == 200
 
@@ -229,9 +209,7 @@ def test_projectdetail_hides_edit_project_for_member_without_manage_permission(
     request = rf.get("/")
     request.user = user
 
-    response = ProjectDetail.as_view(get_github_api=FakeGitHubAPI)(
-        request, project_slug=project.slug
-    )
+    response = ProjectDetail.as_view()(request, project_slug=project.slug)
 
     assert "Edit project" not in response.rendered_content
 
@@ -250,9 +228,7 @@ def test_projectdetail_shows_edit_project_for_user_with_manage_permission(
     request = rf.get("/")
     request.user = user
 
-    response = ProjectDetail.as_view(get_github_api=FakeGitHubAPI)(
-        request, project_slug=project.slug
-    )
+    response = ProjectDetail.as_view()(request, project_slug=project.slug)
 
     assert "Edit project" in response.rendered_content
 
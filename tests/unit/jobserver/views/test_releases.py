@@ -5,6 +5,7 @@ from django.utils import timezone
 
 from jobserver.authorization.permissions import Permission
 from jobserver.models import PublishRequest, ReleaseFile
+from jobserver.releases import archives_path
 from jobserver.views.releases import (
     ProjectReleaseList,
     PublishedSnapshotFile,
@@ -325,6 +326,10 @@ def test_releasefiledelete_success(rf, freezer, release, role_factory):
     rfile = release.files.first()
     user = UserFactory(roles=[role_factory(permission=Permission.RELEASE_FILE_DELETE)])
 
+    archive = archives_path(release.workspace) / "archive.zip"
+    archive.parent.mkdir(parents=True)
+    archive.touch()
+
     request = rf.post("/")
     request.user = user
 
@@ -343,6 +348,7 @@ def test_releasefiledelete_success(rf, freezer, release, role_factory):
     assert not rfile.absolute_path().exists()
     assert rfile.deleted_by == user
     assert rfile.deleted_at == now
+    assert not archive.exists()
 
 
 def test_releasefiledelete_unknown_release_file(rf):
@@ -1,3 +1,4 @@
+import io
 import re
 import zipfile
 from datetime import timedelta
@@ -43,12 +44,6 @@ from ....factories import (
 )
 
 
-# this is what defines "private"
-class AnotherFakeGitHubAPI:
-    def get_repo_is_private(self, owner, name):
-        return name.startswith("private")
-
-
 def test_workspacearchivetoggle_success(rf, project_membership, role_factory):
     user = UserFactory()
     workspace = WorkspaceFactory(is_archived=False)
@@ -242,7 +237,7 @@ def test_workspacedetail_authorized_archive_workspaces(
     request = rf.get("/")
     request.user = user
 
-    response = WorkspaceDetail.as_view(get_github_api=FakeGitHubAPI)(
+    response = WorkspaceDetail.as_view()(
         request,
         project_slug=workspace.project.slug,
         workspace_slug=workspace.name,
@@ -259,14 +254,16 @@ def test_workspacedetail_authorized_public_repo_hide_change_visibility_banner(
 
     # a workspace with a "private" repo which ran its first job > 11 months ago
     private = WorkspaceFactory(
-        project=project, repo=RepoFactory(url="http://example.com/repo/private")
+        project=project,
+        repo=RepoFactory(url="http://example.com/repo/private", is_private=True),
     )
     job_request = JobRequestFactory(workspace=private)
     JobFactory(job_request=job_request, started_at=timezone.now() - timedelta(weeks=52))
 
     # the workspace we're viewing, which is using a "public" repo
     workspace = WorkspaceFactory(
-        project=project, repo=RepoFactory(url="http://example.com/repo/public")
+        project=project,
+        repo=RepoFactory(url="http://example.com/repo/public", is_private=False),
     )
 
     user = UserFactory()
@@ -280,7 +277,7 @@ def test_workspacedetail_authorized_public_repo_hide_change_visibility_banner(
     request = rf.get("/")
     request.user = user
 
-    response = WorkspaceDetail.as_view(get_github_api=AnotherFakeGitHubAPI)(
+    response = WorkspaceDetail.as_view()(
         request,
         project_slug=project.slug,
         workspace_slug=workspace.name,
@@ -297,14 +294,16 @@ def test_workspacedetail_authorized_private_repo_show_change_visibility_banner(
 
     # a workspace with a "private" repo which ran its first job > 11 months ago
     private = WorkspaceFactory(
-        project=project, repo=RepoFactory(url="http://example.com/repo/private1")
+        project=project,
+        repo=RepoFactory(url="http://example.com/repo/private1", is_private=True),
     )
     job_request = JobRequestFactory(workspace=private)
     JobFactory(job_request=job_request, started_at=timezone.now() - timedelta(weeks=52))
 
     # the workspace we're viewing, which is also using a "private" repo
     workspace = WorkspaceFactory(
-        project=project, repo=RepoFactory(url="http://example.com/repo/private2")
+        project=project,
+        repo=RepoFactory(url="http://example.com/repo/private2", is_private=True),
     )
 
     user = UserFactory()
@@ -318,7 +317,7 @@ def test_workspacedetail_authorized_private_repo_show_change_visibility_banner(
     request = rf.get("/")
     request.user = user
 
-    response = WorkspaceDetail.as_view(get_github_api=AnotherFakeGitHubAPI)(
+    response = WorkspaceDetail.as_view()(
         request,
         project_slug=project.slug,
         workspace_slug=workspace.name,
@@ -335,7 +334,8 @@ def test_workspacedetail_authorized_private_repo_show_workspace_admin_panel(
 
     # a workspace with a "private" repo
     workspace = WorkspaceFactory(
-        project=project, repo=RepoFactory(url="http://example.com/repo/private1")
+        project=project,
+        repo=RepoFactory(url="http://example.com/repo/private1", is_private=True),
     )
 
     user = UserFactory()
@@ -349,7 +349,7 @@ def test_workspacedetail_authorized_private_repo_show_workspace_admin_panel(
     request = rf.get("/")
     request.user = user
 
-    response = WorkspaceDetail.as_view(get_github_api=AnotherFakeGitHubAPI)(
+    response = WorkspaceDetail.as_view()(
         request,
         project_slug=project.slug,
         workspace_slug=workspace.name,
@@ -370,7 +370,7 @@ def test_workspacedetail_authorized_toggle_notifications(rf, role_factory):
     request = rf.get("/")
     request.user = user
 
-    response = WorkspaceDetail.as_view(get_github_api=FakeGitHubAPI)(
+    response = WorkspaceDetail.as_view()(
         request,
         project_slug=workspace.project.slug,
         workspace_slug=workspace.name,
@@ -398,7 +398,7 @@ def test_workspacedetail_authorized_view_outputs(rf, role_factory):
     request = rf.get("/")
     request.user = user
 
-    response = WorkspaceDetail.as_view(get_github_api=FakeGitHubAPI)(
+    response = WorkspaceDetail.as_view()(
         request,
         project_slug=workspace.project.slug,
         workspace_slug=workspace.name,
@@ -424,7 +424,7 @@ def test_workspacedetail_authorized_run_jobs(rf, project_membership, role_factor
     request = rf.get("/")
     request.user = user
 
-    response = WorkspaceDetail.as_view(get_github_api=FakeGitHubAPI)(
+    response = WorkspaceDetail.as_view()(
         request,
         project_slug=workspace.project.slug,
         workspace_slug=workspace.name,
@@ -450,7 +450,7 @@ def test_workspacedetail_authorized_run_jobs_no_backends(
     request = rf.get("/")
     request.user = user
 
-    response = WorkspaceDetail.as_view(get_github_api=FakeGitHubAPI)(
+    response = WorkspaceDetail.as_view()(
         request,
         project_slug=workspace.project.slug,
         workspace_slug=workspace.name,
@@ -485,7 +485,7 @@ def test_workspacedetail_run_jobs_button_disabled(
     request = rf.get("/")
     request.user = user
 
-    response = WorkspaceDetail.as_view(get_github_api=FakeGitHubAPI)(
+    response = WorkspaceDetail.as_view()(
         request,
         project_slug=workspace.project.slug,
         workspace_slug=workspace.name,
@@ -510,7 +510,7 @@ def test_workspacedetail_run_jobs_button_hidden(rf, mocker):
     request = rf.get("/")
     request.user = user
 
-    response = WorkspaceDetail.as_view(get_github_api=FakeGitHubAPI)(
+    response = WorkspaceDetail.as_view()(
         request,
         project_slug=workspace.project.slug,
         workspace_slug=workspace.name,
@@ -536,7 +536,7 @@ def test_workspacedetail_authorized_honeycomb(rf):
     request = rf.get("/")
     request.user = UserFactory(roles=[StaffAreaAdministrator])
 
-    response = WorkspaceDetail.as_view(get_github_api=FakeGitHubAPI)(
+    response = WorkspaceDetail.as_view()(
         request,
         project_slug=workspace.project.slug,
         workspace_slug=workspace.name,
@@ -556,7 +556,7 @@ def test_workspacedetail_logged_out(rf):
     request = rf.get("/")
     request.user = AnonymousUser()
 
-    response = WorkspaceDetail.as_view(get_github_api=FakeGitHubAPI)(
+    response = WorkspaceDetail.as_view()(
         request,
         project_slug=workspace.project.slug,
         workspace_slug=workspace.name,
@@ -574,7 +574,7 @@ def test_workspacedetail_unauthorized(rf):
     request = rf.get("/")
     request.user = UserFactory()
 
-    response = WorkspaceDetail.as_view(get_github_api=FakeGitHubAPI)(
+    response = WorkspaceDetail.as_view()(
         request,
         project_slug=workspace.project.slug,
         workspace_slug=workspace.name,
@@ -597,7 +597,8 @@ def test_workspacedetail_unauthorized_private_repo_show_workspace_admin_panel(
 
     # a workspace with a "private" repo
     workspace = WorkspaceFactory(
-        project=project, repo=RepoFactory(url="http://example.com/repo/private1")
+        project=project,
+        repo=RepoFactory(url="http://example.com/repo/private1", is_private=True),
     )
 
     user = UserFactory()
@@ -611,7 +612,7 @@ def test_workspacedetail_unauthorized_private_repo_show_workspace_admin_panel(
     request = rf.get("/")
     request.user = user
 
-    response = WorkspaceDetail.as_view(get_github_api=AnotherFakeGitHubAPI)(
+    response = WorkspaceDetail.as_view()(
         request,
         project_slug=project.slug,
         workspace_slug=workspace.name,
@@ -634,13 +635,14 @@ def test_workspacedetail_unknown_workspace(rf):
         )
 
 
-def test_workspacedetail_with_no_github(rf):
+def test_workspacedetail_with_unsynced_repo_metadata(rf):
+    # the update_repo_metadata job hasn't seen this repo yet
     workspace = WorkspaceFactory()
 
     request = rf.get("/")
     request.user = UserFactory()
 
-    response = WorkspaceDetail.as_view(get_github_api=FakeGitHubAPIWithErrors)(
+    response = WorkspaceDetail.as_view()(
         request,
         project_slug=workspace.project.slug,
         workspace_slug=workspace.name,
@@ -997,8 +999,13 @@ def test_workspacelatestoutputsdownload_success(
 
     assert response.status_code == 200
 
+    assert response.headers["Content-Disposition"] == (
+        f'attachment; filename="workspace-{workspace.name}.zip"'
+    )
+
     # check the returned file has the 3 files in it
-    with zipfile.ZipFile(response.file_to_stream, "r") as zip_obj:
+    zf = io.BytesIO(b"".join(response.streaming_content))
+    with zipfile.ZipFile(zf, "r") as zip_obj:
         assert zip_obj.testzip() is None
 
         assert set(zip_obj.namelist()) == {"test1", "test2", "test3"}
@@ -1,6 +1,12 @@
-from redirects.middleware import RedirectsMiddleware
+from redirects.middleware import RedirectsMiddleware, RedirectTrie
+from redirects.models import Redirect
 
-from ...factories import ProjectFactory, RedirectFactory, WorkspaceFactory
+from ...factories import (
+    ProjectFactory,
+    RedirectFactory,
+    UserFactory,
+    WorkspaceFactory,
+)
 
 
 def get_response(request):
@@ -52,3 +58,96 @@ def test_redirect_with_wildcard_in_path(rf):
     response = RedirectsMiddleware(get_response)(request)
 
     assert response.url == w2.get_absolute_url()
+
+
+def test_redirectsmiddleware_unknown_url_does_not_query(rf, django_assert_num_queries):
+    RedirectFactory(old_url="/abc/123/", project=ProjectFactory())
+
+    # warm the trie
+    RedirectsMiddleware(get_response)(rf.get("/"))
+
+    with django_assert_num_queries(0):
+        response = RedirectsMiddleware(get_response)(rf.get("/abc/456/"))
+
+    assert response == "no match"
+
+
+def test_redirectsmiddleware_new_redirect(rf):
+    project = ProjectFactory()
+
+    # warm the trie before the redirect exists
+    assert RedirectsMiddleware(get_response)(rf.get("/abc/123/")) == "no match"
+
+    RedirectFactory(old_url="/abc/123/", project=project)
+
+    response = RedirectsMiddleware(get_response)(rf.get("/abc/123/"))
+
+    assert response.url == project.get_absolute_url()
+
+
+def test_redirectsmiddleware_deleted_redirect(rf):
+    redirect = RedirectFactory(old_url="/abc/123/", project=ProjectFactory())
+
+    RedirectsMiddleware(get_response)(rf.get("/abc/123/"))
+
+    redirect.delete()
+
+    assert RedirectsMiddleware(get_response)(rf.get("/abc/123/")) == "no match"
+
+
+def test_redirectsmiddleware_deleted_by_another_process(rf):
+    project = ProjectFactory()
+    RedirectFactory(old_url="/abc/", project=project)
+    RedirectFactory(old_url="/abc/123/", workspace=WorkspaceFactory())
+
+    RedirectsMiddleware(get_response)(rf.get("/abc/123/"))
+
+    # a queryset delete doesn't send post_delete for each row, so this leaves
+    # the trie stale, as another process deleting it would
+    Redirect.objects.filter(old_url="/abc/123/")._raw_delete("default")
+
+    response = RedirectsMiddleware(get_response)(rf.get("/abc/123/"))
+
+    assert response.url == project.get_absolute_url() + "123/"
+
+
+def test_redirectsmiddleware_changed_by_another_process(rf):
+    project = ProjectFactory()
+    RedirectFactory(old_url="/abc/", project=project)
+    RedirectFactory(old_url="/abc/123/", workspace=WorkspaceFactory())
+
+    RedirectsMiddleware(get_response)(rf.get("/abc/123/"))
+
+    # a queryset update doesn't send post_save, so this leaves the trie stale,
+    # as another process changing it would
+    Redirect.objects.filter(old_url="/abc/123/").update(old_url="/xyz/")
+
+    response = RedirectsMiddleware(get_response)(rf.get("/abc/123/"))
+
+    assert response.url == project.get_absolute_url() + "123/"
+
+
+def test_redirectsmiddleware_ttl(rf, settings):
+    settings.REDIRECTS_CACHE_TTL = -1
+    project = ProjectFactory()
+
+    assert RedirectsMiddleware(get_response)(rf.get("/abc/123/")) == "no match"
+
+    # bulk_create doesn't send post_save, so only the TTL can pick this up
+    Redirect.objects.bulk_create(
+        [Redirect(old_url="/abc/123/", project=project, created_by=UserFactory())]
+    )
+
+    response = RedirectsMiddleware(get_response)(rf.get("/abc/123/"))
+
+    assert response.url == project.get_absolute_url()
+
+
+def test_redirecttrie_longest_prefix():
+    trie = RedirectTrie([(1, "/a/"), (2, "/a/b/"), (3, "/c/")])
+
+    assert trie.longest_prefix("/a/") == 1
+    assert trie.longest_prefix("/a/x") == 1
+    assert trie.longest_prefix("/a/b/c") == 2
+    assert trie.longest_prefix("/c") is None
+    assert trie.longest_prefix("/d/") is None
@@ -1,15 +1,12 @@
 from datetime import UTC, datetime
 
 import pytest
+from django.contrib.postgres.aggregates import ArrayAgg
 from django.core.exceptions import PermissionDenied
+from django.db.models import Value
 
 from jobserver.models import Project
-from staff.views.dashboards.copiloting import (
-    Copiloting,
-    MissingGitHubReposError,
-    build_repos_by_project,
-)
-from tests.fakes import FakeGitHubAPI, FakeGitHubAPIWithErrors
+from staff.views.dashboards.copiloting import Copiloting, build_repos_by_project
 
 from .....factories import (
     JobFactory,
@@ -23,32 +20,31 @@ from .....factories import (
 )
 
 
-def test_build_repos_by_project_missing_github_repos():
-    project = ProjectFactory()
-    repo = RepoFactory()
-    WorkspaceFactory(project=project, repo=repo)
-
-    projects = Project.objects.all()
-
-    with pytest.raises(MissingGitHubReposError):
-        build_repos_by_project(projects, get_github_api=FakeGitHubAPI)
-
-
-def test_build_repos_by_project_with_broken_github_api():
+def test_build_repos_by_project():
     project = ProjectFactory()
-    repo = RepoFactory()
-    WorkspaceFactory(project=project, repo=repo)
+    private = RepoFactory(is_private=True)
+    WorkspaceFactory(project=project, repo=private)
+    unsynced = RepoFactory()
+    WorkspaceFactory(project=project, repo=unsynced)
+    WorkspaceFactory(repo=RepoFactory(is_private=False))
+
+    projects = Project.objects.annotate(
+        repo_ids=ArrayAgg("workspaces__repo_id", default=Value([]), distinct=True)
+    )
 
-    projects = Project.objects.all()
+    repos_by_project = build_repos_by_project(projects)
 
-    assert (
-        build_repos_by_project(projects, get_github_api=FakeGitHubAPIWithErrors) == {}
-    )
+    assert {r["pk"]: r["is_private"] for r in repos_by_project[project.pk]} == {
+        private.pk: True,
+        unsynced.pk: None,
+    }
 
 
 def test_copiloting_success(rf, staff_area_administrator):
     project = ProjectFactory()
-    repo = RepoFactory(url="https://github.com/opensafely/research-repo-1")
+    repo = RepoFactory(
+        url="https://github.com/opensafely/research-repo-1", is_private=True
+    )
     workspace = WorkspaceFactory(project=project, repo=repo)
     release = ReleaseFactory(workspace=workspace)
     ReleaseFileFactory.create_batch(15, release=release, workspace=workspace)
@@ -61,7 +57,7 @@ def test_copiloting_success(rf, staff_area_administrator):
     request = rf.get("/")
     request.user = staff_area_administrator
 
-    response = Copiloting.as_view(get_github_api=FakeGitHubAPI)(request)
+    response = Copiloting.as_view()(request)
 
     assert response.status_code == 200
 
@@ -72,6 +68,7 @@ def test_copiloting_success(rf, staff_area_administrator):
     assert project["files_released_count"] == 15
     assert project["job_request_count"] == 2
     assert project["workspace_count"] == 1
+    assert project["repos"][0]["is_private"]
 
 
 def test_copiloting_unauthorized(rf):
@@ -79,29 +76,4 @@ def test_copiloting_unauthorized(rf):
     request.user = UserFactory()
 
     with pytest.raises(PermissionDenied):
-        Copiloting.as_view(get_github_api=FakeGitHubAPI)(request)
-
-
-def test_copiloting_with_broken_github_api(rf, staff_area_administrator):
-    project = ProjectFactory()
-    repo = RepoFactory(url="https://github.com/opensafely/research-repo-1")
-    workspace = WorkspaceFactory(project=project, repo=repo)
-    release = ReleaseFactory(workspace=workspace)
-    ReleaseFileFactory.create_batch(15, release=release, workspace=workspace)
-
-    job_request1 = JobRequestFactory(workspace=workspace)
-    JobFactory(job_request=job_request1, started_at=datetime(2020, 7, 31, tzinfo=UTC))
-    job_request2 = JobRequestFactory(workspace=workspace)
-    JobFactory(job_request=job_request2, started_at=datetime(2021, 9, 3, tzinfo=UTC))
-
-    request = rf.get("/")
-    request.user = staff_area_administrator
-
-    response = Copiloting.as_view(get_github_api=FakeGitHubAPIWithErrors)(request)
-
-    assert response.status_code == 200
-
-    assert len(response.context_data["projects"]) == 1
-
-    project = response.context_data["projects"][0]
-    assert project["repos"] == []
+        Copiloting.as_view()(request)
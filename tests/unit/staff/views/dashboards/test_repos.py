@@ -17,7 +17,6 @@ from .....factories import (
     RepoFactory,
     WorkspaceFactory,
 )
-from .....fakes import FakeGitHubAPI
 from .....utils import minutes_ago
 
 
@@ -31,7 +30,11 @@ def test_privatereposdashboard_success(
     # 3, 2, 1 workspaces respectively for 3 private repos
 
     # research-repo-1
-    repo1 = RepoFactory(url="https://github.com/opensafely/research-repo-1")
+    repo1 = RepoFactory(
+        url="https://github.com/opensafely/research-repo-1",
+        is_private=True,
+        topics=["github-releases"],
+    )
     rr1_workspace_1 = WorkspaceFactory(repo=repo1)
     rr1_jr_1 = JobRequestFactory(workspace=rr1_workspace_1)
     JobFactory(job_request=rr1_jr_1, started_at=minutes_ago(eleven_months_ago, 3))
@@ -48,7 +51,9 @@ def test_privatereposdashboard_success(
     JobFactory(job_request=rr1_jr_3, started_at=minutes_ago(eleven_months_ago, 10))
 
     # research-repo-2
-    repo2 = RepoFactory(url="https://github.com/opensafely/research-repo-2")
+    repo2 = RepoFactory(
+        url="https://github.com/opensafely/research-repo-2", is_private=True
+    )
     rr2_workspace_1 = WorkspaceFactory(repo=repo2)
     rr2_jr_1 = JobRequestFactory(workspace=rr2_workspace_1)
     JobFactory(job_request=rr2_jr_1, started_at=minutes_ago(eleven_months_ago, 30))
@@ -62,7 +67,9 @@ def test_privatereposdashboard_success(
 
     # research-repo-3
     rr3_workspace_1 = WorkspaceFactory(
-        repo=RepoFactory(url="https://github.com/opensafely/research-repo-3")
+        repo=RepoFactory(
+            url="https://github.com/opensafely/research-repo-3", is_private=False
+        )
     )
     rr3_jr_1 = JobRequestFactory(workspace=rr3_workspace_1)
     JobFactory(job_request=rr3_jr_1, started_at=minutes_ago(eleven_months_ago, 42))
@@ -70,16 +77,29 @@ def test_privatereposdashboard_success(
 
     # research-repo-5
     rr5_workspace_1 = WorkspaceFactory(
-        repo=RepoFactory(url="https://github.com/opensafely/research-repo-5")
+        repo=RepoFactory(
+            url="https://github.com/opensafely/research-repo-5", is_private=True
+        )
     )
     rr5_jr_1 = JobRequestFactory(workspace=rr5_workspace_1)
     JobFactory(job_request=rr5_jr_1, started_at=None)
 
+    # non-research-repo
+    nr_workspace_1 = WorkspaceFactory(
+        repo=RepoFactory(
+            url="https://github.com/opensafely/non-research-repo",
+            is_private=True,
+            topics=["non-research"],
+        )
+    )
+    nr_jr_1 = JobRequestFactory(workspace=nr_workspace_1)
+    JobFactory(job_request=nr_jr_1, started_at=minutes_ago(eleven_months_ago, 42))
+
     request = rf.get("/")
     request.user = staff_area_administrator
 
-    with django_assert_num_queries(2):
-        response = PrivateReposDashboard.as_view(get_github_api=FakeGitHubAPI)(request)
+    with django_assert_num_queries(3):
+        response = PrivateReposDashboard.as_view()(request)
 
     assert response.status_code == 200
 
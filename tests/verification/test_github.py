@@ -276,6 +276,28 @@ class TestGithubAPINonPrivate:
 
         assert sha is None
 
+    def test_get_commit_sha(self, github_api):
+        args = ["opensafely-testing", "github-api-testing", "test-get_branch_sha"]
+
+        real = github_api.get_commit_sha(*args)
+        fake = FakeGitHubAPI().get_commit_sha(*args)
+
+        assert real == "71650d527c9288f90aa01d089f5a9884b683f7ed"
+        assert isinstance(fake, str)
+
+        # a short sha resolves to the same commit
+        short = github_api.get_commit_sha(
+            "opensafely-testing", "github-api-testing", real[:7]
+        )
+        assert short == real
+
+    def test_get_commit_sha_with_missing_ref(self, github_api):
+        sha = github_api.get_commit_sha(
+            "opensafely-testing", "github-api-testing", "missing"
+        )
+
+        assert sha is None
+
     def test_get_default_file(self, github_api):
         args = ["opensafely-testing", "github-api-testing", "main"]
 
@@ -332,19 +354,11 @@ class TestGithubAPINonPrivate:
 
         assert_deep_type_equality(fake, real)
 
-    def test_get_repos_with_dates(self, github_api):
-        args = ["opensafely-testing"]
-
-        real = list(github_api.get_repos_with_dates(*args))
-        fake = FakeGitHubAPI().get_repos_with_dates(*args)
-
-        assert_deep_type_equality(fake, real)
-
-    def test_get_repos_with_status_and_url(self, github_api):
+    def test_get_repos_with_metadata(self, github_api):
         args = ["opensafely-testing"]
 
-        real = list(github_api.get_repos_with_status_and_url(args))
-        fake = FakeGitHubAPI().get_repos_with_status_and_url(args)
+        real = list(github_api.get_repos_with_metadata(*args))
+        fake = FakeGitHubAPI().get_repos_with_metadata(*args)
 
         assert_deep_type_equality(fake, real)
 